@@ -1 +1,5 @@
 from .lib.database import get_session, async_engine
+from .sessions import session_scope
+from .upsert import dialect_insert
+
+__all__ = ["async_engine", "dialect_insert", "get_session", "session_scope"]
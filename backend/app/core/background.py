@@ -0,0 +1,101 @@
+"""This module provides helpers to run deferred work on background tasks."""
+
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, List, TypeVar
+
+KeyType = TypeVar("KeyType", bound=Hashable)
+
+
+class DirtyKeyWorker(Generic[KeyType]):
+    """Coalesces keys marked as dirty and processes them in batches on a background task.
+
+    Marking a key that is already pending is a no-op, so a burst of changes for the
+    same key results in a single call to the handler.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[List[KeyType]], Awaitable[None]],
+        batch_size: int = 50,
+        interval: float = 1.0,
+    ):
+        """Initializes the DirtyKeyWorker.
+
+        Args:
+            name: The worker name, used in log messages.
+            handler: The coroutine function that processes a batch of keys.
+            batch_size: The maximum number of keys passed to the handler at once.
+            interval: The number of seconds to wait between drains.
+        """
+        self.name = name
+        self.handler = handler
+        self.batch_size = batch_size
+        self.interval = interval
+        self._pending: dict[KeyType, None] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        """The number of keys waiting to be processed."""
+        return len(self._pending)
+
+    def mark(self, key: KeyType) -> None:
+        """Marks a key as dirty so it gets processed on the next drain."""
+        self._pending[key] = None
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def drain(self) -> int:
+        """Processes one batch of pending keys.
+
+        Returns:
+            The number of keys processed, 0 if the handler failed.
+        """
+        if not self._pending:
+            return 0
+        keys = list(self._pending)[: self.batch_size]
+        for key in keys:
+            del self._pending[key]
+        try:
+            await self.handler(keys)
+        except Exception as e:
+            # Put the keys back so they are retried on the next drain.
+            for key in keys:
+                self._pending.setdefault(key, None)
+            print(f"{self.name}: error processing batch: {e}")
+            return 0
+        return len(keys)
+
+    async def start(self) -> None:
+        """Starts the background task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        """Stops the background task after processing the keys still pending."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        remaining = self.pending
+        while remaining > 0:
+            processed = await self.drain()
+            if not processed:
+                break
+            remaining -= processed
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while await self.drain() == self.batch_size:
+                pass
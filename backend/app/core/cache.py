@@ -0,0 +1,79 @@
+"""This module provides a small in-process cache with expiry."""
+
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, Tuple, TypeVar
+
+KeyType = TypeVar("KeyType", bound=Hashable)
+ValueType = TypeVar("ValueType")
+
+MISSING: Any = object()
+
+
+class TTLCache(Generic[KeyType, ValueType]):
+    """A size-bounded, least recently used cache whose entries expire after `ttl` seconds.
+
+    Entries live in the memory of one worker process, so the TTL bounds how long a
+    worker can serve a value that was changed by another one. `None` is a valid value,
+    which allows caching negative lookups; `get` returns `MISSING` on a miss.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        """Initializes the TTLCache.
+
+        Args:
+            maxsize: The maximum number of entries.
+            ttl: The number of seconds an entry is served for.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[KeyType, Tuple[float, ValueType]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: KeyType, default: Any = MISSING) -> ValueType | Any:
+        """Returns the value of a key, or `default` if it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: KeyType, value: ValueType, ttl: float | None = None) -> None:
+        """Stores a value, evicting the least recently used entry when full.
+
+        Args:
+            key: The key.
+            value: The value.
+            ttl: The number of seconds to serve this entry for, instead of the default.
+        """
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: KeyType) -> None:
+        """Removes a key if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Removes every entry."""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Returns the size and hit ratio of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
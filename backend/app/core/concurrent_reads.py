@@ -0,0 +1,82 @@
+"""This module runs independent read queries concurrently on separate connections."""
+
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, List, TypeVar
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .sessions import session_scope
+from .settings import settings
+
+ResultType = TypeVar("ResultType")
+
+Read = Callable[[AsyncSession], Awaitable[Any]]
+
+_request_semaphore: ContextVar[asyncio.Semaphore | None] = ContextVar("concurrent_reads_semaphore", default=None)
+_holding_slot: ContextVar[bool] = ContextVar("concurrent_reads_holding_slot", default=False)
+
+
+def _semaphore() -> asyncio.Semaphore:
+    """Returns the semaphore capping the connections held by the current request."""
+    semaphore = _request_semaphore.get()
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(settings.CONCURRENT_READS_PER_REQUEST)
+        _request_semaphore.set(semaphore)
+    return semaphore
+
+
+def share_read_limit(semaphore: asyncio.Semaphore) -> None:
+    """Caps the reads of the current context and of the tasks it creates afterwards together.
+
+    Used by background work outside of a request, e.g. the cache warm-up, whose reads run
+    in several tasks that should hold at most a given number of connections in total.
+
+    Args:
+        semaphore: The semaphore the reads acquire.
+    """
+    _request_semaphore.set(semaphore)
+
+
+async def run_read(read: Callable[[AsyncSession], Awaitable[ResultType]]) -> ResultType:
+    """Runs a read on its own pooled connection.
+
+    The number of reads running at once for the current request is capped by the
+    CONCURRENT_READS_PER_REQUEST setting, so a single request cannot drain the pool.
+    A read started from within another read, e.g. the total of a paginated list read
+    by run_concurrently, runs on the slot of its parent: waiting for a slot of its own
+    would deadlock once the parents hold all of them.
+
+    Args:
+        read: A coroutine function taking the session to run its statements on.
+    """
+    if _holding_slot.get():
+        async with session_scope() as session:
+            return await read(session)
+
+    async with _semaphore():
+        token = _holding_slot.set(True)
+        try:
+            async with session_scope() as session:
+                return await read(session)
+        finally:
+            _holding_slot.reset(token)
+
+
+async def run_concurrently(*reads: Read) -> List[Any]:
+    """Runs independent reads concurrently, each on its own pooled connection.
+
+    A session cannot run two statements at once, so reads that do not depend on each
+    other, e.g. a page and its count, are otherwise executed one after the other. The
+    reads only see committed data.
+
+    Args:
+        reads: Coroutine functions taking the session to run their statements on.
+
+    Returns:
+        The results of the reads, in order.
+    """
+    # Created before the reads start: each of them runs in a copy of the current
+    # context, where a semaphore created by the read itself would not be shared.
+    _semaphore()
+    return list(await asyncio.gather(*(run_read(read) for read in reads)))
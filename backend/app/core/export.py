@@ -0,0 +1,100 @@
+"""This module provides streaming exports of whole tables as NDJSON or CSV."""
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import AsyncIterator, Iterable, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from .sessions import session_scope
+
+# Number of rows fetched from the server-side cursor, and encoded, at a time.
+EXPORT_BATCH_SIZE = 1000
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, bytes):
+        return value.decode()
+    raise TypeError(f"Cannot export value of type {type(value).__name__}")
+
+
+def _encode_ndjson(names: Sequence[str], rows: Iterable[Sequence]) -> str:
+    return "".join(json.dumps(dict(zip(names, row)), default=_json_default) + "\n" for row in rows)
+
+
+def _encode_csv(rows: Iterable[Sequence]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        [value.value if isinstance(value, Enum) else value for value in row] for row in rows
+    )
+    return buffer.getvalue()
+
+
+async def export_rows(model, format: ExportFormat, exclude: Iterable[str] = ()) -> AsyncIterator[str]:
+    """Yields the rows of a table encoded in chunks.
+
+    The rows are read through a server-side cursor in batches of EXPORT_BATCH_SIZE and
+    encoded batch by batch, so memory use does not depend on the size of the table.
+    Plain columns are selected rather than model instances, which skips the identity
+    map and the validation of every row.
+
+    A dedicated session is used since the response outlives the request handler.
+
+    Args:
+        model: The table model to export.
+        format: The output format.
+        exclude: The names of the columns to leave out.
+    """
+    columns = [column for column in model.__table__.columns if column.name not in set(exclude)]
+    names = [column.name for column in columns]
+    if format == ExportFormat.CSV:
+        yield _encode_csv([names])
+
+    async with session_scope() as session:
+        stmt = (
+            select(*columns)
+            .order_by(*model.__table__.primary_key.columns)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        result = await session.stream(stmt)
+        async for rows in result.partitions():
+            if format == ExportFormat.CSV:
+                yield _encode_csv(rows)
+            else:
+                yield _encode_ndjson(names, rows)
+
+
+def export_response(model, format: ExportFormat, filename: str, exclude: Iterable[str] = ()) -> StreamingResponse:
+    """Returns a response streaming the rows of a table as a file download.
+
+    Args:
+        model: The table model to export.
+        format: The output format.
+        filename: The name of the downloaded file, without extension.
+        exclude: The names of the columns to leave out.
+    """
+    return StreamingResponse(
+        export_rows(model, format, exclude),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format.value}"'},
+    )
@@ -0,0 +1,126 @@
+"""This module provides the liveness and readiness checks of a worker."""
+
+import asyncio
+import inspect
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from sqlalchemy import text
+
+from .lib.database import async_engine
+from .settings import settings
+from .warmup import cache_warmer
+
+Probe = Callable[[], Dict[str, Any] | Awaitable[Dict[str, Any]]]
+
+
+def pool_status() -> Dict[str, Any]:
+    """Returns the number of connections of the pool in use and how saturated it is.
+
+    The saturation is None for pools without a fixed capacity, e.g. NullPool.
+    """
+    pool = async_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {"class": type(pool).__name__, "saturation": None}
+    size = pool.size()
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    # A negative max_overflow means that the pool has no limit.
+    capacity = size + max_overflow if max_overflow >= 0 else None
+    checked_out = pool.checkedout()
+    return {
+        "class": type(pool).__name__,
+        "size": size,
+        "capacity": capacity,
+        "checked_out": checked_out,
+        "overflow": pool.overflow(),
+        "saturation": checked_out / capacity if capacity else None,
+    }
+
+
+async def ping_database(timeout: float) -> Dict[str, Any]:
+    """Runs `SELECT 1` on a pooled connection and returns whether it answered in time."""
+
+    async def ping() -> None:
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    started_at = time.monotonic()
+    try:
+        await asyncio.wait_for(ping(), timeout)
+    except Exception as e:
+        return {"ok": False, "error": str(e) or type(e).__name__}
+    return {"ok": True, "latency_ms": (time.monotonic() - started_at) * 1000}
+
+
+class HealthChecks:
+    """Reports the health of a worker and whether it should receive traffic.
+
+    A worker is live as long as its event loop answers. It is ready when its caches are
+    warm, the database answers a ping within `db_timeout` seconds and at most
+    `max_pool_saturation` of the connection pool is in use: a worker whose pool is
+    exhausted is taken out of rotation by the load balancer before its requests time
+    out, and put back once the pool drains.
+
+    The features register probes reporting their queues and caches. Probes are only
+    informational and never fail readiness; a probe that raises or times out is
+    reported with its error.
+    """
+
+    def __init__(self, db_timeout: float = 2.0, max_pool_saturation: float = 0.9):
+        """Initializes the HealthChecks.
+
+        Args:
+            db_timeout: The number of seconds the database ping and each probe may take.
+            max_pool_saturation: The fraction of the pool in use above which the worker is
+                not ready.
+        """
+        self.db_timeout = db_timeout
+        self.max_pool_saturation = max_pool_saturation
+        self._probes: Dict[str, Probe] = {}
+
+    def register(self, name: str, probe: Probe) -> None:
+        """Registers a probe.
+
+        Args:
+            name: The unique name of the probe, e.g. "outbox".
+            probe: A function or coroutine function returning the state of a component,
+                e.g. the depth of a queue or the statistics of a cache.
+        """
+        if name in self._probes:
+            raise ValueError(f"Probe {name!r} is already registered")
+        self._probes[name] = probe
+
+    async def readiness(self) -> Dict[str, Any]:
+        """Returns whether the worker is ready, the checks deciding it and the probes."""
+        pool = pool_status()
+        database, components = await asyncio.gather(ping_database(self.db_timeout), self._run_probes())
+        saturated = pool["saturation"] is not None and pool["saturation"] >= self.max_pool_saturation
+        checks = {
+            "warmup": {"ok": cache_warmer.done},
+            "database": database,
+            "pool": {"ok": not saturated, **pool},
+        }
+        return {
+            "ready": all(check["ok"] for check in checks.values()),
+            "checks": checks,
+            "components": components,
+        }
+
+    async def _run_probes(self) -> Dict[str, Any]:
+        async def run(probe: Probe) -> Dict[str, Any]:
+            try:
+                state = probe()
+                if inspect.isawaitable(state):
+                    state = await asyncio.wait_for(state, self.db_timeout)
+                return state
+            except Exception as e:
+                return {"error": str(e) or type(e).__name__}
+
+        states = await asyncio.gather(*(run(probe) for probe in self._probes.values()))
+        return dict(zip(self._probes, states))
+
+
+health_checks = HealthChecks(
+    db_timeout=settings.HEALTH_DB_TIMEOUT,
+    max_pool_saturation=settings.HEALTH_MAX_POOL_SATURATION,
+)
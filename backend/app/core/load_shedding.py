@@ -0,0 +1,313 @@
+"""This module provides the concurrency limits and the load shedding of the requests."""
+
+import asyncio
+import heapq
+import itertools
+import json
+import re
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Dict, List, Tuple
+
+from .route_patterns import compile_path
+from .settings import settings
+
+
+class Priority(IntEnum):
+    """The priority classes of the requests, the most important first."""
+
+    CRITICAL = 0
+    WRITE = 1
+    READ = 2
+    SEARCH = 3
+
+
+# The share of the concurrency limit each priority class may use: under load, searches
+# are shed first while sign-ins and writes still find free slots.
+PRIORITY_SHARES = {
+    Priority.CRITICAL: 1.0,
+    Priority.WRITE: 0.9,
+    Priority.READ: 0.75,
+    Priority.SEARCH: 0.5,
+}
+
+
+class AdaptiveLimit:
+    """A concurrency limit adapted to the observed latency (AIMD).
+
+    The limit grows by one every `limit` requests answered within `target_latency`
+    seconds and is multiplied by `backoff` when a request is slower, at most once per
+    `target_latency` so that the requests of one slow burst only count once. With
+    `min_limit == max_limit`, the limit is static.
+    """
+
+    def __init__(self, initial: int, min_limit: int, max_limit: int, target_latency: float, backoff: float = 0.9):
+        """Initializes the AdaptiveLimit.
+
+        Args:
+            initial: The initial limit.
+            min_limit: The lowest limit.
+            max_limit: The highest limit.
+            target_latency: The number of seconds above which a request is slow.
+            backoff: The factor applied to the limit when a request is slow.
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.value = float(min(max(initial, min_limit), max_limit))
+        self._last_decrease = 0.0
+
+    def sample(self, latency: float) -> None:
+        """Adapts the limit to the latency of a request."""
+        if latency <= self.target_latency:
+            self.value = min(self.max_limit, self.value + 1 / self.value)
+            return
+        now = time.monotonic()
+        if now - self._last_decrease >= self.target_latency:
+            self._last_decrease = now
+            self.value = max(self.min_limit, self.value * self.backoff)
+
+
+class ConcurrencyLimiter:
+    """Admits requests up to a limit, queueing the others by priority.
+
+    A request of a priority class is admitted while fewer requests than its share of
+    the limit are in flight and no request of the same or a higher priority is waiting.
+    Queued requests are admitted by priority as slots are released, and give up after
+    `queue_timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: AdaptiveLimit,
+        queue_timeout: float,
+        shares: Dict[Priority, float] | None = PRIORITY_SHARES,
+    ):
+        """Initializes the ConcurrencyLimiter.
+
+        Args:
+            name: The name of the limiter, used in metrics.
+            limit: The concurrency limit.
+            queue_timeout: The number of seconds a request waits for a slot.
+            shares: The share of the limit of each priority class, None to let every
+                class use the whole limit.
+        """
+        self.name = name
+        self.limit = limit
+        self.queue_timeout = queue_timeout
+        self.shares = shares
+        self.in_flight = 0
+        self._waiters: List[Tuple[Priority, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._admitted = 0
+        self._queued = 0
+        self._rejected = 0
+
+    async def acquire(self, priority: Priority) -> bool:
+        """Waits for a slot, returning False if none was free within `queue_timeout`."""
+        if self.in_flight < self._capacity(priority) and not self._waiting_before(priority):
+            self.in_flight += 1
+            self._admitted += 1
+            return True
+
+        self._queued += 1
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            return False
+        except asyncio.CancelledError:
+            # The slot may have been granted just before the request was cancelled.
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+        self._admitted += 1
+        return True
+
+    def release(self) -> None:
+        """Frees a slot, admitting the queued requests that fit."""
+        self.in_flight -= 1
+        self._wake()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Returns the limit, the requests in flight and queued, and how many were rejected."""
+        self._drop_abandoned()
+        return {
+            "limit": round(self.limit.value, 2),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "admitted": self._admitted,
+            "queued": self._queued,
+            "rejected": self._rejected,
+        }
+
+    def _capacity(self, priority: Priority) -> int:
+        share = self.shares[priority] if self.shares is not None else 1.0
+        return max(1, int(self.limit.value * share))
+
+    def _drop_abandoned(self) -> None:
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+
+    def _waiting_before(self, priority: Priority) -> bool:
+        self._drop_abandoned()
+        return bool(self._waiters) and self._waiters[0][0] <= priority
+
+    def _wake(self) -> None:
+        # Admission is strictly by priority: the first waiter that does not fit blocks
+        # the others, whose share of the limit is smaller.
+        self._drop_abandoned()
+        while self._waiters and self.in_flight < self._capacity(self._waiters[0][0]):
+            _, _, future = heapq.heappop(self._waiters)
+            self.in_flight += 1
+            future.set_result(True)
+            self._drop_abandoned()
+
+
+@dataclass
+class RouteRule:
+    """How the requests of a route are classified."""
+
+    pattern: re.Pattern
+    methods: Tuple[str, ...] | None
+    priority: Priority
+    group: str | None = None
+    sample: bool = True
+    exempt: bool = False
+
+
+class LoadShedder:
+    """Classifies the requests by route and holds the concurrency limiters.
+
+    Every request goes through a global limiter adapted to the observed latency. The
+    requests of a route group, e.g. "search", also go through the static limiter of
+    their group, sized by the LOAD_SHEDDING_GROUP_LIMITS setting, so that one expensive
+    kind of request cannot take all the slots of the global limiter.
+    """
+
+    def __init__(self):
+        self.limiter = ConcurrencyLimiter(
+            "global",
+            AdaptiveLimit(
+                initial=settings.LOAD_SHEDDING_INITIAL_LIMIT,
+                min_limit=settings.LOAD_SHEDDING_MIN_LIMIT,
+                max_limit=settings.LOAD_SHEDDING_MAX_LIMIT,
+                target_latency=settings.LOAD_SHEDDING_TARGET_LATENCY,
+            ),
+            queue_timeout=settings.LOAD_SHEDDING_QUEUE_TIMEOUT,
+        )
+        self.group_limiters: Dict[str, ConcurrencyLimiter] = {
+            group: ConcurrencyLimiter(
+                group,
+                AdaptiveLimit(limit, limit, limit, settings.LOAD_SHEDDING_TARGET_LATENCY),
+                queue_timeout=settings.LOAD_SHEDDING_QUEUE_TIMEOUT,
+                shares=None,
+            )
+            for group, limit in settings.LOAD_SHEDDING_GROUP_LIMITS.items()
+        }
+        self._rules: List[RouteRule] = []
+        self._default_rules = {
+            priority: RouteRule(pattern=re.compile(".*"), methods=None, priority=priority)
+            for priority in (Priority.READ, Priority.WRITE)
+        }
+        self.shed = 0
+
+    def add_rule(
+        self,
+        path: str,
+        priority: Priority = Priority.READ,
+        methods: Tuple[str, ...] | None = None,
+        group: str | None = None,
+        sample: bool = True,
+        exempt: bool = False,
+    ) -> None:
+        """Classifies the requests of a route. The first matching rule applies.
+
+        Args:
+            path: The path of the route, where `{name}` matches one segment and `*`
+                anything, e.g. "/api/v1/tag/{tag_id}/questions" or "/health/*".
+            priority: The priority class of the requests.
+            methods: The methods the rule applies to, all by default.
+            group: The group whose static limiter the requests also go through.
+            sample: Whether the latency of the requests adapts the global limit. Streamed
+                responses, e.g. exports, are not representative.
+            exempt: Whether the requests bypass the limiters, e.g. health probes.
+        """
+        self._rules.append(RouteRule(compile_path(path), methods, priority, group, sample, exempt))
+
+    def classify(self, method: str, path: str) -> RouteRule:
+        """Returns the rule of a request. Unmatched writes and reads get a default rule."""
+        for rule in self._rules:
+            if (rule.methods is None or method in rule.methods) and rule.pattern.fullmatch(path):
+                return rule
+        return self._default_rules[Priority.READ if method in ("GET", "HEAD", "OPTIONS") else Priority.WRITE]
+
+    def limiters(self, rule: RouteRule) -> List[ConcurrencyLimiter]:
+        """Returns the limiters a request goes through, its group limiter first."""
+        group_limiter = self.group_limiters.get(rule.group) if rule.group is not None else None
+        return [group_limiter, self.limiter] if group_limiter is not None else [self.limiter]
+
+    def metrics(self) -> Dict[str, Any]:
+        """Returns the state of the limiters and the number of requests shed."""
+        return {
+            "shed": self.shed,
+            "global": self.limiter.metrics(),
+            "groups": {group: limiter.metrics() for group, limiter in self.group_limiters.items()},
+        }
+
+
+class LoadSheddingMiddleware:
+    """Answers 503 with a Retry-After header to the requests that found no free slot."""
+
+    def __init__(self, app, shedder: LoadShedder | None = None):
+        self.app = app
+        self.shedder = shedder if shedder is not None else load_shedder
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.LOAD_SHEDDING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        rule = self.shedder.classify(scope["method"], scope["path"])
+        if rule.exempt:
+            await self.app(scope, receive, send)
+            return
+
+        acquired: List[ConcurrencyLimiter] = []
+        try:
+            for limiter in self.shedder.limiters(rule):
+                if not await limiter.acquire(rule.priority):
+                    self.shedder.shed += 1
+                    await self._reject(send, limiter)
+                    return
+                acquired.append(limiter)
+            started_at = time.monotonic()
+            await self.app(scope, receive, send)
+            if rule.sample:
+                self.shedder.limiter.limit.sample(time.monotonic() - started_at)
+        finally:
+            for limiter in acquired:
+                limiter.release()
+
+    @staticmethod
+    async def _reject(send, limiter: ConcurrencyLimiter) -> None:
+        body = json.dumps({"detail": f"The server is overloaded ({limiter.name}), retry later"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(settings.LOAD_SHEDDING_RETRY_AFTER).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+load_shedder = LoadShedder()
@@ -0,0 +1,58 @@
+"""This module provides lightweight in-process metrics."""
+
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator
+
+
+class LatencyStats:
+    """Counts events and keeps latency statistics over a window of recent samples.
+
+    The statistics are per process and meant to be exposed by a metrics endpoint,
+    not to replace a proper monitoring system.
+    """
+
+    def __init__(self, window: int = 1024):
+        """Initializes the LatencyStats.
+
+        Args:
+            window: The number of recent samples the percentiles are computed from.
+        """
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        """Records the duration of one event."""
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self._samples.append(seconds)
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Records the duration of the wrapped block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def percentile(self, fraction: float) -> float:
+        """Returns the given percentile of the recent samples, in seconds."""
+        if not self._samples:
+            return 0.0
+        samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+    def snapshot(self) -> Dict[str, float]:
+        """Returns the statistics as a dictionary, durations in milliseconds."""
+        return {
+            "count": self.count,
+            "avg_ms": 1000 * self.total_seconds / self.count if self.count else 0.0,
+            "p50_ms": 1000 * self.percentile(0.5),
+            "p95_ms": 1000 * self.percentile(0.95),
+            "max_ms": 1000 * self.max_seconds,
+        }
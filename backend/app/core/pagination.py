@@ -0,0 +1,128 @@
+"""This module provides paginated reads with a choice of how the total is computed."""
+
+import asyncio
+from enum import Enum
+from typing import Any, Awaitable, Callable, Hashable, List, NamedTuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import MISSING, TTLCache
+from .concurrent_reads import run_read
+
+# Exact counts served by the "estimate" strategy when no cheaper estimate exists.
+_count_cache: TTLCache[Hashable, int] = TTLCache(maxsize=10_000, ttl=60.0)
+
+
+class TotalStrategy(str, Enum):
+    """How the total number of results of a paginated list is computed.
+
+    - exact: counted by a window function in the same query as the page.
+    - estimate: taken from a maintained counter or the query planner when available,
+      otherwise counted and cached for a minute.
+    - none: not computed; `has_more` tells whether there is a next page.
+    """
+
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    NONE = "none"
+
+
+class Page(NamedTuple):
+    """A page of results."""
+
+    items: List[Any]
+    total: int | None
+    has_more: bool
+
+
+async def count(session: AsyncSession, stmt) -> int:
+    """Returns the number of rows of a select statement, ignoring its order and pagination."""
+    count_stmt = select(func.count()).select_from(stmt.order_by(None).offset(None).limit(None).subquery())
+    return (await session.execute(count_stmt)).scalar() or 0
+
+
+async def cached_count(session: AsyncSession, stmt, key: Hashable) -> int:
+    """Returns the number of rows of a select statement, cached for a minute under `key`."""
+    total = _count_cache.get(key)
+    if total is MISSING:
+        total = await count(session, stmt)
+        _count_cache.set(key, total)
+    return total
+
+
+async def planner_estimate(session: AsyncSession, table_name: str) -> int | None:
+    """Returns the row count of a table estimated by the PostgreSQL planner.
+
+    Returns None on other databases or when the table was never analyzed.
+    """
+    if session.bind.dialect.name != "postgresql":
+        return None
+    result = await session.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table_name"), {"table_name": table_name}
+    )
+    estimate = result.scalar()
+    return estimate if estimate is not None and estimate >= 0 else None
+
+
+async def paginate(
+    session: AsyncSession,
+    stmt,
+    page: int,
+    page_size: int,
+    totals: TotalStrategy = TotalStrategy.EXACT,
+    estimate: Callable[[AsyncSession], Awaitable[int | None]] | None = None,
+    cache_key: Hashable | None = None,
+) -> Page:
+    """Returns a page of the entities selected by `stmt`.
+
+    Args:
+        session: The database session.
+        stmt: The ordered select statement of a single entity, without offset or limit.
+        page: The page number, starting at 1.
+        page_size: The number of results per page.
+        totals: How the total is computed.
+        estimate: Returns a cheap estimate of the total, used by the "estimate" strategy.
+            It runs on its own session, concurrently with the page query. When it
+            returns None, the total is counted and cached under `cache_key`.
+        cache_key: The key of the cached total, identifying the list and its filters.
+    """
+    offset = (page - 1) * page_size
+
+    if totals == TotalStrategy.EXACT:
+        result = await session.execute(
+            stmt.add_columns(func.count().over().label("total")).offset(offset).limit(page_size)
+        )
+        rows = result.all()
+        items = [row[0] for row in rows]
+        if rows:
+            total = rows[0][-1]
+        else:
+            # No row carries the total past the last page.
+            total = await count(session, stmt) if page > 1 else 0
+        return Page(items, total, offset + len(items) < total)
+
+    page_stmt = stmt.offset(offset).limit(page_size + 1)
+    if totals == TotalStrategy.NONE:
+        result = await session.execute(page_stmt)
+        items = list(result.scalars().all())
+        return Page(items[:page_size], None, len(items) > page_size)
+
+    async def get_total(read_session: AsyncSession) -> int:
+        total = await estimate(read_session) if estimate is not None else None
+        if total is None:
+            if cache_key is not None:
+                total = await cached_count(read_session, stmt, cache_key)
+            else:
+                total = await count(read_session, stmt)
+        return total
+
+    # The total does not depend on the page, so it is read concurrently on another connection.
+    result, total = await asyncio.gather(session.execute(page_stmt), run_read(get_total))
+    items = list(result.scalars().all())
+    has_more = len(items) > page_size
+    items = items[:page_size]
+    if items:
+        # An estimate must at least account for the rows that were seen.
+        total = max(total, offset + len(items) + int(has_more))
+    return Page(items, total, has_more)
@@ -0,0 +1,247 @@
+"""This module provides the rate limiting of the requests with token buckets."""
+
+import ipaddress
+import json
+import math
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Protocol, Sequence, Tuple
+
+from .cache import MISSING, TTLCache
+from .route_patterns import compile_path
+from .settings import settings
+
+
+class RateLimitStore(Protocol):
+    """The store of the token buckets, shared by the workers that should limit together."""
+
+    async def take(self, keys: Sequence[str], rate: float, burst: float, cost: float = 1.0) -> float:
+        """Takes `cost` tokens from each of the buckets if all of them hold enough.
+
+        No token is taken from any bucket when one of them is short, so a request limited
+        by one bucket does not use up the others.
+
+        Args:
+            keys: The keys of the buckets.
+            rate: The number of tokens added to each bucket per second.
+            burst: The capacity of each bucket, which starts full.
+            cost: The number of tokens taken from each bucket.
+
+        Returns:
+            0 if the tokens were taken, otherwise the number of seconds until every bucket
+            holds enough of them.
+        """
+        ...
+
+
+class LocalRateLimitStore:
+    """A RateLimitStore held in the memory of the process.
+
+    A bucket is a pair of its tokens and the time they were counted; it is refilled
+    lazily when tokens are taken, so a check is a dictionary lookup and a little
+    arithmetic. The check never awaits, hence runs atomically on the event loop without
+    any lock. A bucket is forgotten once it would be full again, which is the same as
+    not existing, and the least recently used buckets are evicted beyond `maxsize`.
+
+    Each worker process limits on its own: with N workers a client gets up to N times
+    the configured rate, unless a shared store is used instead.
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        """Initializes the LocalRateLimitStore.
+
+        Args:
+            maxsize: The maximum number of buckets.
+        """
+        self._buckets: TTLCache[str, Tuple[float, float]] = TTLCache(maxsize=maxsize)
+
+    async def take(self, keys: Sequence[str], rate: float, burst: float, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        counts = {}
+        for key in keys:
+            bucket = self._buckets.get(key)
+            if bucket is MISSING:
+                counts[key] = burst
+            else:
+                tokens, counted_at = bucket
+                counts[key] = min(burst, tokens + (now - counted_at) * rate)
+        lowest = min(counts.values(), default=burst)
+        if lowest < cost:
+            return (cost - lowest) / rate
+        for key, tokens in counts.items():
+            tokens -= cost
+            self._buckets.set(key, (tokens, now), ttl=(burst - tokens) / rate)
+        return 0.0
+
+    def stats(self) -> dict:
+        """Returns the number of buckets."""
+        return {"buckets": len(self._buckets), "maxsize": self._buckets.maxsize}
+
+
+@dataclass
+class RateLimitRule:
+    """The requests of a route limited by a bucket per client."""
+
+    name: str
+    pattern: re.Pattern
+    methods: Tuple[str, ...] | None
+    key: str
+
+
+class RateLimiter:
+    """Limits the rate of the requests of the routes with a rule, per client.
+
+    The rate and burst of each rule are set by the RATE_LIMITS setting, e.g.
+    `{"vote": {"rate": 1, "burst": 20}}` allows bursts of 20 votes then one per second.
+    Routes sharing a rule name share the buckets.
+
+    A client is identified by its address. Requests relayed by a trusted proxy, e.g. the
+    server actions of the frontend, carry the address of the client in X-Forwarded-For:
+    the client is the last address of the header that is not a trusted proxy. The header
+    of any other peer is ignored, since a client could send a new address each time.
+
+    Rules keyed by user also limit each user, identified by the `user_id` path parameter,
+    in a bucket of their own: the user is an additional key and never replaces the
+    address, so a client cannot get a fresh bucket by sending another user id. A request
+    is only allowed when every one of its buckets has a token left.
+    """
+
+    def __init__(self, store: RateLimitStore | None = None, trusted_proxies: Sequence[str] | None = None):
+        """Initializes the RateLimiter.
+
+        Args:
+            store: The store of the buckets, a LocalRateLimitStore by default.
+            trusted_proxies: The addresses or networks, e.g. "10.0.0.0/8", of the proxies
+                whose forwarded headers are trusted, the RATE_LIMIT_TRUSTED_PROXIES setting
+                by default.
+        """
+        self.store = store if store is not None else LocalRateLimitStore(settings.RATE_LIMIT_MAX_BUCKETS)
+        if trusted_proxies is None:
+            trusted_proxies = settings.RATE_LIMIT_TRUSTED_PROXIES
+        self.trusted_proxies = [ipaddress.ip_network(proxy, strict=False) for proxy in trusted_proxies]
+        self._rules: List[RateLimitRule] = []
+        self._allowed: Counter[str] = Counter()
+        self._limited: Counter[str] = Counter()
+
+    def add_rule(self, name: str, path: str, methods: Tuple[str, ...] | None = None, key: str = "ip") -> None:
+        """Limits the requests of a route. The first matching rule applies.
+
+        Args:
+            name: The name of the rule, the key of its limits in the RATE_LIMITS setting.
+            path: The path of the route, where `{name}` matches one segment and `*` anything.
+            methods: The methods the rule applies to, all by default.
+            key: "user" to limit each user, identified by the `user_id` parameter of the
+                path, as well as each client address, "ip" to limit each client address only.
+
+        Raises:
+            ValueError: If the RATE_LIMITS setting has no limits for the rule, or if it is
+                keyed by user and its path has no `user_id` parameter.
+        """
+        if name not in settings.RATE_LIMITS:
+            raise ValueError(f"No rate limit is configured for {name!r}")
+        if key == "user" and "{user_id}" not in path:
+            raise ValueError(f"The path of {name!r} has no user_id to key it by")
+        self._rules.append(RateLimitRule(name, compile_path(path), methods, key))
+
+    async def check(self, scope) -> Tuple[str, float] | None:
+        """Takes a token from each bucket of a request: its client address, and its user if keyed by user.
+
+        Returns:
+            None if the request is allowed, otherwise the name of the rule limiting it and
+            the number of seconds after which it would be.
+        """
+        for rule in self._rules:
+            if rule.methods is not None and scope["method"] not in rule.methods:
+                continue
+            match = rule.pattern.fullmatch(scope["path"])
+            if match is None:
+                continue
+            limits = settings.RATE_LIMITS[rule.name]
+            keys = [f"{rule.name}:{client}" for client in self._clients(scope, match, rule.key)]
+            retry_after = await self.store.take(keys, limits["rate"], limits["burst"])
+            if retry_after > 0:
+                self._limited[rule.name] += 1
+                return rule.name, retry_after
+            self._allowed[rule.name] += 1
+            return None
+        return None
+
+    def client_address(self, scope) -> str:
+        """Returns the address of the client of a request, forwarded by a trusted proxy or not."""
+        client = scope.get("client")
+        if not client:
+            return "unknown"
+        address = client[0]
+        if not self._is_trusted(address):
+            return address
+        hops = [
+            hop.strip()
+            for name, value in scope["headers"]
+            if name == b"x-forwarded-for"
+            for hop in value.decode("latin-1").split(",")
+            if hop.strip()
+        ]
+        for hop in reversed(hops):
+            if not self._is_trusted(hop):
+                return hop
+        return hops[0] if hops else address
+
+    def metrics(self) -> Dict[str, Any]:
+        """Returns how many requests of each rule were allowed and limited."""
+        return {
+            "rules": {
+                name: {"allowed": self._allowed[name], "limited": self._limited[name]}
+                for name in dict.fromkeys(rule.name for rule in self._rules)
+            },
+            "store": self.store.stats() if hasattr(self.store, "stats") else None,
+        }
+
+    def _clients(self, scope, match: re.Match, key: str) -> List[str]:
+        clients = [f"ip:{self.client_address(scope)}"]
+        if key == "user":
+            clients.append(f"user:{match['user_id']}")
+        return clients
+
+    def _is_trusted(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted_proxies)
+
+
+class RateLimitMiddleware:
+    """Answers 429 with a Retry-After header to the requests over their rate limit."""
+
+    def __init__(self, app, limiter: RateLimiter | None = None):
+        self.app = app
+        self.limiter = limiter if limiter is not None else rate_limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and settings.RATE_LIMIT_ENABLED:
+            limited = await self.limiter.check(scope)
+            if limited is not None:
+                await self._reject(send, *limited)
+                return
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _reject(send, name: str, retry_after: float) -> None:
+        body = json.dumps({"detail": f"Too many requests ({name}), retry later"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(math.ceil(retry_after)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,12 @@
+"""This module compiles the route paths used to classify requests outside of the router."""
+
+import re
+
+
+def compile_path(path: str) -> re.Pattern:
+    """Compiles a route path into a regular expression matching whole request paths.
+
+    `{name}` matches one path segment, captured in the group `name`, and `*` matches
+    anything, e.g. "/api/v1/tag/{tag_id}/questions" or "/health/*".
+    """
+    return re.compile(re.sub(r"\\\{([^/]+?)\\\}", r"(?P<\1>[^/]+)", re.escape(path)).replace(r"\*", ".*"))
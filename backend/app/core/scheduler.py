@@ -0,0 +1,221 @@
+"""This module provides an in-process scheduler for periodic and on-demand background jobs."""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Protocol, Set
+
+from .settings import settings
+
+
+class JobQueue(Protocol):
+    """The queue through which on-demand jobs are requested, by name."""
+
+    async def put(self, name: str) -> None: ...
+
+    async def get(self) -> str: ...
+
+    def get_nowait(self) -> str | None: ...
+
+    def qsize(self) -> int: ...
+
+
+class LocalJobQueue:
+    """A JobQueue held in the memory of the process.
+
+    Jobs requested through it run in the process that requested them: in worker mode,
+    on-demand jobs requested by a web process still run in that web process.
+    """
+
+    def __init__(self):
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+
+    async def put(self, name: str) -> None:
+        await self._queue.put(name)
+
+    async def get(self) -> str:
+        return await self._queue.get()
+
+    def get_nowait(self) -> str | None:
+        try:
+            return self._queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+
+@dataclass
+class Job:
+    """A registered job and its run statistics."""
+
+    name: str
+    func: Callable[[], Awaitable[None]]
+    interval: float | None = None
+    jitter: float = 0.1
+    runs: int = 0
+    failures: int = 0
+    last_started_at: float | None = None
+    last_duration: float | None = None
+    running: bool = False
+    queued: bool = False
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class JobScheduler:
+    """Runs background jobs on the event loop of the application.
+
+    A job runs periodically, every `interval` seconds give or take `jitter` so the
+    workers of a deployment do not run it in lockstep, and on demand through `trigger`.
+    At most `max_concurrency` jobs run at once and a job never runs concurrently with
+    itself: a run requested while the job is running starts when it ends. On shutdown,
+    the periodic loops stop, the jobs already requested are run and the running ones
+    are given `shutdown_timeout` seconds to finish before being cancelled.
+
+    With `periodic=False`, `start` only serves on-demand jobs, leaving the periodic ones
+    to a dedicated worker process started with `python -m app.worker`.
+    """
+
+    def __init__(self, max_concurrency: int = 2, shutdown_timeout: float = 30.0, queue: JobQueue | None = None):
+        """Initializes the JobScheduler.
+
+        Args:
+            max_concurrency: The maximum number of jobs running at once.
+            shutdown_timeout: The number of seconds running jobs are given to finish on stop.
+            queue: The queue of on-demand jobs, a LocalJobQueue by default.
+        """
+        self.max_concurrency = max_concurrency
+        self.shutdown_timeout = shutdown_timeout
+        self.queue = queue if queue is not None else LocalJobQueue()
+        self._jobs: Dict[str, Job] = {}
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loops: Set[asyncio.Task] = set()
+        self._running: Set[asyncio.Task] = set()
+
+    def register(
+        self, name: str, func: Callable[[], Awaitable[None]], interval: float | None = None, jitter: float = 0.1
+    ) -> None:
+        """Registers a job.
+
+        Args:
+            name: The unique name of the job.
+            func: The coroutine function running the job. It opens its own session.
+            interval: The number of seconds between two periodic runs, None for a job
+                that only runs on demand.
+            jitter: The fraction of `interval` by which each wait is randomly shortened
+                or lengthened.
+        """
+        if name in self._jobs:
+            raise ValueError(f"Job {name!r} is already registered")
+        self._jobs[name] = Job(name=name, func=func, interval=interval, jitter=jitter)
+
+    async def trigger(self, name: str) -> bool:
+        """Requests a run of a job, unless one is already requested.
+
+        Returns:
+            Whether a run was requested.
+
+        Raises:
+            KeyError: If no job is registered under that name.
+        """
+        job = self._jobs[name]
+        if job.queued:
+            return False
+        job.queued = True
+        await self.queue.put(name)
+        return True
+
+    async def start(self, periodic: bool = True) -> None:
+        """Starts serving on-demand jobs and, unless `periodic` is False, the periodic ones."""
+        if self._loops:
+            return
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._spawn_loop(self._consume(), "job-scheduler-queue")
+        if periodic:
+            for job in self._jobs.values():
+                if job.interval is not None:
+                    self._spawn_loop(self._every(job), f"job-scheduler-{job.name}")
+
+    async def stop(self) -> None:
+        """Stops the scheduler after running the requested jobs and draining the running ones."""
+        if not self._loops:
+            return
+        for task in self._loops:
+            task.cancel()
+        await asyncio.gather(*self._loops, return_exceptions=True)
+        self._loops.clear()
+
+        while (name := self.queue.get_nowait()) is not None:
+            self._spawn_run(self._jobs[name], on_demand=True)
+        if self._running:
+            _, pending = await asyncio.wait(self._running, timeout=self.shutdown_timeout)
+            for task in pending:
+                print(f"job-scheduler: cancelling {task.get_name()} after {self.shutdown_timeout}s")
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Returns the number of queued and running jobs and the statistics of each job."""
+        return {
+            "queued": self.queue.qsize(),
+            "running": len(self._running),
+            "max_concurrency": self.max_concurrency,
+            "jobs": {
+                job.name: {
+                    "interval": job.interval,
+                    "runs": job.runs,
+                    "failures": job.failures,
+                    "running": job.running,
+                    "last_duration_s": job.last_duration,
+                    "seconds_since_last_run": (
+                        time.monotonic() - job.last_started_at if job.last_started_at is not None else None
+                    ),
+                }
+                for job in self._jobs.values()
+            },
+        }
+
+    def _spawn_loop(self, coro, name: str) -> None:
+        self._loops.add(asyncio.create_task(coro, name=name))
+
+    def _spawn_run(self, job: Job, on_demand: bool = False) -> None:
+        task = asyncio.create_task(self._run(job, on_demand), name=f"job-{job.name}")
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _every(self, job: Job) -> None:
+        while True:
+            await asyncio.sleep(job.interval * random.uniform(1 - job.jitter, 1 + job.jitter))
+            # A periodic run is skipped when the previous one is still running.
+            if not job.lock.locked():
+                self._spawn_run(job)
+
+    async def _consume(self) -> None:
+        while True:
+            name = await self.queue.get()
+            self._spawn_run(self._jobs[name], on_demand=True)
+
+    async def _run(self, job: Job, on_demand: bool) -> None:
+        # A run requested while the job is running waits for that run to finish.
+        async with job.lock, self._semaphore:
+            if on_demand:
+                job.queued = False
+            job.running = True
+            job.last_started_at = time.monotonic()
+            try:
+                await job.func()
+                job.runs += 1
+            except Exception as e:
+                job.failures += 1
+                print(f"job-scheduler: error running {job.name}: {e}")
+            finally:
+                job.running = False
+                job.last_duration = time.monotonic() - job.last_started_at
+
+
+job_scheduler = JobScheduler(
+    max_concurrency=settings.JOB_SCHEDULER_CONCURRENCY,
+    shutdown_timeout=settings.JOB_SCHEDULER_SHUTDOWN_TIMEOUT,
+)
@@ -0,0 +1,30 @@
+"""This module provides standalone database sessions for work outside of a request."""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .lib.database import async_engine
+
+async_session_maker = sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[AsyncSession]:
+    """Opens a session that is not bound to a request.
+
+    Background workers and other out-of-request code use this instead of the
+    `get_session` dependency. The session is rolled back on error and always closed.
+    """
+    async with async_session_maker() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
@@ -5,13 +5,48 @@
 # will overwrite your changes.
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Any, List
+from typing import Any, Dict, List, Literal
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str
     DEV_MODE: bool
     ALLOW_ORIGINS: list
+    PASSWORD_HASH_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    CONCURRENT_READS_PER_REQUEST: int = 4
+    JOB_SCHEDULER_MODE: Literal["inline", "worker"] = "inline"
+    JOB_SCHEDULER_CONCURRENCY: int = 2
+    JOB_SCHEDULER_SHUTDOWN_TIMEOUT: float = 30.0
+    OUTBOX_DISPATCH_INTERVAL: float = 1.0
+    OUTBOX_LEASE: float = 60.0
+    IDEMPOTENCY_KEY_TTL: float = 86400.0
+    WARMUP_ENABLED: bool = True
+    WARMUP_CONCURRENCY: int = 4
+    WARMUP_TIMEOUT: float = 30.0
+    WARMUP_TOP_TAGS: int = 20
+    WARMUP_QUESTION_PAGES: int = 1
+    WARMUP_TOP_QUESTIONS: int = 50
+    HEALTH_DB_TIMEOUT: float = 2.0
+    HEALTH_MAX_POOL_SATURATION: float = 0.9
+    LOAD_SHEDDING_ENABLED: bool = True
+    LOAD_SHEDDING_INITIAL_LIMIT: int = 20
+    LOAD_SHEDDING_MIN_LIMIT: int = 4
+    LOAD_SHEDDING_MAX_LIMIT: int = 200
+    LOAD_SHEDDING_TARGET_LATENCY: float = 0.5
+    LOAD_SHEDDING_QUEUE_TIMEOUT: float = 1.0
+    LOAD_SHEDDING_RETRY_AFTER: int = 1
+    LOAD_SHEDDING_GROUP_LIMITS: Dict[str, int] = {"search": 8, "export": 2}
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_MAX_BUCKETS: int = 100_000
+    RATE_LIMIT_TRUSTED_PROXIES: List[str] = []
+    RATE_LIMITS: Dict[str, Dict[str, float]] = {
+        "sign-in": {"rate": 0.2, "burst": 10},
+        "vote": {"rate": 1.0, "burst": 30},
+        "collection-toggle": {"rate": 1.0, "burst": 30},
+        "search": {"rate": 2.0, "burst": 30},
+    }
 
     model_config = SettingsConfigDict(
         env_file='.env',
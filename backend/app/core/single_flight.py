@@ -0,0 +1,98 @@
+"""This module provides request coalescing for identical concurrent reads."""
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+from .metrics import LatencyStats
+
+ResultType = TypeVar("ResultType")
+
+
+class SingleFlight:
+    """Shares one in-flight computation among concurrent callers with the same key.
+
+    The first caller of a key starts the computation in its own task and the callers
+    arriving while it runs wait for the same result, so a burst of identical requests
+    costs one database round trip. Nothing is cached: once the computation finishes,
+    the next caller starts a new one. Every caller gets its own deep copy of the result,
+    so a caller modifying it, e.g. a route attaching data to a loaded model, does not
+    change what the others see.
+
+    The computation must not use the session of a caller, since it outlives callers that
+    are cancelled; it typically opens its own with `session_scope`.
+    """
+
+    def __init__(self, name: str, timeout: float = 10.0):
+        """Initializes the SingleFlight.
+
+        Args:
+            name: The name of the SingleFlight, used in metrics.
+            timeout: The number of seconds a caller waits for a computation. A computation
+                still running after that is no longer shared with new callers.
+        """
+        self.name = name
+        self.timeout = timeout
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._leaders = 0
+        self._followers = 0
+        self._timeouts = 0
+        self._errors = 0
+        self._stats = LatencyStats()
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[ResultType]]) -> ResultType:
+        """Returns a copy of the result of `func`, sharing it with concurrent callers of the same key.
+
+        Args:
+            key: The key identifying identical calls, e.g. the method and its arguments.
+            func: The coroutine function computing the result.
+
+        Raises:
+            asyncio.TimeoutError: If the computation takes longer than `timeout`.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            self._leaders += 1
+            task = asyncio.create_task(self._run(func))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self._followers += 1
+
+        try:
+            # Shielded so that a cancelled or timed out caller does not cancel the others.
+            result = await asyncio.wait_for(asyncio.shield(task), self.timeout)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            self._forget(key, task)
+            raise
+        return copy.deepcopy(result)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Returns how many calls were computed, shared, timed out or failed."""
+        calls = self._leaders + self._followers
+        return {
+            "name": self.name,
+            "in_flight": len(self._calls),
+            "leaders": self._leaders,
+            "followers": self._followers,
+            "shared_ratio": self._followers / calls if calls else 0.0,
+            "timeouts": self._timeouts,
+            "errors": self._errors,
+            "latency": self._stats.snapshot(),
+        }
+
+    async def _run(self, func: Callable[[], Awaitable[ResultType]]) -> ResultType:
+        try:
+            with self._stats.time():
+                return await func()
+        except Exception:
+            self._errors += 1
+            raise
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if task.done() and not task.cancelled():
+            # Mark the exception as retrieved when no caller is left to receive it.
+            task.exception()
@@ -0,0 +1,20 @@
+"""This module provides dialect-aware INSERT statements supporting ON CONFLICT clauses."""
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def dialect_insert(session: AsyncSession, model):
+    """Returns an INSERT statement for the database dialect of the session.
+
+    Both the PostgreSQL and SQLite statements support `on_conflict_do_update` and
+    `on_conflict_do_nothing`, which turn read-modify-write sequences into a single
+    atomic statement.
+
+    Args:
+        session: The database session the statement will be executed with.
+        model: The model or table to insert into.
+    """
+    if session.bind.dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
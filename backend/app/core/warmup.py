@@ -0,0 +1,141 @@
+"""This module provides the warm-up of the caches of a worker when it starts."""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Set
+
+from .concurrent_reads import share_read_limit
+from .settings import settings
+
+
+@dataclass
+class Warmer:
+    """A registered warmer and the outcome of its run."""
+
+    name: str
+    func: Callable[[], Awaitable[None]]
+    duration: float | None = None
+    error: str | None = None
+
+
+class CacheWarmer:
+    """Runs the warmers registered by the features when a worker starts.
+
+    A freshly started worker has empty in-process caches and a cold connection pool, so
+    its first requests are slow. The warmers run the hot reads once, concurrently and in
+    the background while the worker already answers liveness probes. Some fill caches of
+    the worker, e.g. the tag autocomplete index and the user cache; the others only open
+    connections of the pool and bring the pages of the hottest queries into the buffer
+    cache of the database, which benefits every worker.
+
+    Readiness waits for the warm-up, not for any cache to be full: the worker is reported
+    ready once every warmer finished, failed or ran out of time. Warming is best effort
+    and never keeps a worker out of rotation for longer than `timeout`.
+
+    The warm-up holds at most `concurrency` connections: the warmers run their reads with
+    `run_read` or `run_concurrently`, which share a semaphore held by the warm-up.
+    """
+
+    def __init__(self, concurrency: int = 4, timeout: float = 30.0):
+        """Initializes the CacheWarmer.
+
+        Args:
+            concurrency: The maximum number of warmers running at once.
+            timeout: The number of seconds after which the unfinished warmers are cancelled.
+        """
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._warmers: Dict[str, Warmer] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._started_at: float | None = None
+        self._duration: float | None = None
+        self._done = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        """Whether the warm-up finished or was skipped."""
+        return self._done.is_set()
+
+    def register(self, name: str, func: Callable[[], Awaitable[None]]) -> None:
+        """Registers a warmer.
+
+        Args:
+            name: The unique name of the warmer.
+            func: The coroutine function preloading the data. It runs its reads with
+                `run_read` or `run_concurrently`, not with sessions of its own.
+        """
+        if name in self._warmers:
+            raise ValueError(f"Warmer {name!r} is already registered")
+        self._warmers[name] = Warmer(name=name, func=func)
+
+    def start(self) -> None:
+        """Starts the warm-up in the background."""
+        if self._tasks or self.done:
+            return
+        task = asyncio.create_task(self.run(), name="cache-warmer")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def skip(self) -> None:
+        """Reports the worker as warm without running the warmers."""
+        self._done.set()
+
+    async def wait(self) -> None:
+        """Waits for the end of the warm-up."""
+        await self._done.wait()
+
+    async def stop(self) -> None:
+        """Cancels a warm-up still running, e.g. when the worker stops while warming."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def run(self) -> None:
+        """Runs every warmer, at most `concurrency` at once and for at most `timeout` seconds."""
+        self._started_at = time.monotonic()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # Set before the warmers are started, so that their tasks inherit it.
+        share_read_limit(asyncio.Semaphore(self.concurrency))
+
+        async def warm(warmer: Warmer) -> None:
+            async with semaphore:
+                started_at = time.monotonic()
+                try:
+                    await warmer.func()
+                except asyncio.CancelledError:
+                    warmer.error = "cancelled"
+                    raise
+                except Exception as e:
+                    warmer.error = str(e)
+                    print(f"cache-warmer: error running {warmer.name}: {e}")
+                finally:
+                    warmer.duration = time.monotonic() - started_at
+
+        tasks = [asyncio.create_task(warm(warmer), name=f"warmer-{warmer.name}") for warmer in self._warmers.values()]
+        try:
+            if tasks:
+                _, pending = await asyncio.wait(tasks, timeout=self.timeout)
+                for task in pending:
+                    print(f"cache-warmer: cancelling {task.get_name()} after {self.timeout}s")
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._duration = time.monotonic() - self._started_at
+            self._done.set()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Returns whether the warm-up finished and how long each warmer took."""
+        return {
+            "done": self.done,
+            "duration_s": self._duration,
+            "warmers": {
+                warmer.name: {"duration_s": warmer.duration, "error": warmer.error}
+                for warmer in self._warmers.values()
+            },
+        }
+
+
+cache_warmer = CacheWarmer(concurrency=settings.WARMUP_CONCURRENCY, timeout=settings.WARMUP_TIMEOUT)
@@ -4,6 +4,8 @@ from fastapi import APIRouter, Depends, HTTPException, status, Body, Query
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core import get_session
+from app.core.health import health_checks
+from app.core.export import ExportFormat, export_response
 from app.features.account.models.account import Account, AccountCreate, AccountLoad, \
     AccountUpdate, AccountSignInWithOauth, AccountSignUpWithCredentials, AccountSignInWithCredentials
 from .services.account_services import AccountService
@@ -14,6 +16,7 @@ router = APIRouter(
 )
 
 account_service = AccountService(Account, AccountCreate, AccountLoad, AccountUpdate)
+health_checks.register("password-hasher", account_service.password_hasher.metrics)
 
 
 @router.get("/load/{account_id}", response_model=AccountLoad)
@@ -113,3 +116,19 @@ async def sign_up_with_credentials(account_sign_up_with_credentials: AccountSign
 async def sign_in_with_credentials(account_sign_in_with_credentials: AccountSignInWithCredentials, session: AsyncSession = Depends(get_session)):
     account = await account_service.get_account_by_credentials(session, account_sign_in_with_credentials)
     return account
+
+
+@router.get("/password-hasher/metrics")
+async def password_hasher_metrics():
+    """Returns the load and latency of the password hasher of this worker."""
+    return account_service.password_hasher.metrics()
+
+
+@router.get("/export")
+async def export_accounts(format: ExportFormat = ExportFormat.NDJSON):
+    """Streams all Accounts as NDJSON or CSV.
+
+    Args:
+        format: The output format.
+    """
+    return export_response(Account, format, "accounts", exclude=("password",))
@@ -1,17 +1,30 @@
 """This module provides the service for the Account feature."""
-from typing import Type, List
-import bcrypt
+import secrets
+from datetime import datetime, timezone
+from typing import Type, List, Tuple
 
 from fastapi import HTTPException, status
 from sqlalchemy import and_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select, func
+from sqlmodel import select, func, update
 
+from app.core import dialect_insert
+from app.core.cache import MISSING, TTLCache
 from app.core.lib.base_model_service import BaseModelService
+from app.core.settings import settings
 from ..models.account import Account, AccountCreate, AccountLoad, AccountUpdate, AccountSignInWithOauth, \
     AccountSignUpWithCredentials, AccountSignInWithCredentials
 from ...user.models.user import User
 from ...user.routes import user_service
+from ...user.services.user_services import user_conflict
+from .password_hasher import PasswordHasher
+
+# How long the provider account lookups of the OAuth sign-in are cached, in seconds.
+PROVIDER_ACCOUNT_CACHE_TTL = 60.0
+NEGATIVE_CACHE_TTL = 5.0
+# How many usernames are tried for a new OAuth user whose username is taken.
+USERNAME_ATTEMPTS = 5
 
 
 class AccountService(BaseModelService[Account, AccountCreate, AccountLoad, AccountUpdate]):
@@ -33,6 +46,14 @@ class AccountService(BaseModelService[Account, AccountCreate, AccountLoad, Accou
         super().__init__(model, create_schema, load_schema, update_schema)
         # The base BaseModelService includes a basic CRUD operation.
         # Feel free to override its functionality for more complex use cases.
+        self.password_hasher = PasswordHasher(
+            rounds=settings.PASSWORD_HASH_ROUNDS,
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+        )
+        self.provider_account_cache: TTLCache[str, Tuple[AccountLoad, str | None] | None] = TTLCache(
+            maxsize=10_000, ttl=PROVIDER_ACCOUNT_CACHE_TTL
+        )
 
     async def create(self, session: AsyncSession, account: AccountCreate) -> AccountLoad:
         """Creates a new Account object.
@@ -66,124 +87,164 @@ class AccountService(BaseModelService[Account, AccountCreate, AccountLoad, Accou
 
     async def load_by_provider_account_id(self, session: AsyncSession, provider: str) -> AccountLoad:
         """Loads an Account object by provider id."""
-        stmt = select(Account).where(Account.provider_account_id == provider)
-        result = await session.execute(stmt)
-        account = result.scalar_one_or_none()
-
-        if account is None:
+        found = await self._find_oauth_account(session, provider)
+        if found is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account not found")
 
-        account_load = AccountLoad.model_validate(account)
-
+        account_load, _ = found
         return account_load
 
     async def sign_in_with_oauth(self, session: AsyncSession,
                                  account_sign_in_with_oauth: AccountSignInWithOauth) -> AccountLoad:
-        account_is_new = False
-        user_is_new = False
-        update_user = False
-        # Get user account
-        try:
-            account = await self.load_by_provider_account_id(session, account_sign_in_with_oauth.provider_account_id)
-        except HTTPException as e:
-            # Account do not exists, let's create one.
-            if e.status_code == status.HTTP_404_NOT_FOUND:
-                account_is_new = True
-                account = AccountCreate(
-                    username=account_sign_in_with_oauth.user.username,
-                    image=account_sign_in_with_oauth.user.image,
-                    provider=account_sign_in_with_oauth.provider,
-                    provider_account_id=account_sign_in_with_oauth.provider_account_id,
-                    password=None,
-                    user_id=None,
+        """Signs in with an OAuth provider, creating the user and the account on first sign-in.
+
+        A returning user costs one joined lookup, or none when it is cached, plus an
+        UPDATE when the image changed. A new account is created with two upserts, so
+        concurrent first sign-ins of the same user do not fail.
+        """
+        provider_account_id = account_sign_in_with_oauth.provider_account_id
+        user_in = account_sign_in_with_oauth.user
+
+        found = await self._find_oauth_account(session, provider_account_id)
+        if found is not None:
+            account_load, user_image = found
+            if user_image != user_in.image and account_load.user_id is not None:
+                await session.execute(
+                    update(User)
+                    .where(User.id == account_load.user_id)
+                    .values(image=user_in.image, updated_at=datetime.now(timezone.utc))
                 )
+                await session.commit()
+                user_service.cache.invalidate(account_load.user_id)
+                self.provider_account_cache.set(provider_account_id, (account_load, user_in.image))
+            return account_load
 
-        # Check if user exists
+        # Create the user, or update the image of the user with this email. The username
+        # of the provider may already be taken by another user.
+        username = await self._free_username(session, user_in.username, user_in.email)
+        user_values = User(**user_in.model_dump(exclude={"username"}), username=username).model_dump(exclude={"id"})
+        user_stmt = dialect_insert(session, User).values(user_values)
+        user_stmt = user_stmt.on_conflict_do_update(
+            index_elements=[User.email],
+            set_=dict(image=user_stmt.excluded.image, updated_at=user_stmt.excluded.updated_at),
+        ).returning(User.id)
         try:
-            user = await user_service.load_by_email(session, account_sign_in_with_oauth.user.email)
-            # User existis, let's updat it.
-            if user.image != account_sign_in_with_oauth.user.image:
-                result = await session.execute(select(User).where(User.id == user.id))
-                user = result.scalar_one_or_none()
-                update_user = True
-                user.image = account_sign_in_with_oauth.user.image
-                session.add(user)
-
-        except HTTPException as e:
-            # User do not exists, let's create one.
-            if e.status_code == status.HTTP_404_NOT_FOUND:
-                user_is_new = True
-                user = account_sign_in_with_oauth.user
-                user = User(**user.model_dump())
-                session.add(user)
-                await session.flush()
-        except Exception as e:
-            print(e)
-
-        if account_is_new:
-            new_account = Account(**account.model_dump())
-            new_account.user_id = user.id
-            session.add(new_account)
-            account = new_account
-
-        if account_is_new or user_is_new or update_user:
-            await session.commit()
-            await session.refresh(account)
-            await session.refresh(user)
+            user_id = (await session.execute(user_stmt)).scalar_one()
+        except IntegrityError as e:
+            await session.rollback()
+            raise user_conflict(e)
 
-        account_load = AccountLoad.model_validate(account)
+        account = Account(
+            username=username,
+            image=user_in.image,
+            provider=account_sign_in_with_oauth.provider,
+            provider_account_id=provider_account_id,
+            password=None,
+            user_id=user_id,
+        )
+        account_stmt = dialect_insert(session, Account).values(account.model_dump(exclude={"id"}))
+        account_stmt = account_stmt.on_conflict_do_update(
+            index_elements=[Account.provider_account_id, Account.username],
+            set_=dict(image=account_stmt.excluded.image),
+        ).returning(*Account.__table__.columns)
+        account_row = (await session.execute(account_stmt)).one()
+        await session.commit()
+        user_service.cache.invalidate(user_id)
+
+        account_load = AccountLoad.model_validate(account_row._mapping)
+        self.provider_account_cache.set(provider_account_id, (account_load, user_in.image))
         return account_load
 
+    async def delete(self, session: AsyncSession, db_obj: Account, commit: bool = True) -> None:
+        """Deletes an account and forgets its cached provider lookup."""
+        await super().delete(session, db_obj, commit=commit)
+        self.provider_account_cache.pop(db_obj.provider_account_id)
+
+    async def _find_oauth_account(
+        self, session: AsyncSession, provider_account_id: str
+    ) -> Tuple[AccountLoad, str | None] | None:
+        """Returns the account with a provider account id and the image of its user.
+
+        Both come from a single joined query. Results, including misses, are cached
+        briefly since they are looked up on every new browser session.
+        """
+        found = self.provider_account_cache.get(provider_account_id)
+        if found is not MISSING:
+            return found
+
+        stmt = (
+            select(Account, User.image)
+            .outerjoin(User, User.id == Account.user_id)
+            .where(Account.provider_account_id == provider_account_id)
+            .limit(1)
+        )
+        row = (await session.execute(stmt)).first()
+        if row is None:
+            self.provider_account_cache.set(provider_account_id, None, ttl=NEGATIVE_CACHE_TTL)
+            return None
+
+        account, user_image = row
+        found = (AccountLoad.model_validate(account), user_image)
+        self.provider_account_cache.set(provider_account_id, found)
+        return found
+
+    @staticmethod
+    async def _free_username(session: AsyncSession, username: str, email: str) -> str:
+        """Returns `username`, or a variant with a random suffix if a user with another email has it.
+
+        A username taken concurrently between the check and the insert still ends in a 409.
+        """
+        candidate = username
+        for _ in range(USERNAME_ATTEMPTS):
+            owner = (await session.execute(select(User.email).where(User.username == candidate))).scalar_one_or_none()
+            if owner is None or owner == email:
+                return candidate
+            candidate = f"{username}-{secrets.token_hex(3)}"
+        return candidate
+
     async def sign_up_with_credentials(self, session: AsyncSession,
                                        account_sign_up_with_credentials: AccountSignUpWithCredentials) -> AccountLoad:
-        user_exists = True
-        # Check user by email.
+        """Creates a user and its email account.
+
+        The password is hashed before the transaction starts. Duplicates are detected by
+        the unique indexes of the user and account tables rather than by lookups.
+
+        Raises:
+            HTTPException: 409 if the email or the username is already taken.
+        """
+        password_hashed = await self.password_hasher.hash(account_sign_up_with_credentials.password)
+        new_user = User(
+            name=account_sign_up_with_credentials.name,
+            username=account_sign_up_with_credentials.username,
+            email=account_sign_up_with_credentials.email,
+            image="",
+            reputation=0,
+        )
+        account = Account(
+            username=account_sign_up_with_credentials.username,
+            image=None,
+            provider="email",
+            provider_account_id=account_sign_up_with_credentials.email,
+            password=password_hashed,
+        )
+        session.add(new_user)
         try:
-            user_by_email = await user_service.load_by_email(session, account_sign_up_with_credentials.email)
-        except HTTPException as e:
-            if e.status_code == status.HTTP_404_NOT_FOUND:
-                user_exists = False
-            else:
-                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already exists")
-
-        # Check user by username
+            await session.flush()
+        except IntegrityError as e:
+            await session.rollback()
+            raise user_conflict(e)
+
+        account.user_id = new_user.id
+        session.add(account)
         try:
-            user_by_username = await user_service.load_by_username(session, account_sign_up_with_credentials.username)
-        except HTTPException as e:
-            if e.status_code == status.HTTP_404_NOT_FOUND:
-                user_exists = False
-            else:
-                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Username already exists")
-
-        # Create the user
-        if user_exists:
-            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="User already exists")
-        else:
-            new_user = User(
-                name=account_sign_up_with_credentials.name,
-                username=account_sign_up_with_credentials.username,
-                email=account_sign_up_with_credentials.email,
-                image="",
-                reputation=0,
-            )
-            session.add(new_user)
             await session.flush()
-            password_hashed = bcrypt.hashpw(account_sign_up_with_credentials.password.encode(), bcrypt.gensalt())
-            account = Account(
-                username=account_sign_up_with_credentials.username,
-                image=None,
-                provider="email",
-                provider_account_id=account_sign_up_with_credentials.email,
-                user_id=new_user.id,
-                password=password_hashed,
-            )
-            session.add(account)
-            await session.commit()
-            await session.refresh(account)
-            await session.refresh(new_user)
+        except IntegrityError:
+            await session.rollback()
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Account already exists")
 
-            account_load = AccountLoad.model_validate(account)
-            return account_load
+        account_load = AccountLoad.model_validate(account)
+        await session.commit()
+        return account_load
 
     async def get_account_by_credentials(self, session: AsyncSession, sign_in_account = AccountSignInWithCredentials) -> AccountLoad:
         stmt = (select(Account)
@@ -195,11 +256,15 @@ class AccountService(BaseModelService[Account, AccountCreate, AccountLoad, Accou
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account not found")
 
         # Check hashed password.
-        try :
-            if bcrypt.checkpw(sign_in_account.password.encode(), account.password):
-                account_load = AccountLoad.model_validate(account)
-                return account_load
-            else:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account not found")
-        except Exception as e:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Error performing authentication")
\ No newline at end of file
+        if not await self.password_hasher.verify(sign_in_account.password, account.password):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account not found")
+
+        # Upgrade the hash transparently when the work factor changed.
+        if self.password_hasher.needs_rehash(account.password):
+            account.password = await self.password_hasher.hash(sign_in_account.password)
+            session.add(account)
+            await session.commit()
+            await session.refresh(account)
+
+        account_load = AccountLoad.model_validate(account)
+        return account_load
@@ -0,0 +1,98 @@
+"""This module provides the password hasher used by the account service."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from app.core.metrics import LatencyStats
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords with bcrypt off the event loop.
+
+    bcrypt is deliberately slow (~100-300 ms per call), so calling it inside a request
+    handler blocks every other request of the worker. The calls run on a dedicated,
+    bounded thread pool instead; bcrypt releases the GIL while hashing, so the threads
+    run in parallel. When more than `max_pending` calls are waiting, new ones are
+    rejected with a 503 instead of queueing up behind a login storm.
+    """
+
+    def __init__(self, rounds: int = 12, max_workers: int = 4, max_pending: int = 64):
+        """Initializes the PasswordHasher.
+
+        Args:
+            rounds: The bcrypt work factor of new hashes.
+            max_workers: The number of threads hashing passwords.
+            max_pending: The maximum number of calls running or waiting for a thread.
+        """
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hasher")
+        self._pending = 0
+        self._rejected = 0
+        self._hash_stats = LatencyStats()
+        self._verify_stats = LatencyStats()
+
+    async def hash(self, password: str) -> str:
+        """Returns the bcrypt hash of a password."""
+        return await self._run(self._hash_stats, self._hash_sync, password)
+
+    async def verify(self, password: str, hashed: str | bytes | None) -> bool:
+        """Returns whether a password matches a bcrypt hash."""
+        if not hashed:
+            return False
+        return await self._run(self._verify_stats, self._verify_sync, password, hashed)
+
+    def needs_rehash(self, hashed: str | bytes) -> bool:
+        """Returns whether a hash was made with a different work factor than the current one."""
+        if isinstance(hashed, bytes):
+            hashed = hashed.decode()
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def metrics(self) -> Dict[str, Any]:
+        """Returns the current load and the latency of the hasher."""
+        return {
+            "rounds": self.rounds,
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "rejected": self._rejected,
+            "hash": self._hash_stats.snapshot(),
+            "verify": self._verify_stats.snapshot(),
+        }
+
+    async def _run(self, stats: LatencyStats, func, *args):
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        self._pending += 1
+        try:
+            with stats.time():
+                return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+
+    def _hash_sync(self, password: str) -> str:
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(self.rounds)).decode()
+
+    @staticmethod
+    def _verify_sync(password: str, hashed: str | bytes) -> bool:
+        if isinstance(hashed, str):
+            hashed = hashed.encode()
+        try:
+            return bcrypt.checkpw(password.encode(), hashed)
+        except ValueError:
+            # Not a bcrypt hash.
+            return False
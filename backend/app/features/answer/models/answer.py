@@ -67,4 +67,5 @@ class AnswersForQuestionResponse(SQLModel):
     """Schema for the response of answers for a question endpoint."""
 
     answers: List[AnswerLoad]
-    total: int
+    total: int | None
+    has_more: bool = False
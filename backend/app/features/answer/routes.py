@@ -2,6 +2,8 @@
 
 from typing import List
 from app.core import get_session
+from app.core.export import ExportFormat, export_response
+from app.core.pagination import TotalStrategy
 from app.features.answer.models.answer import (
     Answer,
     AnswerCreate,
@@ -102,14 +104,33 @@ async def get_answers_for_question(
     page: int = 1,
     page_size: int = 10,
     filter: str = "",
-    session: AsyncSession = Depends(get_session),
+    totals: TotalStrategy = TotalStrategy.EXACT,
 ):
     """Gets all answers for a given question with total count.
 
+    Identical concurrent requests share a single query.
+
     Args:
         question_id: The question id.
         page: The page number.
         page_size: Number of answers per page.
-        session: The database session.
+        filter: The order of the answers.
+        totals: How the total is computed: exact, estimate (the maintained answer count) or none.
+    """
+    return await answer_service.get_answers_for_question_shared(question_id, page, page_size, filter, totals)
+
+
+@router.get("/export")
+async def export_answers(format: ExportFormat = ExportFormat.NDJSON):
+    """Streams all Answers as NDJSON or CSV.
+
+    Args:
+        format: The output format.
     """
-    return await answer_service.get_answers_for_question(session, question_id, page, page_size, filter)
+    return export_response(Answer, format, "answers")
+
+
+@router.get("/single-flight/metrics")
+async def single_flight_metrics():
+    """Returns how many answers-for-question queries of this worker were shared."""
+    return answer_service.answers_for_question_flight.metrics()
@@ -1,14 +1,24 @@
 """This module provides the service for the Answer feature."""
 
+import asyncio
 from typing import List, Type
 
+from fastapi import HTTPException, status
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload, selectinload
-from sqlmodel import desc, func, select
+from sqlalchemy.orm import joinedload, noload
+from sqlmodel import desc, func, select, update
 
 from sqlalchemy.exc import IntegrityError
 
+from app.core import session_scope
 from app.core.lib.base_model_service import BaseModelService
+from app.core.pagination import TotalStrategy, paginate
+from app.core.single_flight import SingleFlight
+from app.features.question.models.question import Question
+from app.features.outbox.routes import outbox_service
+from app.features.question.routes import question_service
+from app.features.user.routes import user_service, user_summary_worker
 from ..models.answer import Answer, AnswerCreate, AnswerLoad, AnswerUpdate, AnswersForQuestionResponse
 
 
@@ -36,12 +46,28 @@ class AnswerService(BaseModelService[Answer, AnswerCreate, AnswerLoad, AnswerUpd
         super().__init__(model, create_schema, load_schema, update_schema)
         # The base BaseModelService includes a basic CRUD operation.
         # Feel free to override its functionality for more complex use cases.
+        self.answers_for_question_flight = SingleFlight("answers-for-question")
+
+    async def load(self, session: AsyncSession, id: int) -> AnswerLoad | None:
+        """Loads an answer, attaching its user from the user cache."""
+        result = await session.execute(select(Answer).where(Answer.id == id).options(noload(Answer.user)))
+        answer = result.scalar_one_or_none()
+        if answer is None:
+            return None
+        answer_load = AnswerLoad.model_validate(answer)
+        answer_load.user = await user_service.cache.load(session, answer.user_id)
+        return answer_load
 
     async def create(self, session: AsyncSession, obj_in: AnswerCreate, commit: bool = True) -> AnswerLoad:
         obj = self.model(**obj_in.model_dump())
         session.add(obj)
         try:
             await session.flush()
+            await self.update_num_answers(session, obj.question_id, 1)
+            await user_service.stats.increment(session, obj.user_id, num_answers=1)
+            outbox_service.append(
+                session, "answer.created", answer_id=obj.id, question_id=obj.question_id, user_id=obj.user_id
+            )
             if commit:
                 await session.commit()
                 await session.refresh(obj, ["user"])
@@ -50,6 +76,57 @@ class AnswerService(BaseModelService[Answer, AnswerCreate, AnswerLoad, AnswerUpd
             await session.rollback()
             raise e
 
+    async def delete(self, session: AsyncSession, db_obj: Answer, commit: bool = True) -> None:
+        """Deletes an answer and updates the answer count of its question and the statistics and summary of its user."""
+        answer = await session.get(Answer, db_obj.id)
+        if answer is None:
+            return
+        question_id = answer.question_id
+        user_id = answer.user_id
+        await user_service.stats.increment(
+            session, user_id, num_answers=-1, answer_upvotes=-(answer.upvotes or 0)
+        )
+        await session.delete(answer)
+        await session.flush()
+        await self.update_num_answers(session, question_id, -1)
+        if commit:
+            await session.commit()
+        user_summary_worker.mark(user_id)
+
+    @staticmethod
+    async def update_num_answers(session: AsyncSession, question_id: int, delta: int) -> None:
+        """Adjusts the maintained answer count of a question and refreshes its hot score."""
+        await session.execute(
+            update(Question)
+            .where(Question.id == question_id)
+            .values(num_answers=func.coalesce(Question.num_answers, 0) + delta)
+        )
+        await question_service.update_hot_score(session, question_id, commit=False)
+
+    async def get_answers_for_question_shared(
+        self,
+        question_id: int,
+        page: int = 1,
+        page_size: int = 10,
+        filter: str = "",
+        totals: TotalStrategy = TotalStrategy.EXACT,
+    ) -> AnswersForQuestionResponse:
+        """Retrieves a page of answers, sharing the query with identical concurrent calls.
+
+        Raises:
+            HTTPException: 504 if the query takes longer than the single-flight timeout.
+        """
+
+        async def get_answers() -> AnswersForQuestionResponse:
+            async with session_scope() as session:
+                return await self.get_answers_for_question(session, question_id, page, page_size, filter, totals)
+
+        key = (question_id, page, page_size, filter, totals)
+        try:
+            return await self.answers_for_question_flight.do(key, get_answers)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Loading the answers timed out")
+
     async def get_answers_for_question(
         self,
         session: AsyncSession,
@@ -57,6 +134,7 @@ class AnswerService(BaseModelService[Answer, AnswerCreate, AnswerLoad, AnswerUpd
         page: int = 1,
         page_size: int = 10,
         filter: str = "",
+        totals: TotalStrategy = TotalStrategy.EXACT,
     ) -> AnswersForQuestionResponse:
         """
         Retrieves answers for a specific question with pagination and total count.
@@ -66,6 +144,7 @@ class AnswerService(BaseModelService[Answer, AnswerCreate, AnswerLoad, AnswerUpd
             question_id: The ID of the question to get answers for.
             page (int): The page number (default 1).
             page_size (int): Number of answers per page (default 10).
+            totals (TotalStrategy): How the total is computed (default exact).
 
         Returns:
             AnswersForQuestionResponse: Object containing the list of answers and total count.
@@ -80,19 +159,19 @@ class AnswerService(BaseModelService[Answer, AnswerCreate, AnswerLoad, AnswerUpd
 
         smtm = (
             select(Answer)
-            .options(selectinload(Answer.user))
+            .options(noload(Answer.user))
             .where(Answer.question_id == question_id)
-            .offset((page - 1) * page_size)
-            .limit(page_size)
             .order_by(order)
         )
 
-        result = await session.execute(smtm)
-        answers = result.scalars().all()
-        answers_list = [AnswerLoad.model_validate(answer) for answer in answers]
+        async def estimate(read_session: AsyncSession) -> int | None:
+            # The answer count maintained on the question.
+            return await read_session.scalar(select(Question.num_answers).where(Question.id == question_id))
 
-        count_stmt = select(func.count()).select_from(Answer).where(Answer.question_id == question_id)
-        total_result = await session.execute(count_stmt)
-        total = total_result.scalar() or 0
+        result = await paginate(session, smtm, page, page_size, totals, estimate=estimate)
+        users = await user_service.cache.load_many(session, [answer.user_id for answer in result.items])
+        answers_list = [AnswerLoad.model_validate(answer) for answer in result.items]
+        for answer in answers_list:
+            answer.user = users.get(answer.user_id)
 
-        return AnswersForQuestionResponse(answers=answers_list, total=total)
+        return AnswersForQuestionResponse(answers=answers_list, total=result.total, has_more=result.has_more)
@@ -0,0 +1,29 @@
+"""This module defines the data models for the Idempotency feature."""
+
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+import sqlalchemy as sa
+from sqlmodel import Field, SQLModel
+
+
+class IdempotencyKey(SQLModel, table=True):
+    """Represents an idempotency key sent by a user to a route, with the result of its request.
+
+    Rows are added in the transaction of the request they deduplicate, so a key exists
+    if and only if its request was applied, and deleted once they expire.
+    """
+
+    __tablename__ = "idempotency_key"
+
+    id: int | None = Field(default=None, primary_key=True)
+    user_id: int
+    route: str
+    key: str
+    fingerprint: str
+    result: Dict[str, Any] | None = Field(default=None, sa_column=sa.Column(sa.JSON, nullable=True))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), index=True)
+
+    __table_args__ = (
+        sa.Index("ix_idempotency_key_user_id_route_key", "user_id", "route", "key", unique=True),
+    )
@@ -0,0 +1,25 @@
+"""This module provides the routes for the Idempotency feature."""
+
+from fastapi import APIRouter
+
+from app.core.scheduler import job_scheduler
+from app.core.settings import settings
+
+from .services.idempotency_services import IdempotencyService
+
+router = APIRouter(prefix="/api/v1/idempotency", tags=["idempotency"])
+
+idempotency_service = IdempotencyService(ttl=settings.IDEMPOTENCY_KEY_TTL)
+
+
+async def _delete_expired_keys() -> None:
+    await idempotency_service.delete_expired()
+
+
+job_scheduler.register("delete-expired-idempotency-keys", _delete_expired_keys, interval=3600)
+
+
+@router.get("/metrics")
+async def metrics():
+    """Returns how many retried requests of this worker were deduplicated, by route."""
+    return idempotency_service.metrics()
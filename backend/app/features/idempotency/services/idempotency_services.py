@@ -0,0 +1,112 @@
+"""This module provides the service for the Idempotency feature."""
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import delete, select, update
+
+from app.core import dialect_insert, session_scope
+
+from ..models.idempotency_key import IdempotencyKey
+
+
+class IdempotencyService:
+    """Applies each request at most once per idempotency key sent by the client.
+
+    A request carrying a key claims it with `claim`, which inserts the key, and stores
+    its result with `record`, both in the transaction of the request: the key is stored
+    if and only if the request was applied, by any worker. A retry finds the key and
+    gets the stored result without applying the request again. A retry arriving while
+    the first attempt is running waits on the unique index of the key until the first
+    attempt commits, or claims the key if it rolls back.
+
+    Keys are scoped per user and route, and deleted `ttl` seconds after their first use.
+    """
+
+    def __init__(self, ttl: float):
+        """Initializes the IdempotencyService.
+
+        Args:
+            ttl: The number of seconds a key is kept for.
+        """
+        self.ttl = ttl
+        self._replays: Counter[str] = Counter()
+
+    async def claim(
+        self, session: AsyncSession, user_id: int, route: str, key: str, fingerprint: str
+    ) -> Dict[str, Any] | None:
+        """Claims a key for a request, or returns the result stored by its first attempt.
+
+        Args:
+            session: The session of the request, not committed by the claim.
+            user_id: The ID of the User sending the request.
+            route: The name of the route, e.g. "do-vote".
+            key: The idempotency key sent by the client.
+            fingerprint: Identifies the request, e.g. its arguments. A key can only be
+                reused with the same fingerprint.
+
+        Returns:
+            None if the request should be applied, otherwise the result of its first attempt.
+
+        Raises:
+            HTTPException: 422 if the key was used for a different request.
+        """
+        smtm = dialect_insert(session, IdempotencyKey).values(
+            user_id=user_id, route=route, key=key, fingerprint=fingerprint, created_at=datetime.now(timezone.utc)
+        )
+        inserted = await session.execute(
+            smtm.on_conflict_do_nothing(
+                index_elements=[IdempotencyKey.user_id, IdempotencyKey.route, IdempotencyKey.key]
+            )
+        )
+        if inserted.rowcount:
+            return None
+
+        result = await session.execute(
+            select(IdempotencyKey.fingerprint, IdempotencyKey.result).where(*self._where(user_id, route, key))
+        )
+        stored_fingerprint, stored_result = result.one()
+        if stored_fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Idempotency key {key!r} was already used for a different request",
+            )
+        self._replays[route] += 1
+        return stored_result
+
+    async def record(
+        self, session: AsyncSession, user_id: int, route: str, key: str, result: Dict[str, Any]
+    ) -> None:
+        """Stores the result of a request with the key it claimed, before it commits.
+
+        Args:
+            session: The session of the request.
+            user_id: The ID of the User sending the request.
+            route: The name of the route.
+            key: The idempotency key claimed by the request.
+            result: The JSON-serializable result returned to the retries.
+        """
+        await session.execute(update(IdempotencyKey).where(*self._where(user_id, route, key)).values(result=result))
+
+    async def delete_expired(self) -> int:
+        """Deletes the keys older than `ttl` and returns how many were deleted."""
+        expired_before = datetime.now(timezone.utc) - timedelta(seconds=self.ttl)
+        async with session_scope() as session:
+            result = await session.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < expired_before))
+            await session.commit()
+            return result.rowcount
+
+    def metrics(self) -> Dict[str, Any]:
+        """Returns how many retries of each route were deduplicated by this worker."""
+        return {"replays": dict(self._replays)}
+
+    @staticmethod
+    def _where(user_id: int, route: str, key: str) -> tuple:
+        return (
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.route == route,
+            IdempotencyKey.key == key,
+        )
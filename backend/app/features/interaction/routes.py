@@ -1,6 +1,7 @@
 """This module provides the routes for the Interaction feature."""
 
 from app.core import get_session
+from app.core.export import ExportFormat, export_response
 from app.features.interaction.models.interaction import Interaction, InteractionCreate, InteractionLoad, \
     InteractionUpdate
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -87,3 +88,13 @@ async def delete(interaction_id: int, session: AsyncSession = Depends(get_sessio
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Interaction not found")
     await interaction_service.delete(session, db_obj)
     return {"message": "Interaction deleted successfully"}
+
+
+@router.get("/export")
+async def export_interactions(format: ExportFormat = ExportFormat.NDJSON):
+    """Streams all Interactions as NDJSON or CSV.
+
+    Args:
+        format: The output format.
+    """
+    return export_response(Interaction, format, "interactions")
@@ -1,7 +1,11 @@
 """This module provides the service for the Interaction feature."""
 from typing import Type
 
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from app.core.lib.base_model_service import BaseModelService
+from ...recommendation.routes import recommendation_worker
+from ...user.routes import user_summary_worker
 
 from ..models.interaction import Interaction, InteractionCreate, InteractionLoad, InteractionUpdate
 
@@ -22,4 +26,11 @@ class InteractionService(BaseModelService[Interaction, InteractionCreate, Intera
         """
         super().__init__(model, create_schema, load_schema, update_schema)
         # The base BaseModelService includes a basic CRUD operation.
-        # Feel free to override its functionality for more complex use cases.
\ No newline at end of file
+        # Feel free to override its functionality for more complex use cases.
+
+    async def create(self, session: AsyncSession, obj_in: InteractionCreate, commit: bool = True) -> InteractionLoad:
+        """Creates a new Interaction and schedules a refresh of the user's recommendations and summary."""
+        interaction = await super().create(session, obj_in, commit=commit)
+        recommendation_worker.mark(interaction.user_id)
+        user_summary_worker.mark(interaction.user_id)
+        return interaction
@@ -0,0 +1,27 @@
+"""This module defines the data models for the Outbox feature."""
+
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+import sqlalchemy as sa
+from sqlmodel import Field, SQLModel
+
+
+class OutboxEvent(SQLModel, table=True):
+    """Represents a domain event waiting to be dispatched to its subscribers.
+
+    Rows are added by the services in the transaction of the change they describe and
+    deleted once every subscriber of their topic handled them. A dispatcher leases the
+    rows it handles until `locked_until`; the error of the last failed attempt is kept
+    in `last_error`.
+    """
+
+    __tablename__ = "outbox_event"
+
+    id: int | None = Field(default=None, primary_key=True)
+    topic: str
+    payload: Dict[str, Any] = Field(default_factory=dict, sa_column=sa.Column(sa.JSON, nullable=False))
+    attempts: int = 0
+    locked_until: datetime | None = None
+    last_error: str | None = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
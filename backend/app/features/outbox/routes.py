@@ -0,0 +1,43 @@
+"""This module provides the routes for the Outbox feature."""
+
+from fastapi import APIRouter, Depends, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core import get_session, session_scope
+from app.core.health import health_checks
+from app.core.scheduler import job_scheduler
+from app.core.settings import settings
+
+from .services.outbox_services import OutboxService
+
+router = APIRouter(prefix="/api/v1/outbox", tags=["outbox"])
+
+outbox_service = OutboxService()
+
+
+async def _dispatch_outbox() -> None:
+    await outbox_service.dispatch_pending()
+
+
+job_scheduler.register("dispatch-outbox", _dispatch_outbox, interval=settings.OUTBOX_DISPATCH_INTERVAL, jitter=0.2)
+
+
+async def _outbox_health() -> dict:
+    async with session_scope() as session:
+        return {"pending": await outbox_service.pending_count(session)}
+
+
+health_checks.register("outbox", _outbox_health)
+
+
+@router.post("/dispatch", status_code=status.HTTP_202_ACCEPTED)
+async def dispatch():
+    """Schedules a dispatch of the pending events."""
+    await job_scheduler.trigger("dispatch-outbox")
+    return {"message": "Outbox dispatch has been scheduled."}
+
+
+@router.get("/metrics")
+async def metrics(session: AsyncSession = Depends(get_session)):
+    """Returns the number of pending, dead and dispatched events."""
+    return await outbox_service.metrics(session)
@@ -0,0 +1,184 @@
+"""This module provides the service for the Outbox feature."""
+
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import delete, func, or_, select, update
+
+from app.core import session_scope
+from app.core.settings import settings
+
+from ..models.outbox_event import OutboxEvent
+
+Handler = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+# Number of events read and dispatched at once.
+DISPATCH_BATCH_SIZE = 500
+
+# Events whose handlers failed this many times are no longer dispatched.
+MAX_ATTEMPTS = 5
+
+
+class OutboxService:
+    """The transactional outbox of the domain events emitted by the services.
+
+    A service appends an event with `append` before committing its change, so the event
+    exists if and only if the change does. `dispatch_pending` then claims the events in
+    batches, passes the payloads of each topic to the handlers subscribed to it and
+    deletes them.
+
+    A batch is claimed by committing a lease of OUTBOX_LEASE seconds on its events, so
+    no row stays locked while the handlers run and the other dispatchers skip the
+    leased events. When the handlers fail on the events of a topic, they are retried
+    one event at a time, so that one bad event does not hold back the others. The
+    events that still fail keep their error and are dispatched again once their lease
+    expires, as are the events of a dispatcher that died. Delivery is at least once, so
+    handlers must be idempotent.
+
+    Handlers run outside of any dispatching transaction and open their own sessions.
+    """
+
+    def __init__(self):
+        """Initializes the OutboxService."""
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._dispatched = 0
+        # The dispatches of a process run one at a time; those of other processes skip locked rows.
+        self._lock = asyncio.Lock()
+        self._failures = 0
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        """Registers a handler receiving the payloads of the dispatched events of a topic.
+
+        Args:
+            topic: The topic of the events, e.g. "question.created".
+            handler: The coroutine function handling a batch of payloads, in order.
+        """
+        self._handlers[topic].append(handler)
+
+    @staticmethod
+    def append(session: AsyncSession, topic: str, **payload: Any) -> None:
+        """Adds an event to the session, to be committed with the change it describes.
+
+        Args:
+            session: The session of the change.
+            topic: The topic of the event.
+            payload: The JSON-serializable data of the event.
+        """
+        session.add(OutboxEvent(topic=topic, payload=payload))
+
+    async def dispatch_pending(self) -> int:
+        """Dispatches the pending events in batches until none is left.
+
+        Returns:
+            The number of events dispatched.
+        """
+        total = 0
+        async with self._lock:
+            while True:
+                dispatched, read = await self._dispatch_batch()
+                total += dispatched
+                if read < DISPATCH_BATCH_SIZE:
+                    return total
+
+    async def metrics(self, session: AsyncSession) -> Dict[str, Any]:
+        """Returns the number of pending and dead events and of dispatched events."""
+        result = await session.execute(
+            select(OutboxEvent.attempts >= MAX_ATTEMPTS, func.count()).group_by(OutboxEvent.attempts >= MAX_ATTEMPTS)
+        )
+        counts = {bool(dead): count for dead, count in result.all()}
+        return {
+            "pending": counts.get(False, 0),
+            "dead": counts.get(True, 0),
+            "dispatched": self._dispatched,
+            "failures": self._failures,
+        }
+
+    async def pending_count(self, session: AsyncSession) -> int:
+        """Returns the number of events waiting to be dispatched."""
+        result = await session.execute(select(func.count()).where(OutboxEvent.attempts < MAX_ATTEMPTS))
+        return result.scalar() or 0
+
+    async def _dispatch_batch(self) -> tuple[int, int]:
+        """Claims and dispatches one batch of events.
+
+        Returns:
+            The number of events dispatched and the number of events claimed.
+        """
+        events = await self._claim_batch()
+        if not events:
+            return 0, 0
+
+        by_topic: Dict[str, List[tuple[int, Dict[str, Any]]]] = defaultdict(list)
+        for event_id, topic, payload in events:
+            by_topic[topic].append((event_id, payload))
+
+        done: List[int] = []
+        failed: Dict[int, str] = {}
+        for topic, topic_events in by_topic.items():
+            try:
+                await self._handle(topic, [payload for _, payload in topic_events])
+            except Exception as e:
+                print(f"outbox: error dispatching {len(topic_events)} {topic} events: {e}")
+                self._failures += 1
+                if len(topic_events) == 1:
+                    failed[topic_events[0][0]] = self._describe(e)
+                    continue
+                # Find the events failing on their own; the others are dispatched.
+                for event_id, payload in topic_events:
+                    try:
+                        await self._handle(topic, [payload])
+                    except Exception as event_error:
+                        failed[event_id] = self._describe(event_error)
+                    else:
+                        done.append(event_id)
+            else:
+                done.extend(event_id for event_id, _ in topic_events)
+
+        async with session_scope() as session:
+            if done:
+                await session.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(done)))
+            for event_id, error in failed.items():
+                await session.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id == event_id)
+                    .values(attempts=OutboxEvent.attempts + 1, last_error=error)
+                )
+            await session.commit()
+        self._dispatched += len(done)
+        return len(done), len(events)
+
+    async def _claim_batch(self) -> List[tuple[int, str, Dict[str, Any]]]:
+        """Leases the next batch of events that are neither dead nor leased, and returns them."""
+        now = datetime.now(timezone.utc)
+        async with session_scope() as session:
+            # Concurrent dispatchers of other workers skip the rows locked by this one.
+            result = await session.execute(
+                select(OutboxEvent.id, OutboxEvent.topic, OutboxEvent.payload)
+                .where(
+                    OutboxEvent.attempts < MAX_ATTEMPTS,
+                    or_(OutboxEvent.locked_until.is_(None), OutboxEvent.locked_until < now),
+                )
+                .order_by(OutboxEvent.id)
+                .limit(DISPATCH_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            events = [tuple(row) for row in result.all()]
+            if events:
+                await session.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id.in_([event_id for event_id, _, _ in events]))
+                    .values(locked_until=now + timedelta(seconds=settings.OUTBOX_LEASE))
+                )
+                await session.commit()
+            return events
+
+    async def _handle(self, topic: str, payloads: List[Dict[str, Any]]) -> None:
+        for handler in self._handlers.get(topic, []):
+            await handler(payloads)
+
+    @staticmethod
+    def _describe(error: Exception) -> str:
+        return f"{type(error).__name__}: {error}"
@@ -11,6 +11,7 @@ from app.features.answer.models.answer import AnswerLoad
 from app.features.tag.models.tag import TagLoad
 from app.features.user.models.user import UserLoad
 from .question_tag_relationship import QuestionTagRelationship
+from .related_question import RelatedQuestionLoad
 
 if TYPE_CHECKING:
     from app.features.answer.models.answer import Answer
@@ -26,6 +27,7 @@ class QuestionBase(SQLModel):
     views: int | None
     upvotes: int | None = 0
     downvotes: int | None = 0
+    num_answers: int | None = 0
     author_id: int = Field(foreign_key="user.id")
 
 
@@ -35,6 +37,7 @@ class Question(QuestionBase, table=True):
     id: int | None = Field(primary_key=True)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime | None = Field(default_factory=lambda: datetime.now(timezone.utc))
+    hot_score: float | None = Field(default=0, index=True)
     answers: List["Answer"] | None = Relationship(back_populates="question")
     tags: List["Tag"] = Relationship(back_populates="questions", link_model=QuestionTagRelationship)
     author: Optional["User"] = Relationship(back_populates="questions")
@@ -79,3 +82,4 @@ class QuestionLoad(QuestionBase):
     author: Optional[UserLoad]
     answers: List[AnswerLoad] | None
     views: int | None = 0
+    related_questions: List[RelatedQuestionLoad] | None = None
@@ -0,0 +1,28 @@
+"""This module defines the data models for the precomputed related questions."""
+
+import sqlalchemy as sa
+from sqlmodel import SQLModel, Field
+
+
+class RelatedQuestion(SQLModel, table=True):
+    """Represents a question related to another one by the tags they share.
+
+    Rows are maintained by the RelatedQuestionService whenever the tags of a question
+    change, so the related questions of a page are a single range scan over the
+    (question_id, score) index.
+    """
+
+    __tablename__ = "related_question"
+    question_id: int = Field(foreign_key="question.id", primary_key=True, ondelete="CASCADE")
+    related_question_id: int = Field(foreign_key="question.id", primary_key=True, ondelete="CASCADE")
+    score: float
+
+    __table_args__ = (sa.Index("ix_related_question_question_id_score", "question_id", "score"),)
+
+
+class RelatedQuestionLoad(SQLModel):
+    """Schema for loading a related question."""
+
+    id: int
+    title: str
+    score: float
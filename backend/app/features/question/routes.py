@@ -1,15 +1,22 @@
 """This module provides the routes for the Question feature."""
 
-from app.core import get_session
+from app.core import get_session, session_scope
+from app.core.concurrent_reads import run_concurrently, run_read
+from app.core.export import ExportFormat, export_response
+from app.core.scheduler import job_scheduler
+from app.core.settings import settings
+from app.core.warmup import cache_warmer
 from app.features.question.models.question import (
     Question,
     QuestionCreate,
     QuestionLoad,
     QuestionUpdate,
 )
+from app.features.outbox.routes import outbox_service
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlmodel import desc, select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from typing import List
+from typing import Any, Dict, List
 
 from .services.question_services import QuestionService
 
@@ -20,13 +27,83 @@ question_service = QuestionService(
 )
 
 
+async def _rebuild_related_questions() -> None:
+    async with session_scope() as session:
+        await question_service.related_questions.rebuild(session)
+
+
+# Repairs the related questions maintained on each question change.
+job_scheduler.register("rebuild-related-questions", _rebuild_related_questions, interval=24 * 3600)
+
+
+async def _on_questions_changed(events: List[Dict[str, Any]]) -> None:
+    """Updates the counts of the tags and the related questions of created or updated questions."""
+    tag_names = sorted({tag_name for event in events for tag_name in event["tag_names"]})
+    question_ids = sorted({event["question_id"] for event in events if event["tags_changed"]})
+    async with session_scope() as session:
+        await question_service.update_num_questions_in_tags(session, tag_names, commit=False)
+        for question_id in question_ids:
+            await question_service.related_questions.refresh(session, question_id, commit=False)
+        await session.commit()
+
+
+outbox_service.subscribe("question.created", _on_questions_changed)
+outbox_service.subscribe("question.updated", _on_questions_changed)
+
+# The orders of the question lists, whose first pages are requested the most.
+WARMUP_FILTERS = ("", "newest", "popular", "unanswered", "recommended", "hot")
+
+
+async def _warm_question_lists() -> None:
+    """Loads the first pages of every question list.
+
+    This caches the users they show; the pages themselves are not cached by the worker,
+    only brought into the buffer cache of the database.
+    """
+    await run_concurrently(
+        *(
+            lambda session, page=page, filter=filter: question_service.get_questions(session, page, filter=filter)
+            for filter in WARMUP_FILTERS
+            for page in range(1, settings.WARMUP_QUESTION_PAGES + 1)
+        )
+    )
+
+
+async def _warm_top_questions() -> None:
+    """Loads the most viewed questions with their related questions.
+
+    This caches their authors and the users of their answers; the questions themselves
+    are not cached by the worker, only brought into the buffer cache of the database.
+    """
+
+    async def top_question_ids(session: AsyncSession) -> List[int]:
+        result = await session.execute(
+            select(Question.id).order_by(desc(Question.views)).limit(settings.WARMUP_TOP_QUESTIONS)
+        )
+        return list(result.scalars().all())
+
+    question_ids = await run_read(top_question_ids)
+    await run_concurrently(
+        *(
+            lambda session, question_id=question_id: question_service.load(session, question_id, include_related=True)
+            for question_id in question_ids
+        )
+    )
+
+
+cache_warmer.register("question-lists", _warm_question_lists)
+cache_warmer.register("top-questions", _warm_top_questions)
+
+
 @router.get("/load/{question_id}", response_model=QuestionLoad)
-async def get_question(question_id: int, session: AsyncSession = Depends(get_session)):
+async def get_question(question_id: int, include_related: bool = False):
     """Loads a Question by its ID.
 
+    Identical concurrent requests share a single load.
+
     Args:
         question_id: The ID of the Question to load.
-        session: The database session.
+        include_related: Whether to include the related questions.
 
     Returns:
         The loaded Question.
@@ -34,7 +111,7 @@ async def get_question(question_id: int, session: AsyncSession = Depends(get_ses
     Raises:
         HTTPException: If the Question is not found.
     """
-    question = await question_service.load(session, question_id)
+    question = await question_service.load_shared(question_id, include_related)
     if not question:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Question not found"
@@ -111,10 +188,37 @@ async def get_questions(
     page_size: int = 10,
     query: str = "",
     filter: str = "",
+    user_id: int | None = None,
     session: AsyncSession = Depends(get_session),
 ):
-    """Get multiple questions"""
+    """Get multiple questions.
+
+    The "recommended" filter returns the personalized feed of `user_id` when given.
+    """
     questions: List[QuestionLoad] = await question_service.get_questions(
-        session, page, page_size, query, filter
+        session, page, page_size, query, filter, user_id
     )
     return questions
+
+
+@router.post("/related/rebuild", status_code=status.HTTP_202_ACCEPTED)
+async def rebuild_related_questions():
+    """Schedules a rebuild of the related questions of every question from their tags."""
+    await job_scheduler.trigger("rebuild-related-questions")
+    return {"message": "Related questions rebuild has been scheduled."}
+
+
+@router.get("/export")
+async def export_questions(format: ExportFormat = ExportFormat.NDJSON):
+    """Streams all Questions as NDJSON or CSV.
+
+    Args:
+        format: The output format.
+    """
+    return export_response(Question, format, "questions")
+
+
+@router.get("/single-flight/metrics")
+async def single_flight_metrics():
+    """Returns how many question loads of this worker were shared."""
+    return question_service.load_flight.metrics()
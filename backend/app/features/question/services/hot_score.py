@@ -0,0 +1,48 @@
+"""This module provides the hot ranking used by the "hot" question filter."""
+
+import math
+from datetime import datetime, timezone
+
+# Questions get a baseline that grows with their creation time, so a question needs ten
+# times the engagement to outrank one asked HOT_SCORE_DECAY_SECONDS later. Because the
+# decay is part of the stored score, scores never need a periodic recomputation.
+HOT_SCORE_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+HOT_SCORE_DECAY_SECONDS = 45000
+
+VIEW_WEIGHT = 0.1
+VOTE_WEIGHT = 2.0
+ANSWER_WEIGHT = 3.0
+
+
+def compute_hot_score(
+    views: int | None,
+    upvotes: int | None,
+    downvotes: int | None,
+    num_answers: int | None,
+    created_at: datetime,
+) -> float:
+    """Computes the hot score of a question.
+
+    Args:
+        views: The number of views.
+        upvotes: The number of upvotes.
+        downvotes: The number of downvotes.
+        num_answers: The number of answers.
+        created_at: When the question was created.
+
+    Returns:
+        The hot score. Higher is hotter.
+    """
+    engagement = (
+        VIEW_WEIGHT * (views or 0)
+        + VOTE_WEIGHT * ((upvotes or 0) - (downvotes or 0))
+        + ANSWER_WEIGHT * (num_answers or 0)
+    )
+    order = math.log10(max(abs(engagement), 1))
+    sign = (engagement > 0) - (engagement < 0)
+
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    age = (created_at - HOT_SCORE_EPOCH).total_seconds()
+
+    return round(sign * order + age / HOT_SCORE_DECAY_SECONDS, 7)
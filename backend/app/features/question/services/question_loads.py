@@ -0,0 +1,51 @@
+"""This module turns loaded questions into QuestionLoad objects."""
+
+from typing import List, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import noload, selectinload
+
+from app.features.answer.models.answer import Answer
+from app.features.user.routes import user_service
+
+from ..models.question import Question, QuestionLoad
+
+# Loader options of the queries whose questions are passed to `to_question_loads`.
+# The author and the answer users are not loaded with the questions: they are attached
+# from the user cache, which serves the same few active users to every request.
+QUESTION_LOAD_OPTIONS = (
+    selectinload(Question.tags),
+    selectinload(Question.answers).noload(Answer.user),
+    noload(Question.author),
+)
+
+# The same without the answers, for pages that load the answers paginated.
+QUESTION_WITHOUT_ANSWERS_LOAD_OPTIONS = (
+    selectinload(Question.tags),
+    noload(Question.answers),
+    noload(Question.author),
+)
+
+
+async def to_question_loads(session: AsyncSession, questions: Sequence[Question]) -> List[QuestionLoad]:
+    """Validates questions loaded with QUESTION_LOAD_OPTIONS, attaching their users.
+
+    The authors and answer users of all the questions are loaded in at most one query,
+    on `session`.
+    """
+    user_ids = set()
+    for question in questions:
+        user_ids.add(question.author_id)
+        user_ids.update(answer.user_id for answer in question.answers or [])
+    users = await user_service.cache.load_many(session, user_ids)
+
+    questions_load = []
+    for question in questions:
+        # Ensure views is 0 if null from database
+        question.views = question.views or 0
+        question_load = QuestionLoad.model_validate(question)
+        question_load.author = users.get(question.author_id)
+        for answer in question_load.answers or []:
+            answer.user = users.get(answer.user_id)
+        questions_load.append(question_load)
+    return questions_load
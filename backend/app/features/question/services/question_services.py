@@ -1,17 +1,29 @@
 """This module provides the service for the Question feature."""
 
+import asyncio
+from datetime import datetime, timezone
 from typing import Type, List
 
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from sqlalchemy import not_
-from sqlmodel import desc, select, func, or_
+from sqlalchemy import and_, not_
+from sqlmodel import desc, select, func, or_, update
 
+from app.core import session_scope
 from app.core.lib.base_model_service import BaseModelService
+from app.core.single_flight import SingleFlight
 from ..models.question import Question, QuestionCreate, QuestionLoad, QuestionUpdate
 from ..models.question_tag_relationship import QuestionTagRelationship
+from .hot_score import compute_hot_score
+from .question_loads import QUESTION_LOAD_OPTIONS, QUESTION_WITHOUT_ANSWERS_LOAD_OPTIONS, to_question_loads
+from .related_question_services import RelatedQuestionService
+from ...recommendation.models.recommendation import QuestionRecommendation
+from ...recommendation.routes import recommendation_worker
+from ...recommendation.services.recommendation_services import RECOMMENDATIONS_MAX_AGE
 from ...tag.models.tag import Tag
+from ...tag.routes import tag_service
+from ...outbox.routes import outbox_service
+from ...user.routes import user_service, user_summary_worker
 
 
 class QuestionService(BaseModelService[Question, QuestionCreate, QuestionLoad, QuestionUpdate]):
@@ -38,19 +50,42 @@ class QuestionService(BaseModelService[Question, QuestionCreate, QuestionLoad, Q
         super().__init__(model, create_schema, load_schema, update_schema)
         # The base BaseModelService includes a basic CRUD operation.
         # Feel free to override its functionality for more complex use cases.
-
-    async def load(self, session: AsyncSession, id: int) -> QuestionLoad | None:
-        result = await session.execute(
-            select(Question)
-            .where(Question.id == id)
-            .options(selectinload(Question.tags), selectinload(Question.author), selectinload(Question.answers)),
-        )
+        self.related_questions = RelatedQuestionService()
+        self.load_flight = SingleFlight("question-load")
+
+    async def load(
+        self, session: AsyncSession, id: int, include_related: bool = False, include_answers: bool = True
+    ) -> QuestionLoad | None:
+        options = QUESTION_LOAD_OPTIONS if include_answers else QUESTION_WITHOUT_ANSWERS_LOAD_OPTIONS
+        result = await session.execute(select(Question).where(Question.id == id).options(*options))
         question = result.scalar_one_or_none()
         if not question:
             return None
-        # Ensure views is 0 if null from database
-        question.views = question.views or 0
-        return QuestionLoad.model_validate(question)
+        [question_load] = await to_question_loads(session, [question])
+        if not include_answers:
+            question_load.answers = None
+        if include_related:
+            question_load.related_questions = await self.related_questions.get_related(session, id)
+        return question_load
+
+    async def load_shared(self, id: int, include_related: bool = False) -> QuestionLoad | None:
+        """Loads a question, sharing the load with identical concurrent calls.
+
+        A popular question is requested by many clients at once; they all wait for a
+        single load made in its own session.
+
+        Raises:
+            HTTPException: 504 if the load takes longer than the single-flight timeout.
+        """
+
+        async def load() -> QuestionLoad | None:
+            async with session_scope() as session:
+                return await self.load(session, id, include_related)
+
+        try:
+            return await self.load_flight.do((id, include_related), load)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Loading the question timed out")
 
     async def create(self, session: AsyncSession, question_in: QuestionCreate, commit: bool = True) -> QuestionLoad:
         """Creates a new question, handling the relationship with tags."""
@@ -59,6 +94,7 @@ class QuestionService(BaseModelService[Question, QuestionCreate, QuestionLoad, Q
         tag_names = [tag_name.lower() for tag_name in tag_names]
 
         db_question = Question(**question_data)
+        db_question.hot_score = compute_hot_score(0, 0, 0, 0, db_question.created_at)
 
         if tag_names:
             unique_tag_names = set(tag_names)
@@ -79,23 +115,29 @@ class QuestionService(BaseModelService[Question, QuestionCreate, QuestionLoad, Q
         session.add(db_question)
         await session.flush()  # Flush to get the id without committing
         question_id = db_question.id
+        await tag_service.cooccurrences.update_for_question(
+            session, [], [tag.id for tag in db_question.tags], commit=False
+        )
+        await user_service.stats.increment(session, question_in.author_id, num_questions=1)
+        # The tag counts, related questions and author summary are updated by the
+        # subscribers of the event.
+        outbox_service.append(
+            session,
+            "question.created",
+            question_id=question_id,
+            author_id=question_in.author_id,
+            tag_names=sorted(set(tag_names)),
+            tags_changed=bool(tag_names),
+        )
         if commit:
             await session.commit()
 
-        # After the question and relationships are saved, update the tag counts
-        if tag_names:
-            await self.update_num_questions_in_tags(session, tag_names, commit=commit)
-
         # Load the created question with relationships
         result = await session.execute(
-            select(Question)
-            .where(Question.id == question_id)
-            .options(selectinload(Question.tags), selectinload(Question.author), selectinload(Question.answers))
+            select(Question).where(Question.id == question_id).options(*QUESTION_LOAD_OPTIONS)
         )
         db_question = result.scalar_one()
-        # Ensure views is 0 if null from database
-        db_question.views = db_question.views or 0
-        question_load = QuestionLoad.model_validate(db_question)
+        [question_load] = await to_question_loads(session, [db_question])
 
         return question_load
 
@@ -108,7 +150,7 @@ class QuestionService(BaseModelService[Question, QuestionCreate, QuestionLoad, Q
         stmt = (
             select(Question)
             .where(Question.id == question_data["id"])
-            .options(selectinload(Question.tags), selectinload(Question.author), selectinload(Question.answers))
+            .options(*QUESTION_LOAD_OPTIONS)
         )
         result = await session.execute(stmt)
         db_question = result.scalar_one_or_none()
@@ -124,19 +166,25 @@ class QuestionService(BaseModelService[Question, QuestionCreate, QuestionLoad, Q
             if field == "views" and value == 0:
                 continue
             setattr(db_question, field, value)
+        db_question.hot_score = compute_hot_score(
+            db_question.views,
+            db_question.upvotes,
+            db_question.downvotes,
+            db_question.num_answers,
+            db_question.created_at,
+        )
 
         # Handle tags relationship only if tags are provided
+        original_tag_names = [tag.name for tag in db_question.tags]
         if tags_value is not None:
             new_tag_names = [tag_name.lower() for tag_name in tags_value]
-
-            # Store original tag names before modification for update_num_questions_in_tags
-            original_tag_names = [tag.name for tag in db_question.tags]
+            original_tag_ids = [tag.id for tag in db_question.tags]
 
             if new_tag_names:
                 unique_new_tag_names = set(new_tag_names)
 
                 # Fetch existing tags from DB
-                stmt_tags = select(Tag).where(Tag.name.in_(unique_new_tag_names)).options(selectinload(Tag.questions))
+                stmt_tags = select(Tag).where(Tag.name.in_(unique_new_tag_names))
                 result_tags = await session.execute(stmt_tags)
                 existing_tags = result_tags.scalars().all()
                 existing_tag_map = {tag.name: tag for tag in existing_tags}
@@ -153,24 +201,45 @@ class QuestionService(BaseModelService[Question, QuestionCreate, QuestionLoad, Q
                 db_question.tags = []  # Clear tags if empty list provided
 
             session.add(db_question)
-            if commit:
-                await session.commit()
-
-            # After the question and relationships are saved, update the tag counts
-            # We need to update counts for both original and new tags
-            all_affected_tag_names = list(set(original_tag_names + new_tag_names))
-            if all_affected_tag_names:
-                await self.update_num_questions_in_tags(session, all_affected_tag_names, commit=commit)
+            await session.flush()  # Flush to get the ids of the new tags
+            await tag_service.cooccurrences.update_for_question(
+                session, original_tag_ids, [tag.id for tag in db_question.tags], commit=False
+            )
         else:
+            new_tag_names = original_tag_names
             session.add(db_question)
-            if commit:
-                await session.commit()
 
+        # The counts of both the original and the new tags, the related questions and the
+        # author summary are updated by the subscribers of the event.
+        outbox_service.append(
+            session,
+            "question.updated",
+            question_id=question_in.id,
+            author_id=db_question.author_id,
+            tag_names=sorted(set(original_tag_names) | set(new_tag_names)) if tags_value is not None else [],
+            tags_changed=set(original_tag_names) != set(new_tag_names),
+        )
         if commit:
+            await session.commit()
             await session.refresh(db_question)
-        # Ensure views is 0 if null from database
-        db_question.views = db_question.views or 0
-        return QuestionLoad.model_validate(db_question)
+        [question_load] = await to_question_loads(session, [db_question])
+        return question_load
+
+    async def delete(self, session: AsyncSession, db_obj: QuestionLoad, commit: bool = True) -> None:
+        """Deletes a question and removes it from the statistics and the summary of its author.
+
+        The pairs of its tags are removed from the tag co-occurrence counts in the same
+        transaction, as when its tags change.
+        """
+        await user_service.stats.increment(
+            session, db_obj.author_id, num_questions=-1, question_upvotes=-(db_obj.upvotes or 0)
+        )
+        tag_ids = await session.scalars(
+            select(QuestionTagRelationship.tag_id).where(QuestionTagRelationship.question_id == db_obj.id)
+        )
+        await tag_service.cooccurrences.update_for_question(session, tag_ids.all(), [], commit=False)
+        await super().delete(session, db_obj, commit=commit)
+        user_summary_worker.mark(db_obj.author_id)
 
     async def update_num_questions_in_tags(self, session: AsyncSession, tag_names: List[str], commit: bool = True):
         """
@@ -192,7 +261,32 @@ class QuestionService(BaseModelService[Question, QuestionCreate, QuestionLoad, Q
             questions_count = await session.scalar(count_stmt)
             tag.num_questions = questions_count
             session.add(tag)
+            tag_service.autocomplete_index.upsert(tag.id, tag.name, tag.num_questions)
+
+        if commit:
+            await session.commit()
+
+    async def update_hot_score(self, session: AsyncSession, question_id: int, commit: bool = True) -> None:
+        """Recomputes the stored hot score of a question from its current counters.
+
+        Called after the events that change the score: votes, answers and views.
+        """
+        result = await session.execute(
+            select(
+                Question.views,
+                Question.upvotes,
+                Question.downvotes,
+                Question.num_answers,
+                Question.created_at,
+            ).where(Question.id == question_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return
 
+        await session.execute(
+            update(Question).where(Question.id == question_id).values(hot_score=compute_hot_score(*row))
+        )
         if commit:
             await session.commit()
 
@@ -203,6 +297,7 @@ class QuestionService(BaseModelService[Question, QuestionCreate, QuestionLoad, Q
         page_size: int = 10,
         query: str = "",
         filter: str = "",
+        user_id: int | None = None,
     ) -> List[QuestionLoad]:
         order = desc(Question.created_at)
         if filter == "popular":
@@ -213,14 +308,12 @@ class QuestionService(BaseModelService[Question, QuestionCreate, QuestionLoad, Q
             order = Question.created_at
         if filter == "recommended":
             order = desc(Question.upvotes)
+        if filter == "hot":
+            order = desc(Question.hot_score)
 
         smtm = (
             select(Question)
-            .options(
-                selectinload(Question.tags),
-                selectinload(Question.answers),
-                selectinload(Question.author),
-            )
+            .options(*QUESTION_LOAD_OPTIONS)
             .where(
                 or_(
                     func.lower(Question.title).like(f"%{query.lower()}%"),
@@ -235,11 +328,56 @@ class QuestionService(BaseModelService[Question, QuestionCreate, QuestionLoad, Q
         if filter == "unanswered":
             smtm = smtm.where(not_(Question.answers.any()))  # type: ignore
 
-        result = await session.execute(smtm)
-        questions = result.scalars().all()
+        questions = None
+        if filter == "recommended" and user_id is not None:
+            questions = await self._get_recommended_questions(session, smtm, user_id, page)
+
+        if questions is None:
+            result = await session.execute(smtm)
+            questions = result.scalars().all()
+
+        return await to_question_loads(session, questions)
+
+    @staticmethod
+    async def _get_recommended_questions(session: AsyncSession, smtm, user_id: int, page: int) -> List[Question] | None:
+        """Returns a page of the precomputed recommended questions of a user.
+
+        The feed is served from the question_recommendation table in a single indexed read.
+        Users without recommendations, or whose recommendations are stale, are scheduled
+        for a refresh on the recommendation worker.
 
-        # Ensure views is 0 if null from database
-        for question in questions:
-            question.views = question.views or 0
+        Whether the user has recommendations is decided apart from the search and the page,
+        so that a user without them gets the default ordering on every page of the feed.
 
-        return [QuestionLoad.model_validate(question) for question in questions]
+        Returns:
+            The questions, or None when the user has no recommendations yet and the caller
+            should fall back to the default ordering.
+        """
+        has_recommendations = await session.scalar(
+            select(select(QuestionRecommendation.user_id).where(QuestionRecommendation.user_id == user_id).exists())
+        )
+        if not has_recommendations:
+            recommendation_worker.mark(user_id)
+            return None
+
+        recommended_smtm = (
+            smtm.add_columns(QuestionRecommendation.created_at)
+            .join(
+                QuestionRecommendation,
+                and_(QuestionRecommendation.question_id == Question.id, QuestionRecommendation.user_id == user_id),
+            )
+            .order_by(None)
+            .order_by(desc(QuestionRecommendation.score))
+        )
+        result = await session.execute(recommended_smtm)
+        rows = result.all()
+        if not rows:
+            return []
+
+        computed_at = min(created_at for _, created_at in rows)
+        if computed_at.tzinfo is None:
+            computed_at = computed_at.replace(tzinfo=timezone.utc)
+        if datetime.now(timezone.utc) - computed_at > RECOMMENDATIONS_MAX_AGE:
+            recommendation_worker.mark(user_id)
+
+        return [question for question, _ in rows]
@@ -0,0 +1,175 @@
+"""This module provides the service that maintains the related questions index."""
+
+import heapq
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import delete, desc, func, select
+
+from ..models.question import Question
+from ..models.question_tag_relationship import QuestionTagRelationship
+from ..models.related_question import RelatedQuestion, RelatedQuestionLoad
+
+# Number of related questions kept per question.
+MAX_RELATED_QUESTIONS = 10
+# Number of questions sharing the most tags that are considered on an incremental refresh.
+MAX_CANDIDATES = 200
+# Only the most recent questions of a tag are considered when rebuilding the whole index,
+# which bounds the cost of very popular tags.
+MAX_QUESTIONS_PER_TAG = 5000
+
+
+def _jaccard(overlap: int, size_a: int, size_b: int) -> float:
+    return overlap / (size_a + size_b - overlap)
+
+
+class RelatedQuestionService:
+    """The service for the related questions of a question.
+
+    Two questions are related by the Jaccard similarity of their tag sets. The top
+    related questions of every question are stored in the related_question table, one
+    row per question of its list, and refreshed whenever the tags of a question change.
+    """
+
+    async def get_related(self, session: AsyncSession, question_id: int, limit: int = MAX_RELATED_QUESTIONS):
+        """Returns the related questions of a question, most similar first.
+
+        Args:
+            session: The database session.
+            question_id: The ID of the question.
+            limit: The maximum number of related questions.
+        """
+        stmt = (
+            select(Question.id, Question.title, RelatedQuestion.score)
+            .join(Question, Question.id == RelatedQuestion.related_question_id)
+            .where(RelatedQuestion.question_id == question_id)
+            .order_by(desc(RelatedQuestion.score))
+            .limit(limit)
+        )
+        result = await session.execute(stmt)
+        return [
+            RelatedQuestionLoad(id=related_id, title=title, score=score) for related_id, title, score in result.all()
+        ]
+
+    async def refresh(self, session: AsyncSession, question_id: int, commit: bool = True) -> None:
+        """Recomputes the related questions of a question after its tags changed.
+
+        The similarity is symmetric, so the lists of the questions that listed this one
+        and of the questions it is now related to are recomputed as well: the former may
+        have lost it and need another question in its place, the latter may now include it.
+
+        Args:
+            session: The database session.
+            question_id: The ID of the question.
+            commit: Whether to commit the changes.
+        """
+        referrers_result = await session.execute(
+            select(RelatedQuestion.question_id).where(RelatedQuestion.related_question_id == question_id)
+        )
+        neighbour_ids = set(referrers_result.scalars().all())
+
+        scored = await self._top_related(session, question_id)
+        await self._replace(session, question_id, scored)
+        neighbour_ids.update(candidate_id for _, candidate_id in scored)
+
+        for neighbour_id in sorted(neighbour_ids):
+            await self._replace(session, neighbour_id, await self._top_related(session, neighbour_id))
+
+        await session.flush()
+        if commit:
+            await session.commit()
+
+    @staticmethod
+    async def _top_related(session: AsyncSession, question_id: int) -> List[Tuple[float, int]]:
+        """Returns the scores and IDs of the questions most similar to a question."""
+        tags_result = await session.execute(
+            select(QuestionTagRelationship.tag_id).where(QuestionTagRelationship.question_id == question_id)
+        )
+        tag_ids = tags_result.scalars().all()
+        if not tag_ids:
+            return []
+
+        # Questions sharing the most tags with this one, with the number of shared tags.
+        overlap_stmt = (
+            select(QuestionTagRelationship.question_id, func.count().label("overlap"))
+            .where(
+                QuestionTagRelationship.tag_id.in_(tag_ids),
+                QuestionTagRelationship.question_id != question_id,
+            )
+            .group_by(QuestionTagRelationship.question_id)
+            .order_by(desc("overlap"))
+            .limit(MAX_CANDIDATES)
+        )
+        overlaps = dict((await session.execute(overlap_stmt)).tuples().all())
+        if not overlaps:
+            return []
+
+        sizes_stmt = (
+            select(QuestionTagRelationship.question_id, func.count())
+            .where(QuestionTagRelationship.question_id.in_(overlaps))
+            .group_by(QuestionTagRelationship.question_id)
+        )
+        sizes = dict((await session.execute(sizes_stmt)).tuples().all())
+
+        return heapq.nlargest(
+            MAX_RELATED_QUESTIONS,
+            (
+                (_jaccard(overlap, len(tag_ids), sizes[candidate_id]), candidate_id)
+                for candidate_id, overlap in overlaps.items()
+            ),
+        )
+
+    @staticmethod
+    async def _replace(session: AsyncSession, question_id: int, scored: List[Tuple[float, int]]) -> None:
+        """Replaces the related questions of a question."""
+        await session.execute(delete(RelatedQuestion).where(RelatedQuestion.question_id == question_id))
+        session.add_all(
+            RelatedQuestion(question_id=question_id, related_question_id=candidate_id, score=score)
+            for score, candidate_id in scored
+        )
+
+    async def rebuild(self, session: AsyncSession) -> None:
+        """Rebuilds the related questions of every question.
+
+        The question-tag relationship is read once into a sparse incidence structure
+        (tags per question and questions per tag). The overlaps of a question with all
+        others are the sparse product of its tag row with the tag postings, from which the
+        Jaccard similarities are derived.
+        """
+        question_tags: Dict[int, List[int]] = defaultdict(list)
+        tag_questions: Dict[int, List[int]] = defaultdict(list)
+        stream = await session.stream(
+            select(QuestionTagRelationship.question_id, QuestionTagRelationship.tag_id)
+            .order_by(desc(QuestionTagRelationship.question_id))
+            .execution_options(yield_per=5000)
+        )
+        async for question_id, tag_id in stream:
+            question_tags[question_id].append(tag_id)
+            postings = tag_questions[tag_id]
+            if len(postings) < MAX_QUESTIONS_PER_TAG:
+                postings.append(question_id)
+
+        await session.execute(delete(RelatedQuestion))
+        for position, (question_id, tag_ids) in enumerate(question_tags.items(), start=1):
+            overlaps: Counter[int] = Counter()
+            for tag_id in tag_ids:
+                overlaps.update(tag_questions[tag_id])
+            overlaps.pop(question_id, None)
+
+            scored = heapq.nlargest(
+                MAX_RELATED_QUESTIONS,
+                (
+                    (_jaccard(overlap, len(tag_ids), len(question_tags[candidate_id])), candidate_id)
+                    for candidate_id, overlap in overlaps.items()
+                ),
+            )
+            session.add_all(
+                RelatedQuestion(question_id=question_id, related_question_id=candidate_id, score=score)
+                for score, candidate_id in scored
+            )
+            if position % 1000 == 0:
+                await session.flush()
+                session.expunge_all()
+
+        await session.commit()
@@ -0,0 +1,20 @@
+"""This module defines the data models for the QuestionPage feature."""
+
+from sqlmodel import SQLModel
+
+from app.features.answer.models.answer import AnswersForQuestionResponse
+from app.features.question.models.question import QuestionLoad
+from app.features.vote.models.vote import VoteStates
+
+
+class QuestionPageResponse(SQLModel):
+    """Schema for everything needed to render a question page.
+
+    The answers of the question are in `answers`, not in `question.answers`. The votes
+    and the saved state are those of the viewer, and are None when there is no viewer.
+    """
+
+    question: QuestionLoad
+    answers: AnswersForQuestionResponse
+    votes: VoteStates | None = None
+    saved: bool | None = None
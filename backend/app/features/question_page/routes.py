@@ -0,0 +1,39 @@
+"""This module provides the routes for the QuestionPage feature."""
+
+from fastapi import APIRouter
+
+from app.core.pagination import TotalStrategy
+from app.features.question_page.models.question_page import QuestionPageResponse
+
+from .services.question_page_services import QuestionPageService
+
+router = APIRouter(prefix="/api/v1/question", tags=["question"])
+
+question_page_service = QuestionPageService()
+
+
+@router.get("/{question_id:int}/page", response_model=QuestionPageResponse)
+async def get_question_page(
+    question_id: int,
+    viewer_id: int | None = None,
+    page_size: int = 10,
+    filter: str = "",
+    totals: TotalStrategy = TotalStrategy.EXACT,
+):
+    """Loads everything needed to render a question page in one request.
+
+    Returns the question, the first page of its answers and, when `viewer_id` is given,
+    the votes of the viewer on the question and these answers and whether the viewer
+    saved the question.
+
+    Args:
+        question_id: The ID of the Question.
+        viewer_id: The ID of the User viewing the page.
+        page_size: The number of answers on the page.
+        filter: The order of the answers.
+        totals: How the total number of answers is computed.
+
+    Raises:
+        HTTPException: If the Question is not found.
+    """
+    return await question_page_service.get_page(question_id, viewer_id, page_size, filter, totals)
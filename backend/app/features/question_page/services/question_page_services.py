@@ -0,0 +1,63 @@
+"""This module provides the service for the QuestionPage feature."""
+
+from fastapi import HTTPException, status
+
+from app.core.concurrent_reads import run_concurrently, run_read
+from app.core.pagination import TotalStrategy
+from app.features.answer.routes import answer_service
+from app.features.question.routes import question_service
+from app.features.user_collection.routes import user_collection_service
+from app.features.vote.routes import vote_service
+
+from ..models.question_page import QuestionPageResponse
+
+
+class QuestionPageService:
+    """Assembles a question page from the question, answer, vote and collection services.
+
+    The question, the first page of answers and the saved state do not depend on each
+    other and are read concurrently; the votes of the viewer on the question and the
+    answers of the page are then read in a single query.
+    """
+
+    async def get_page(
+        self,
+        question_id: int,
+        viewer_id: int | None = None,
+        page_size: int = 10,
+        filter: str = "",
+        totals: TotalStrategy = TotalStrategy.EXACT,
+    ) -> QuestionPageResponse:
+        """Returns a question with its first page of answers and the state of the viewer.
+
+        Args:
+            question_id: The ID of the Question.
+            viewer_id: The ID of the User viewing the page, if any.
+            page_size: The number of answers on the page.
+            filter: The order of the answers.
+            totals: How the total number of answers is computed.
+
+        Raises:
+            HTTPException: If the Question is not found.
+        """
+        reads = [
+            lambda session: question_service.load(session, question_id, include_answers=False),
+            lambda session: answer_service.get_answers_for_question(session, question_id, 1, page_size, filter, totals),
+        ]
+        if viewer_id is not None:
+            reads.append(
+                lambda session: user_collection_service.get_saved_question_ids(session, viewer_id, [question_id])
+            )
+        question, answers, *collection = await run_concurrently(*reads)
+        if question is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
+
+        page = QuestionPageResponse(question=question, answers=answers)
+        if viewer_id is not None:
+            page.saved = bool(collection[0])
+            page.votes = await run_read(
+                lambda session: vote_service.get_vote_states(
+                    session, viewer_id, [question_id], [answer.id for answer in answers.answers]
+                )
+            )
+        return page
@@ -0,0 +1,45 @@
+"""This module defines the data models for the Recommendation feature."""
+
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+from sqlmodel import SQLModel, Field
+
+
+class QuestionRecommendationBase(SQLModel):
+    """Base model for QuestionRecommendation that contains shared fields."""
+
+    user_id: int = Field(foreign_key="user.id", primary_key=True, ondelete="CASCADE")
+    question_id: int = Field(foreign_key="question.id", primary_key=True, ondelete="CASCADE")
+    score: float = 0
+
+
+class QuestionRecommendation(QuestionRecommendationBase, table=True):
+    """Represents the precomputed recommended questions of a user.
+
+    Rows are rebuilt by the recommendation worker, so serving a feed is a single
+    range scan over the (user_id, score) index.
+    """
+
+    __tablename__ = "question_recommendation"
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (sa.Index("ix_question_recommendation_user_id_score", "user_id", "score"),)
+
+
+class QuestionRecommendationCreate(QuestionRecommendationBase):
+    """Schema for creating a new QuestionRecommendation."""
+
+    pass
+
+
+class QuestionRecommendationUpdate(SQLModel):
+    """Schema for updating an existing QuestionRecommendation."""
+
+    pass
+
+
+class QuestionRecommendationLoad(QuestionRecommendationBase):
+    """Schema for loading a QuestionRecommendation."""
+
+    created_at: datetime
@@ -0,0 +1,56 @@
+"""This module provides the routes for the Recommendation feature."""
+
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, status
+
+from app.core import session_scope
+from app.core.background import DirtyKeyWorker
+from app.features.outbox.routes import outbox_service
+from app.features.recommendation.models.recommendation import (
+    QuestionRecommendation,
+    QuestionRecommendationCreate,
+    QuestionRecommendationLoad,
+    QuestionRecommendationUpdate,
+)
+
+from .services.recommendation_services import RecommendationService
+
+router = APIRouter(prefix="/api/v1/recommendation", tags=["recommendation"])
+
+recommendation_service = RecommendationService(
+    QuestionRecommendation,
+    QuestionRecommendationCreate,
+    QuestionRecommendationLoad,
+    QuestionRecommendationUpdate,
+)
+
+
+async def _refresh_recommendations(user_ids: List[int]) -> None:
+    async with session_scope() as session:
+        await recommendation_service.refresh_for_users(session, user_ids)
+
+
+# Users whose activity changed are marked here and refreshed in batches off the request path.
+recommendation_worker: DirtyKeyWorker[int] = DirtyKeyWorker(
+    "recommendation-worker", _refresh_recommendations, batch_size=20, interval=5.0
+)
+
+
+async def _on_collections_toggled(events: List[Dict[str, Any]]) -> None:
+    """Refreshes the recommendations of the users who saved or unsaved questions."""
+    await _refresh_recommendations(sorted({event["user_id"] for event in events}))
+
+
+outbox_service.subscribe("collection.toggled", _on_collections_toggled)
+
+
+@router.post("/refresh/{user_id}", status_code=status.HTTP_202_ACCEPTED)
+async def refresh(user_id: int):
+    """Schedules a refresh of the recommended questions of a user.
+
+    Args:
+        user_id: The ID of the User.
+    """
+    recommendation_worker.mark(user_id)
+    return {"message": "Recommendations refresh has been scheduled."}
@@ -0,0 +1,216 @@
+"""This module provides the service for the Recommendation feature."""
+
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Type
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import delete, desc, func, select
+
+from app.core.lib.base_model_service import BaseModelService
+from app.features.answer.models.answer import Answer
+from app.features.interaction.models.interaction import ActionType, Interaction
+from app.features.question.models.question import Question
+from app.features.question.models.question_tag_relationship import QuestionTagRelationship
+from app.features.user_collection.models.user_collection import UserCollection
+
+from ..models.recommendation import (
+    QuestionRecommendation,
+    QuestionRecommendationCreate,
+    QuestionRecommendationLoad,
+    QuestionRecommendationUpdate,
+)
+
+# How much each kind of interaction adds to the affinity between a user and the tags of its target.
+ACTION_WEIGHTS: Dict[ActionType, float] = {
+    ActionType.QUESTION: 2.0,
+    ActionType.ANSWER: 3.0,
+    ActionType.UPVOTE: 2.0,
+    ActionType.DOWNVOTE: -1.0,
+    ActionType.TAG: 1.0,
+}
+SAVED_QUESTION_WEIGHT = 3.0
+
+MAX_INTERACTIONS_PER_USER = 200
+MAX_AFFINITY_TAGS = 10
+MAX_CANDIDATES = 1000
+MAX_RECOMMENDATIONS = 100
+
+# Recommendations older than this are refreshed the next time the feed is served.
+RECOMMENDATIONS_MAX_AGE = timedelta(hours=6)
+
+
+class RecommendationService(
+    BaseModelService[
+        QuestionRecommendation,
+        QuestionRecommendationCreate,
+        QuestionRecommendationLoad,
+        QuestionRecommendationUpdate,
+    ]
+):
+    """The service for the Recommendation feature.
+
+    Recommendations are precomputed per user from the tags of the questions the user
+    interacted with or saved. Each user is represented by a sparse tag -> affinity vector
+    and candidate questions are scored by the dot product with their tag sets.
+    """
+
+    def __init__(
+        self,
+        model: Type[QuestionRecommendation],
+        create_schema: Type[QuestionRecommendationCreate],
+        load_schema: Type[QuestionRecommendationLoad],
+        update_schema: Type[QuestionRecommendationUpdate],
+    ):
+        """Initializes the RecommendationService.
+
+        Args:
+            model: The QuestionRecommendation model.
+            create_schema: The QuestionRecommendationCreate schema.
+            load_schema: The QuestionRecommendationLoad schema.
+            update_schema: The QuestionRecommendationUpdate schema.
+        """
+        super().__init__(model, create_schema, load_schema, update_schema)
+
+    async def refresh_for_users(self, session: AsyncSession, user_ids: List[int]) -> None:
+        """Rebuilds the recommended questions of the given users.
+
+        Args:
+            session: The database session.
+            user_ids: The IDs of the users to refresh.
+        """
+        if not user_ids:
+            return
+
+        affinities, saved = await self._get_tag_affinities(session, user_ids)
+        all_tag_ids = {tag_id for affinity in affinities.values() for tag_id in affinity}
+        candidates = await self._get_candidates(session, all_tag_ids)
+
+        now = datetime.now(timezone.utc)
+        await session.execute(delete(QuestionRecommendation).where(QuestionRecommendation.user_id.in_(user_ids)))
+        for user_id in user_ids:
+            affinity = affinities.get(user_id, {})
+            scored = []
+            for question_id, (author_id, upvotes, tag_ids) in candidates.items():
+                if author_id == user_id or (user_id, question_id) in saved:
+                    continue
+                relevance = sum(affinity.get(tag_id, 0.0) for tag_id in tag_ids)
+                if relevance <= 0:
+                    continue
+                scored.append((relevance + math.log1p(max(upvotes or 0, 0)), question_id))
+
+            scored.sort(reverse=True)
+            session.add_all(
+                QuestionRecommendation(user_id=user_id, question_id=question_id, score=score, created_at=now)
+                for score, question_id in scored[:MAX_RECOMMENDATIONS]
+            )
+
+        await session.commit()
+
+    @staticmethod
+    async def _get_tag_affinities(
+        session: AsyncSession, user_ids: List[int]
+    ) -> tuple[Dict[int, Dict[int, float]], set[tuple[int, int]]]:
+        """Returns the normalized top tag affinities of each user and the questions they saved.
+
+        Returns:
+            A tuple with the affinities keyed by user ID and tag ID, and the saved (user ID, question ID) pairs.
+        """
+        raw: Dict[int, Dict[int, float]] = defaultdict(lambda: defaultdict(float))
+
+        # Recent interactions. Targets are resolved to tags depending on the content type.
+        recent_interactions = (
+            select(
+                Interaction.user_id,
+                Interaction.content_type,
+                Interaction.target_id,
+                Interaction.action_type,
+                func.row_number()
+                .over(partition_by=Interaction.user_id, order_by=desc(Interaction.created_at))
+                .label("position"),
+            )
+            .where(Interaction.user_id.in_(user_ids))
+            .subquery()
+        )
+        interactions_stmt = select(recent_interactions).where(
+            recent_interactions.c.position <= MAX_INTERACTIONS_PER_USER
+        )
+        interactions = (await session.execute(interactions_stmt)).all()
+
+        question_ids = {i.target_id for i in interactions if i.content_type == "question"}
+        answer_ids = {i.target_id for i in interactions if i.content_type == "answer"}
+        answer_questions: Dict[int, int] = {}
+        if answer_ids:
+            result = await session.execute(select(Answer.id, Answer.question_id).where(Answer.id.in_(answer_ids)))
+            answer_questions = dict(result.all())
+            question_ids.update(answer_questions.values())
+
+        saved_stmt = select(UserCollection.user_id, UserCollection.question_id).where(
+            UserCollection.user_id.in_(user_ids)
+        )
+        saved = set((await session.execute(saved_stmt)).tuples().all())
+        question_ids.update(question_id for _, question_id in saved)
+
+        question_tags: Dict[int, List[int]] = defaultdict(list)
+        if question_ids:
+            result = await session.execute(
+                select(QuestionTagRelationship.question_id, QuestionTagRelationship.tag_id).where(
+                    QuestionTagRelationship.question_id.in_(question_ids)
+                )
+            )
+            for question_id, tag_id in result.all():
+                question_tags[question_id].append(tag_id)
+
+        for interaction in interactions:
+            weight = ACTION_WEIGHTS.get(interaction.action_type, 0.0)
+            if interaction.content_type == "tag":
+                tag_ids = [interaction.target_id]
+            elif interaction.content_type == "answer":
+                tag_ids = question_tags.get(answer_questions.get(interaction.target_id), [])
+            else:
+                tag_ids = question_tags.get(interaction.target_id, [])
+            for tag_id in tag_ids:
+                raw[interaction.user_id][tag_id] += weight
+
+        for user_id, question_id in saved:
+            for tag_id in question_tags.get(question_id, []):
+                raw[user_id][tag_id] += SAVED_QUESTION_WEIGHT
+
+        affinities: Dict[int, Dict[int, float]] = {}
+        for user_id, tags in raw.items():
+            top = sorted(((w, t) for t, w in tags.items() if w > 0), reverse=True)[:MAX_AFFINITY_TAGS]
+            norm = math.sqrt(sum(w * w for w, _ in top)) or 1.0
+            affinities[user_id] = {tag_id: weight / norm for weight, tag_id in top}
+        return affinities, saved
+
+    @staticmethod
+    async def _get_candidates(session: AsyncSession, tag_ids: set[int]) -> Dict[int, tuple[int, int, List[int]]]:
+        """Returns the most recent questions with any of the given tags.
+
+        Returns:
+            A mapping of question ID to (author ID, upvotes, tag IDs).
+        """
+        if not tag_ids:
+            return {}
+
+        recent_questions = (
+            select(Question.id)
+            .join(QuestionTagRelationship, QuestionTagRelationship.question_id == Question.id)
+            .where(QuestionTagRelationship.tag_id.in_(tag_ids))
+            .group_by(Question.id)
+            .order_by(desc(Question.id))
+            .limit(MAX_CANDIDATES)
+            .subquery()
+        )
+        stmt = (
+            select(Question.id, Question.author_id, Question.upvotes, QuestionTagRelationship.tag_id)
+            .join(recent_questions, recent_questions.c.id == Question.id)
+            .join(QuestionTagRelationship, QuestionTagRelationship.question_id == Question.id)
+        )
+        candidates: Dict[int, tuple[int, int, List[int]]] = {}
+        for question_id, author_id, upvotes, tag_id in (await session.execute(stmt)).all():
+            if question_id not in candidates:
+                candidates[question_id] = (author_id, upvotes or 0, [])
+            candidates[question_id][2].append(tag_id)
+        return candidates
@@ -27,7 +27,7 @@ class Tag(TagBase, table=True):
     updated_at: datetime | None = Field(
         default_factory=lambda: datetime.now(timezone.utc)
     )
-    num_questions: int | None = 0
+    num_questions: int | None = Field(default=0, index=True)
     questions: List["Question"] = Relationship(
         back_populates="tags", link_model=QuestionTagRelationship
     )
@@ -61,3 +61,11 @@ class TagLoad(TagBase):
     created_at: datetime
     updated_at: Optional[datetime]
     num_questions: int
+
+
+class TagSuggestion(SQLModel):
+    """Schema for a tag suggested by the autocomplete endpoint."""
+
+    id: int
+    name: str
+    num_questions: int
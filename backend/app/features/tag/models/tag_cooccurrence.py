@@ -0,0 +1,28 @@
+"""This module defines the data models for the tag co-occurrence statistics."""
+
+import sqlalchemy as sa
+from sqlmodel import SQLModel, Field
+
+
+class TagCooccurrence(SQLModel, table=True):
+    """Represents the number of questions two tags are used on together.
+
+    Every pair is stored in both directions, so the tags related to a tag are a single
+    range scan over the (tag_id, num_questions) index.
+    """
+
+    __tablename__ = "tag_cooccurrence"
+    tag_id: int = Field(foreign_key="tag.id", primary_key=True, ondelete="CASCADE")
+    related_tag_id: int = Field(foreign_key="tag.id", primary_key=True, ondelete="CASCADE")
+    num_questions: int = 0
+
+    __table_args__ = (sa.Index("ix_tag_cooccurrence_tag_id_num_questions", "tag_id", "num_questions"),)
+
+
+class RelatedTagLoad(SQLModel):
+    """Schema for loading a tag related to another one."""
+
+    id: int
+    name: str
+    num_questions: int
+    num_shared_questions: int
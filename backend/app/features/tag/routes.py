@@ -1,10 +1,15 @@
 """This module provides the routes for the Tag feature."""
 
 from typing import List
-from app.core import get_session
+from app.core import get_session, session_scope
+from app.core.concurrent_reads import run_concurrently, run_read
+from app.core.scheduler import job_scheduler
+from app.core.settings import settings
+from app.core.warmup import cache_warmer
 from app.features.question.models.question import Question, QuestionLoad
-from app.features.tag.models.tag import Tag, TagCreate, TagLoad, TagUpdate
-from fastapi import APIRouter, Depends, HTTPException, status
+from app.features.tag.models.tag import Tag, TagCreate, TagLoad, TagSuggestion, TagUpdate
+from app.features.tag.models.tag_cooccurrence import RelatedTagLoad
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from .services.tag_services import TagService
@@ -14,6 +19,27 @@ router = APIRouter(prefix="/api/v1/tag", tags=["tag"])
 tag_service = TagService(Tag, TagCreate, TagLoad, TagUpdate)
 
 
+async def _rebuild_tag_cooccurrences() -> None:
+    async with session_scope() as session:
+        await tag_service.cooccurrences.rebuild(session)
+
+
+# Repairs the co-occurrence counts maintained on each question change.
+job_scheduler.register("rebuild-tag-cooccurrences", _rebuild_tag_cooccurrences, interval=24 * 3600)
+
+
+async def _warm_top_tags() -> None:
+    """Loads the autocomplete index and the first page of questions of the most used tags."""
+    await run_read(tag_service.autocomplete_index.ensure_loaded)
+    top_tags = tag_service.autocomplete_index.top(settings.WARMUP_TOP_TAGS)
+    await run_concurrently(
+        *(lambda session, tag_id=tag.id: tag_service.get_tag_questions(session, tag_id) for tag in top_tags)
+    )
+
+
+cache_warmer.register("top-tags", _warm_top_tags)
+
+
 @router.get("/load/{tag_id}", response_model=TagLoad)
 async def get_tag(tag_id: int, session: AsyncSession = Depends(get_session)):
     """Loads a Tag by its ID.
@@ -109,6 +135,46 @@ async def get_tags(
     )
     return tags
 
+
+@router.get("/autocomplete", response_model=List[TagSuggestion])
+async def autocomplete(
+    query: str = "",
+    limit: int = Query(10, ge=1, le=50),
+    session: AsyncSession = Depends(get_session),
+):
+    """Suggests tags for the text typed so far, most used first.
+
+    Args:
+        query: The text typed so far. An empty query returns the most used tags.
+        limit: The maximum number of suggestions.
+        session: The database session.
+    """
+    return await tag_service.autocomplete(session, query, limit)
+
+
+@router.post("/related/rebuild", status_code=status.HTTP_202_ACCEPTED)
+async def rebuild_related_tags():
+    """Schedules a rebuild of the co-occurrence counts of every pair of tags."""
+    await job_scheduler.trigger("rebuild-tag-cooccurrences")
+    return {"message": "Tag co-occurrences rebuild has been scheduled."}
+
+
+@router.get("/{tag_id}/related", response_model=List[RelatedTagLoad])
+async def get_related_tags(
+    tag_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    session: AsyncSession = Depends(get_session),
+):
+    """Get the tags most often used together with a given tag.
+
+    Args:
+        tag_id: The ID of the Tag.
+        limit: The maximum number of related tags.
+        session: The database session.
+    """
+    return await tag_service.cooccurrences.get_related(session, tag_id, limit)
+
+
 @router.get("/{tag_id}/questions", response_model=List[QuestionLoad])
 async def get_tag_questions(
     tag_id: int,
@@ -0,0 +1,138 @@
+"""This module provides the service that maintains the tag co-occurrence statistics."""
+
+from collections import Counter
+from itertools import permutations
+from typing import Iterable, List
+
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import delete, desc, insert, select, update
+
+from app.core import dialect_insert
+from app.features.question.models.question_tag_relationship import QuestionTagRelationship
+
+from ..models.tag import Tag
+from ..models.tag_cooccurrence import RelatedTagLoad, TagCooccurrence
+
+# Number of rows inserted per statement when rebuilding the whole table.
+REBUILD_BATCH_SIZE = 5000
+
+
+def _pairs(tag_ids: Iterable[int]) -> set[tuple[int, int]]:
+    """Returns the ordered pairs of distinct tags, in both directions."""
+    return set(permutations(set(tag_ids), 2))
+
+
+class TagCooccurrenceService:
+    """The service for the tag co-occurrence statistics.
+
+    The tag_cooccurrence table counts, for every pair of tags, the questions tagged with
+    both. It is maintained from the old and new tag sets of a question whenever they
+    change, so reading the related tags of a tag never touches the link table.
+    """
+
+    async def get_related(self, session: AsyncSession, tag_id: int, limit: int = 10) -> List[RelatedTagLoad]:
+        """Returns the tags most often used together with a tag.
+
+        Args:
+            session: The database session.
+            tag_id: The ID of the tag.
+            limit: The maximum number of related tags.
+        """
+        stmt = (
+            select(Tag.id, Tag.name, Tag.num_questions, TagCooccurrence.num_questions)
+            .join(Tag, Tag.id == TagCooccurrence.related_tag_id)
+            .where(TagCooccurrence.tag_id == tag_id)
+            .order_by(desc(TagCooccurrence.num_questions))
+            .limit(limit)
+        )
+        result = await session.execute(stmt)
+        return [
+            RelatedTagLoad(id=id, name=name, num_questions=num_questions or 0, num_shared_questions=shared)
+            for id, name, num_questions, shared in result.all()
+        ]
+
+    async def update_for_question(
+        self,
+        session: AsyncSession,
+        old_tag_ids: Iterable[int],
+        new_tag_ids: Iterable[int],
+        commit: bool = True,
+    ) -> None:
+        """Applies the change of the tags of a question to the co-occurrence counts.
+
+        Only the pairs that appear or disappear are touched: added pairs are upserted
+        with a single INSERT ... ON CONFLICT statement and removed pairs are decremented,
+        dropping the rows that reach zero.
+
+        Args:
+            session: The database session.
+            old_tag_ids: The IDs of the tags of the question before the change.
+            new_tag_ids: The IDs of the tags of the question after the change.
+            commit: Whether to commit the changes.
+        """
+        old_pairs = _pairs(old_tag_ids)
+        new_pairs = _pairs(new_tag_ids)
+        added = sorted(new_pairs - old_pairs)
+        removed = sorted(old_pairs - new_pairs)
+
+        if added:
+            stmt = dialect_insert(session, TagCooccurrence).values(
+                [
+                    dict(tag_id=tag_id, related_tag_id=related_tag_id, num_questions=1)
+                    for tag_id, related_tag_id in added
+                ]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[TagCooccurrence.tag_id, TagCooccurrence.related_tag_id],
+                set_=dict(num_questions=TagCooccurrence.num_questions + stmt.excluded.num_questions),
+            )
+            await session.execute(stmt)
+
+        if removed:
+            pair = tuple_(TagCooccurrence.tag_id, TagCooccurrence.related_tag_id)
+            await session.execute(
+                update(TagCooccurrence)
+                .where(pair.in_(removed))
+                .values(num_questions=TagCooccurrence.num_questions - 1)
+            )
+            await session.execute(
+                delete(TagCooccurrence).where(pair.in_(removed), TagCooccurrence.num_questions <= 0)
+            )
+
+        if commit:
+            await session.commit()
+
+    async def rebuild(self, session: AsyncSession) -> None:
+        """Rebuilds the co-occurrence counts of every pair of tags.
+
+        The link table is streamed once, ordered by question, and the pairs of each
+        question's tag set are accumulated in a sparse counter: this is the sparse
+        product of the transposed question-tag incidence matrix with itself, without
+        its diagonal.
+        """
+        counts: Counter[tuple[int, int]] = Counter()
+        current_question_id = None
+        current_tag_ids: List[int] = []
+        stream = await session.stream(
+            select(QuestionTagRelationship.question_id, QuestionTagRelationship.tag_id)
+            .order_by(QuestionTagRelationship.question_id)
+            .execution_options(yield_per=REBUILD_BATCH_SIZE)
+        )
+        async for question_id, tag_id in stream:
+            if question_id != current_question_id:
+                counts.update(_pairs(current_tag_ids))
+                current_question_id = question_id
+                current_tag_ids = []
+            current_tag_ids.append(tag_id)
+        counts.update(_pairs(current_tag_ids))
+
+        await session.execute(delete(TagCooccurrence))
+        rows = [
+            dict(tag_id=tag_id, related_tag_id=related_tag_id, num_questions=num_questions)
+            for (tag_id, related_tag_id), num_questions in counts.items()
+        ]
+        for start in range(0, len(rows), REBUILD_BATCH_SIZE):
+            await session.execute(insert(TagCooccurrence), rows[start : start + REBUILD_BATCH_SIZE])
+
+        await session.commit()
@@ -0,0 +1,137 @@
+"""This module provides the in-memory autocomplete index for tag names."""
+
+import asyncio
+import heapq
+import time
+from bisect import bisect_left, insort
+from typing import Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from ..models.tag import Tag, TagSuggestion
+
+
+def _prefix_distance(query: str, name: str, max_distance: int) -> int:
+    """Returns the edit distance between `query` and the closest prefix of `name`.
+
+    The computation stops as soon as the distance is known to exceed `max_distance`,
+    in which case `max_distance + 1` is returned.
+    """
+    previous = list(range(len(query) + 1))
+    best = previous[-1]
+    for j, name_char in enumerate(name[: len(query) + max_distance], start=1):
+        current = [j]
+        for i, query_char in enumerate(query, start=1):
+            cost = 0 if query_char == name_char else 1
+            current.append(min(previous[i] + 1, current[i - 1] + 1, previous[i - 1] + cost))
+        if min(current) > max_distance:
+            break
+        best = min(best, current[-1])
+        previous = current
+    return best if best <= max_distance else max_distance + 1
+
+
+class TagAutocompleteIndex:
+    """Autocomplete index of tag names weighted by their number of questions.
+
+    Names are kept lowercased in a sorted list, so a prefix lookup is two bisects.
+    When a prefix has too few matches, names starting with the same letter are scanned
+    for prefixes within a small edit distance of the query to tolerate typos.
+
+    The index is loaded lazily from the database and updated incrementally by the tag
+    and question services. Since every worker process has its own copy, it is also
+    reloaded once it is older than `max_age` seconds to pick up changes made elsewhere.
+    """
+
+    def __init__(self, max_age: float = 300.0):
+        """Initializes the TagAutocompleteIndex.
+
+        Args:
+            max_age: The number of seconds after which the index is reloaded.
+        """
+        self.max_age = max_age
+        self._names: List[str] = []
+        self._entries: Dict[str, TagSuggestion] = {}
+        self._loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_stale(self) -> bool:
+        """Whether the index was never loaded or is older than `max_age`."""
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.max_age
+
+    async def ensure_loaded(self, session: AsyncSession) -> None:
+        """Loads the index from the database if it is stale."""
+        if not self.is_stale:
+            return
+        async with self._lock:
+            if self.is_stale:
+                await self.rebuild(session)
+
+    async def rebuild(self, session: AsyncSession) -> None:
+        """Rebuilds the whole index from the tag table."""
+        result = await session.execute(select(Tag.id, Tag.name, Tag.num_questions))
+        entries = {
+            name.lower(): TagSuggestion(id=tag_id, name=name, num_questions=num_questions or 0)
+            for tag_id, name, num_questions in result.all()
+        }
+        self._entries = entries
+        self._names = sorted(entries)
+        self._loaded_at = time.monotonic()
+
+    def upsert(self, tag_id: int, name: str, num_questions: int | None) -> None:
+        """Adds a tag to the index or updates its weight."""
+        key = name.lower()
+        if key not in self._entries:
+            insort(self._names, key)
+        self._entries[key] = TagSuggestion(id=tag_id, name=name, num_questions=num_questions or 0)
+
+    def remove(self, name: str) -> None:
+        """Removes a tag from the index."""
+        key = name.lower()
+        if self._entries.pop(key, None) is not None:
+            index = bisect_left(self._names, key)
+            if index < len(self._names) and self._names[index] == key:
+                del self._names[index]
+
+    def top(self, limit: int) -> List[TagSuggestion]:
+        """Returns the tags with the most questions."""
+        return heapq.nlargest(limit, self._entries.values(), key=lambda entry: entry.num_questions)
+
+    def search(self, query: str, limit: int = 10) -> List[TagSuggestion]:
+        """Returns the best tags for the given query.
+
+        Tags whose name starts with the query come first, heaviest first, followed by
+        typo-tolerant matches when there are not enough of them.
+
+        Args:
+            query: The text typed so far.
+            limit: The maximum number of suggestions.
+        """
+        query = query.strip().lower()
+        if not query:
+            return self.top(limit)
+
+        start = bisect_left(self._names, query)
+        end = bisect_left(self._names, query + "\uffff")
+        matches = heapq.nlargest(
+            limit, self._names[start:end], key=lambda name: self._entries[name].num_questions
+        )
+        if len(matches) < limit and len(query) >= 3:
+            matches += self._fuzzy_search(query, limit - len(matches), exclude=set(matches))
+
+        return [self._entries[name] for name in matches]
+
+    def _fuzzy_search(self, query: str, limit: int, exclude: set[str]) -> List[str]:
+        max_distance = 1 if len(query) < 6 else 2
+        start = bisect_left(self._names, query[0])
+        end = bisect_left(self._names, query[0] + "\uffff")
+        scored = []
+        for name in self._names[start:end]:
+            if name in exclude:
+                continue
+            distance = _prefix_distance(query, name, max_distance)
+            if distance <= max_distance:
+                scored.append((distance, -self._entries[name].num_questions, name))
+        return [name for _, _, name in heapq.nsmallest(limit, scored)]
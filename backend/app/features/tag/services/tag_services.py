@@ -4,16 +4,18 @@ from typing import List, Type
 
 from sqlalchemy import asc, desc
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 from sqlmodel import and_, col, func, or_, select
 
 from app.core.lib.base_model_service import BaseModelService
 from app.features.question.models.question import Question, QuestionLoad
+from app.features.question.services.question_loads import QUESTION_LOAD_OPTIONS, to_question_loads
 from app.features.question.models.question_tag_relationship import (
     QuestionTagRelationship,
 )
 
-from ..models.tag import Tag, TagCreate, TagLoad, TagUpdate
+from ..models.tag import Tag, TagCreate, TagLoad, TagSuggestion, TagUpdate
+from .tag_cooccurrence_services import TagCooccurrenceService
+from .tag_index import TagAutocompleteIndex
 
 
 class TagService(BaseModelService[Tag, TagCreate, TagLoad, TagUpdate]):
@@ -40,6 +42,8 @@ class TagService(BaseModelService[Tag, TagCreate, TagLoad, TagUpdate]):
         super().__init__(model, create_schema, load_schema, update_schema)
         # The base BaseModelService includes a basic CRUD operation.
         # Feel free to override its functionality for more complex use cases.
+        self.autocomplete_index = TagAutocompleteIndex()
+        self.cooccurrences = TagCooccurrenceService()
 
     async def create(self, session: AsyncSession, obj_in: TagCreate, commit: bool = True) -> TagLoad:
         """Creates a new tag instance."""
@@ -47,9 +51,24 @@ class TagService(BaseModelService[Tag, TagCreate, TagLoad, TagUpdate]):
         tag_load = await self.load_by_name(session, name)
         if tag_load is None:
             tag_load = await super().create(session, obj_in, commit=commit)
+            self.autocomplete_index.upsert(tag_load.id, tag_load.name, tag_load.num_questions)
 
         return tag_load
 
+    async def delete(self, session: AsyncSession, db_obj: Tag, commit: bool = True) -> None:
+        """Deletes a tag and removes it from the autocomplete index."""
+        await super().delete(session, db_obj, commit=commit)
+        self.autocomplete_index.remove(db_obj.name)
+
+    async def autocomplete(self, session: AsyncSession, query: str, limit: int = 10) -> List[TagSuggestion]:
+        """Returns tag suggestions for the text typed so far.
+
+        Suggestions are served from the in-memory autocomplete index, which is only
+        loaded from the database when it is stale.
+        """
+        await self.autocomplete_index.ensure_loaded(session)
+        return self.autocomplete_index.search(query, limit)
+
     async def load_by_name(self, session: AsyncSession, name: str) -> TagLoad | None:
         """Loads a tag by its name."""
         smtm = select(Tag).where(Tag.name == name)
@@ -84,10 +103,9 @@ class TagService(BaseModelService[Tag, TagCreate, TagLoad, TagUpdate]):
 
         smtm = (
             select(Tag)
-            .options(selectinload(Tag.questions))
             .where(
                 or_(
-                    func.lower(Tag.name) == query.lower(),
+                    func.lower(Tag.name).startswith(query.lower(), autoescape=True),
                     query == "",
                 )
             )
@@ -122,16 +140,13 @@ class TagService(BaseModelService[Tag, TagCreate, TagLoad, TagUpdate]):
             order = Question.created_at
         if filter == "recommended":
             order = desc(Question.upvotes)
-
+        if filter == "hot":
+            order = desc(Question.hot_score)
 
         smtm = (
             select(Question)
             .join(QuestionTagRelationship)
-            .options(
-                selectinload(Question.tags),
-                selectinload(Question.answers),
-                selectinload(Question.author),
-            )
+            .options(*QUESTION_LOAD_OPTIONS)
             .where(
                 and_(
                     Question.id == QuestionTagRelationship.question_id,
@@ -150,6 +165,6 @@ class TagService(BaseModelService[Tag, TagCreate, TagLoad, TagUpdate]):
         result = await session.execute(smtm)
         questions = result.scalars().all()
 
-        questions_load = [QuestionLoad.model_validate(question) for question in questions]
+        questions_load = await to_question_loads(session, questions)
 
         return questions_load
@@ -16,8 +16,8 @@ class UserBase(SQLModel):
     """Base model for User that contains shared fields."""
 
     name: str
-    username: str
-    email: str
+    username: str = Field(unique=True, index=True)
+    email: str = Field(unique=True, index=True)
     bio: Optional[str] = None
     image: str
     location: Optional[str] = None
@@ -67,4 +67,5 @@ class UserLoad(UserBase):
 
 class GetUsersResponse(SQLModel):
     users: List[UserLoad]
-    total: int
+    total: int | None
+    has_more: bool = False
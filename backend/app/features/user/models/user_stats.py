@@ -0,0 +1,40 @@
+"""This module defines the data models of the statistics of users."""
+
+from typing import Dict
+
+from sqlmodel import Field, SQLModel
+
+# The value of each counter from which a bronze, silver and gold badge are earned.
+BADGE_THRESHOLDS: Dict[str, Dict[str, int]] = {
+    "num_questions": {"bronze": 10, "silver": 50, "gold": 100},
+    "num_answers": {"bronze": 10, "silver": 50, "gold": 100},
+    "question_upvotes": {"bronze": 10, "silver": 50, "gold": 100},
+    "answer_upvotes": {"bronze": 10, "silver": 50, "gold": 100},
+}
+
+
+class UserStats(SQLModel, table=True):
+    """Represents the counters of the activity of a user, maintained incrementally.
+
+    Users without any question or answer may have no row, meaning all zeros.
+    """
+
+    __tablename__ = "user_stats"
+
+    user_id: int = Field(foreign_key="user.id", primary_key=True, ondelete="CASCADE")
+    num_questions: int = 0
+    num_answers: int = 0
+    question_upvotes: int = 0
+    answer_upvotes: int = 0
+
+
+class UserStatsLoad(SQLModel):
+    """Schema for loading the statistics of a user."""
+
+    user_id: int
+    num_questions: int = 0
+    num_answers: int = 0
+    question_upvotes: int = 0
+    answer_upvotes: int = 0
+    upvotes_received: int = 0
+    badges: Dict[str, int] = {"bronze": 0, "silver": 0, "gold": 0}
@@ -0,0 +1,57 @@
+"""This module defines the data models of the profile summaries of users."""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import sqlalchemy as sa
+from sqlmodel import Field, SQLModel
+
+
+class UserSummary(SQLModel, table=True):
+    """Represents the precomputed top tags and recent activity of a user.
+
+    Rows are rebuilt by the user summary worker when the user posts or interacts, so a
+    profile page reads a single row instead of joining questions, answers and tags.
+    """
+
+    __tablename__ = "user_summary"
+
+    user_id: int = Field(foreign_key="user.id", primary_key=True, ondelete="CASCADE")
+    top_tags: List[Dict[str, Any]] = Field(default_factory=list, sa_column=sa.Column(sa.JSON, nullable=False))
+    recent_activity: List[Dict[str, Any]] = Field(default_factory=list, sa_column=sa.Column(sa.JSON, nullable=False))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class UserTopTag(SQLModel):
+    """Schema for a tag of the questions and answers of a user."""
+
+    id: int
+    name: str
+    num_questions: int = 0
+    num_answers: int = 0
+
+
+class UserActivity(SQLModel):
+    """Schema for an item of the recent activity of a user.
+
+    `type` is "question", "answer" or the action of an interaction, and `target_id` the
+    ID of the question, answer or tag it is about.
+    """
+
+    type: str
+    target_id: int
+    question_id: int | None = None
+    title: str | None = None
+    created_at: datetime
+
+
+class UserSummaryLoad(SQLModel):
+    """Schema for loading the profile summary of a user.
+
+    `updated_at` is None while the summary of the user has not been computed yet.
+    """
+
+    user_id: int
+    top_tags: List[UserTopTag] = []
+    recent_activity: List[UserActivity] = []
+    updated_at: datetime | None = None
@@ -1,11 +1,17 @@
 """This module provides the routes for the User feature."""
 
-from typing import List
+from typing import Any, Dict, List
 
 from fastapi import APIRouter, Depends, HTTPException, status, Body
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core import get_session
+from app.core import get_session, session_scope
+from app.core.background import DirtyKeyWorker
+from app.core.health import health_checks
+from app.core.scheduler import job_scheduler
+from app.features.outbox.routes import outbox_service
+from app.core.export import ExportFormat, export_response
+from app.core.pagination import TotalStrategy
 from app.features.user.models.user import (
     GetUsersResponse,
     User,
@@ -13,6 +19,8 @@ from app.features.user.models.user import (
     UserLoad,
     UserUpdate,
 )
+from app.features.user.models.user_stats import UserStatsLoad
+from app.features.user.models.user_summary import UserSummaryLoad
 from .services.user_services import UserService
 
 router = APIRouter(
@@ -21,6 +29,39 @@ router = APIRouter(
 )
 
 user_service = UserService(User, UserCreate, UserLoad, UserUpdate)
+health_checks.register("user-cache", user_service.cache.stats)
+
+
+async def _refresh_user_summaries(user_ids: List[int]) -> None:
+    async with session_scope() as session:
+        await user_service.summaries.refresh_for_users(session, user_ids)
+
+
+# Users whose questions, answers or interactions changed are marked here and their
+# profile summaries rebuilt in batches off the request path.
+user_summary_worker: DirtyKeyWorker[int] = DirtyKeyWorker(
+    "user-summary-worker", _refresh_user_summaries, batch_size=50, interval=5.0
+)
+
+
+async def _reconcile_user_stats() -> None:
+    async with session_scope() as session:
+        await user_service.stats.rebuild(session)
+
+
+async def _on_user_activity(events: List[Dict[str, Any]]) -> None:
+    """Refreshes the summaries of the users who posted or edited questions or answers."""
+    user_ids = sorted({event.get("author_id", event.get("user_id")) for event in events})
+    await _refresh_user_summaries(user_ids)
+
+
+outbox_service.subscribe("question.created", _on_user_activity)
+outbox_service.subscribe("question.updated", _on_user_activity)
+outbox_service.subscribe("answer.created", _on_user_activity)
+
+
+# Repairs the drift of the user statistics maintained incrementally.
+job_scheduler.register("reconcile-user-stats", _reconcile_user_stats, interval=6 * 3600)
 
 
 @router.get("/", response_model=List[UserLoad])
@@ -133,10 +174,88 @@ async def get_users(
     page_size: int = 10,
     query: str = "",
     filter: str = "",
+    totals: TotalStrategy = TotalStrategy.EXACT,
     session: AsyncSession = Depends(get_session),
 ):
-    """Get multiple users"""
+    """Get multiple users.
+
+    `totals` selects how the total is computed: exactly, estimated, or not at all
+    (use `has_more` then).
+    """
     response: GetUsersResponse = await user_service.get_users(
-        session, page, page_size, query, filter
+        session, page, page_size, query, filter, totals
     )
     return response
+
+
+@router.get("/export")
+async def export_users(format: ExportFormat = ExportFormat.NDJSON):
+    """Streams all Users as NDJSON or CSV.
+
+    Args:
+        format: The output format.
+    """
+    return export_response(User, format, "users")
+
+
+@router.get("/{user_id:int}/stats", response_model=UserStatsLoad)
+async def get_user_stats(user_id: int, session: AsyncSession = Depends(get_session)):
+    """Returns the question, answer and upvote counts of a User and the badges they earned.
+
+    Args:
+        user_id: The ID of the User.
+        session: The database session.
+
+    Raises:
+        HTTPException: If the User is not found.
+    """
+    if not await user_service.load(session, user_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return await user_service.stats.get(session, user_id)
+
+
+@router.post("/stats/rebuild", status_code=status.HTTP_202_ACCEPTED)
+async def rebuild_user_stats():
+    """Schedules a recomputation of the statistics of every User from their questions and answers."""
+    await job_scheduler.trigger("reconcile-user-stats")
+    return {"message": "User statistics rebuild has been scheduled."}
+
+
+@router.get("/{user_id:int}/summary", response_model=UserSummaryLoad)
+async def get_user_summary(user_id: int, session: AsyncSession = Depends(get_session)):
+    """Returns the top tags and the recent activity of a User.
+
+    The summary is computed in the background; until it is, an empty summary without
+    `updated_at` is returned and its computation is scheduled.
+
+    Args:
+        user_id: The ID of the User.
+        session: The database session.
+
+    Raises:
+        HTTPException: If the User is not found.
+    """
+    if not await user_service.load(session, user_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    summary = await user_service.summaries.get(session, user_id)
+    if summary is None:
+        user_summary_worker.mark(user_id)
+        return UserSummaryLoad(user_id=user_id)
+    return summary
+
+
+@router.post("/{user_id:int}/summary/refresh", status_code=status.HTTP_202_ACCEPTED)
+async def refresh_user_summary(user_id: int, session: AsyncSession = Depends(get_session)):
+    """Schedules a refresh of the top tags and the recent activity of a User.
+
+    Args:
+        user_id: The ID of the User.
+        session: The database session.
+
+    Raises:
+        HTTPException: If the User is not found.
+    """
+    if not await user_service.load(session, user_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    user_summary_worker.mark(user_id)
+    return {"message": "User summary refresh has been scheduled."}
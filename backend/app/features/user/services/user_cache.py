@@ -0,0 +1,123 @@
+"""This module provides the process-level cache of loaded users."""
+
+import asyncio
+from typing import Dict, Iterable, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.cache import MISSING, TTLCache
+
+from ..models.user import User, UserLoad
+
+
+class UserCache:
+    """Caches UserLoad objects by id, email and username, and batches the loads by id.
+
+    Authors and answer users are looked up on almost every request, mostly for the same
+    few active users. Entries are kept for `ttl` seconds per worker and invalidated by
+    the user and account services when a user changes.
+
+    The ids that are not cached are fetched with a single `IN (...)` query on the
+    session of the caller, which already holds its connection: a cache miss never waits
+    for a connection of the pool, so requests holding every connection cannot deadlock
+    on it. Callers asking for an id that another request is already fetching wait for
+    that query instead, or fetch the id themselves if it fails.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 60.0):
+        """Initializes the UserCache.
+
+        Args:
+            maxsize: The maximum number of cached users.
+            ttl: The number of seconds a user is cached for.
+        """
+        self._by_id: TTLCache[int, UserLoad] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._ids_by_email: TTLCache[str, int] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._ids_by_username: TTLCache[str, int] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._futures: Dict[int, asyncio.Future] = {}
+
+    def get(self, user_id: int) -> UserLoad | None:
+        """Returns a cached user by id."""
+        user = self._by_id.get(user_id)
+        return None if user is MISSING else user
+
+    def get_by_email(self, email: str) -> UserLoad | None:
+        """Returns a cached user by email."""
+        user = self.get(self._ids_by_email.get(email, None))
+        return user if user is not None and user.email == email else None
+
+    def get_by_username(self, username: str) -> UserLoad | None:
+        """Returns a cached user by username."""
+        user = self.get(self._ids_by_username.get(username, None))
+        return user if user is not None and user.username == username else None
+
+    def put(self, user: UserLoad) -> None:
+        """Caches a user under its id, email and username."""
+        self._by_id.set(user.id, user)
+        self._ids_by_email.set(user.email, user.id)
+        self._ids_by_username.set(user.username, user.id)
+
+    def invalidate(self, user_id: int) -> None:
+        """Forgets a user. Its email and username entries are ignored once the id is gone."""
+        self._by_id.pop(user_id)
+
+    def stats(self) -> dict:
+        """Returns the size and hit ratio of the cache by id."""
+        return self._by_id.stats()
+
+    async def load(self, session: AsyncSession, user_id: int) -> UserLoad | None:
+        """Returns a user by id, from the cache or from the database."""
+        return (await self.load_many(session, [user_id])).get(user_id)
+
+    async def load_many(self, session: AsyncSession, user_ids: Iterable[int]) -> Dict[int, UserLoad]:
+        """Returns the users with the given ids, keyed by id, in at most one query.
+
+        Args:
+            session: The session of the caller, used to fetch the users not cached.
+            user_ids: The ids of the users.
+        """
+        users: Dict[int, UserLoad] = {}
+        fetching: Dict[int, asyncio.Future] = {}
+        missing: List[int] = []
+        for user_id in set(user_ids):
+            user = self.get(user_id)
+            if user is not None:
+                users[user_id] = user
+            elif user_id in self._futures:
+                fetching[user_id] = self._futures[user_id]
+            else:
+                missing.append(user_id)
+
+        if missing:
+            users.update(await self._fetch(session, missing))
+        for user_id, future in fetching.items():
+            # Shielded so that a cancelled caller does not cancel the load for the others.
+            user = await asyncio.shield(future)
+            if user is MISSING:
+                user = (await self._fetch(session, [user_id])).get(user_id)
+            if user is not None:
+                users[user_id] = user
+        return users
+
+    async def _fetch(self, session: AsyncSession, user_ids: List[int]) -> Dict[int, UserLoad]:
+        # The futures of a failed fetch resolve to MISSING, so that the waiting callers
+        # fetch the users themselves rather than share an error that is not theirs.
+        loop = asyncio.get_running_loop()
+        futures = {user_id: loop.create_future() for user_id in user_ids}
+        self._futures.update(futures)
+        users: Dict[int, UserLoad] = {}
+        fetched = False
+        try:
+            result = await session.execute(select(User).where(User.id.in_(user_ids)))
+            users = {user.id: UserLoad.model_validate(user) for user in result.scalars().all()}
+            fetched = True
+        finally:
+            for user_id, future in futures.items():
+                if self._futures.get(user_id) is future:
+                    del self._futures[user_id]
+                user = users.get(user_id)
+                if user is not None:
+                    self.put(user)
+                future.set_result(user if fetched else MISSING)
+        return users
@@ -1,13 +1,49 @@
 """This module provides the service for the User feature."""
 
+import re
 from typing import Type, List
 
 from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import desc, or_, select, func
 
 from app.core.lib.base_model_service import BaseModelService
+from app.core.pagination import TotalStrategy, paginate, planner_estimate
 from ..models.user import GetUsersResponse, User, UserCreate, UserLoad, UserUpdate
+from .user_cache import UserCache
+from .user_stats_services import UserStatsService
+from .user_summary_services import UserSummaryService
+
+
+def violated_index(error: IntegrityError) -> str | None:
+    """Returns the name of the unique index violated by an INSERT or UPDATE, if known.
+
+    PostgreSQL reports the name of the constraint, exposed by psycopg as `diag` and by
+    asyncpg on the driver exception. SQLite only names the table and the column, from
+    which the name of the index is derived with the naming of `op.f`.
+    """
+    orig = error.orig
+    name = getattr(getattr(orig, "diag", None), "constraint_name", None)
+    if name is None:
+        name = getattr(orig.__cause__, "constraint_name", None)
+    if name is None:
+        match = re.search(r"UNIQUE constraint failed: (\w+)\.(\w+)$", str(orig))
+        if match is not None:
+            name = f"ix_{match[1]}_{match[2]}"
+    return name
+
+
+def user_conflict(error: IntegrityError) -> HTTPException:
+    """Maps the violation of a unique index of the user table to a precise 409 error."""
+    index = violated_index(error)
+    if index == "ix_user_email":
+        detail = "User with this email already exists"
+    elif index == "ix_user_username":
+        detail = "User with this username already exists"
+    else:
+        detail = "User already exists"
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
 
 
 class UserService(BaseModelService[User, UserCreate, UserLoad, UserUpdate]):
@@ -34,36 +70,52 @@ class UserService(BaseModelService[User, UserCreate, UserLoad, UserUpdate]):
         super().__init__(model, create_schema, load_schema, update_schema)
         # The base BaseModelService includes a basic CRUD operation.
         # Feel free to override its functionality for more complex use cases.
+        self.cache = UserCache()
+        self.stats = UserStatsService()
+        self.summaries = UserSummaryService()
 
-    async def create(self, session: AsyncSession, user: UserCreate) -> UserLoad:
+    async def load(self, session: AsyncSession, id: int) -> UserLoad | None:
+        """Loads a User object by id, from the user cache when possible."""
+        return await self.cache.load(session, id)
+
+    async def create(self, session: AsyncSession, user: UserCreate, commit: bool = True) -> UserLoad:
         """Creates a new User object.
-        Args: UserCreate
 
-        Returns: UserLoad
-        """
-        # Check if email already exists.
-        count_stmt = select(func.count()).where(User.email == user.email)
-        existing_user_count = await session.scalar(count_stmt)
+        Uniqueness of the email and the username is enforced by their unique indexes, so
+        concurrent sign ups cannot both succeed and no lookup is needed beforehand. The
+        INSERT is flushed here so that a violation surfaces before the commit.
 
-        if existing_user_count > 0:
-            # Use HTTP_409_CONFLICT for a duplicate entry conflict
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="User with this email already exists",
-            )
+        Args: UserCreate
 
-        # Check if username already exists.
-        count_stmt = select(func.count()).where(User.username == user.username)
-        existing_user_count = await session.scalar(count_stmt)
+        Returns: UserLoad
 
-        if existing_user_count > 0:
-            # Use HTTP_409_CONFLICT for a duplicate entry conflict
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="User with this username already exists",
-            )
+        Raises:
+            HTTPException: 409 if the email or the username is already taken.
+        """
+        obj = self.model(**user.model_dump())
+        session.add(obj)
+        try:
+            await session.flush()
+        except IntegrityError as e:
+            await session.rollback()
+            raise user_conflict(e)
+        if commit:
+            await session.commit()
+            await session.refresh(obj)
+        return self.load_schema.model_validate(obj)
+
+    async def update(self, session: AsyncSession, obj_in: UserUpdate, commit: bool = True) -> UserLoad:
+        """Updates a User object and refreshes its cached copy."""
+        user_load = await super().update(session, obj_in, commit=commit)
+        self.cache.invalidate(user_load.id)
+        if commit:
+            self.cache.put(user_load)
+        return user_load
 
-        return await super().create(session, user)
+    async def delete(self, session: AsyncSession, db_obj: User, commit: bool = True) -> None:
+        """Deletes a User object and forgets its cached copy."""
+        await super().delete(session, db_obj, commit=commit)
+        self.cache.invalidate(db_obj.id)
 
     @staticmethod
     async def all(session: AsyncSession) -> List[UserLoad]:
@@ -79,6 +131,10 @@ class UserService(BaseModelService[User, UserCreate, UserLoad, UserUpdate]):
 
     async def load_by_email(self, session: AsyncSession, email: str) -> UserLoad:
         """Loads a User object by email."""
+        user_load = self.cache.get_by_email(email)
+        if user_load is not None:
+            return user_load
+
         stmt = select(User).where(User.email == email)
         result = await session.execute(stmt)
         user = result.scalar_one_or_none()
@@ -89,12 +145,16 @@ class UserService(BaseModelService[User, UserCreate, UserLoad, UserUpdate]):
             )
 
         user_load = UserLoad.model_validate(user)
+        self.cache.put(user_load)
 
         return user_load
 
-    @staticmethod
-    async def load_by_username(session: AsyncSession, username: str) -> UserLoad:
+    async def load_by_username(self, session: AsyncSession, username: str) -> UserLoad:
         """Loads a User object by username."""
+        user_load = self.cache.get_by_username(username)
+        if user_load is not None:
+            return user_load
+
         stmt = select(User).where(User.username == username)
         result = await session.execute(stmt)
         user = result.scalar_one_or_none()
@@ -105,6 +165,7 @@ class UserService(BaseModelService[User, UserCreate, UserLoad, UserUpdate]):
             )
 
         user_load = UserLoad.model_validate(user)
+        self.cache.put(user_load)
 
         return user_load
 
@@ -115,6 +176,7 @@ class UserService(BaseModelService[User, UserCreate, UserLoad, UserUpdate]):
         page_size: int = 10,
         query: str = "",
         filter: str = "",
+        totals: TotalStrategy = TotalStrategy.EXACT,
     ) -> GetUsersResponse:
         # Default to newest.
         order = desc(User.created_at)
@@ -134,26 +196,17 @@ class UserService(BaseModelService[User, UserCreate, UserLoad, UserUpdate]):
                 ),
             )
             .order_by(order)
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-        )
-
-        count_smtm = (
-            select(func.count())
-            .select_from(User)
-            .where(
-                or_(
-                    func.lower(User.name).like(f"%{query.lower()}%"),
-                    func.lower(User.email).like(f"%{query.lower()}%"),
-                ),
-            )
         )
-        total_result = await session.execute(count_smtm)
-        total = total_result.scalar() or 0
-        result = await session.execute(smtm)
-        users = result.scalars().all()
 
-        users_load = [UserLoad.model_validate(user) for user in users]
+        async def estimate(read_session: AsyncSession) -> int | None:
+            # The planner only knows the size of the whole table.
+            return await planner_estimate(read_session, User.__tablename__) if not query else None
 
-        return GetUsersResponse(users=users_load, total=total)
+        result = await paginate(
+            session, smtm, page, page_size, totals, estimate=estimate, cache_key=("users", query.lower())
+        )
+        users_load = [UserLoad.model_validate(user) for user in result.items]
+        for user_load in users_load:
+            self.cache.put(user_load)
 
+        return GetUsersResponse(users=users_load, total=result.total, has_more=result.has_more)
@@ -0,0 +1,94 @@
+"""This module provides the service for the statistics of users."""
+
+from sqlalchemy import insert, literal, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import delete, func, select
+
+from app.core import dialect_insert
+from app.features.answer.models.answer import Answer
+from app.features.question.models.question import Question
+
+from ..models.user_stats import BADGE_THRESHOLDS, UserStats, UserStatsLoad
+
+COUNTERS = ("num_questions", "num_answers", "question_upvotes", "answer_upvotes")
+
+
+class UserStatsService:
+    """The service for the statistics of users.
+
+    The user_stats table holds one row of counters per user, kept up to date by the
+    question, answer and vote services in the transaction of each change, so a profile
+    reads a single row by primary key. `rebuild` recomputes every row with grouped
+    aggregates, to repair drift.
+    """
+
+    async def get(self, session: AsyncSession, user_id: int) -> UserStatsLoad:
+        """Returns the statistics of a user, with the badges earned from them.
+
+        Args:
+            session: The database session.
+            user_id: The ID of the User.
+        """
+        stats = await session.get(UserStats, user_id)
+        counters = {name: getattr(stats, name) for name in COUNTERS} if stats is not None else {}
+        stats_load = UserStatsLoad(user_id=user_id, **counters)
+        stats_load.upvotes_received = stats_load.question_upvotes + stats_load.answer_upvotes
+        badges = {"bronze": 0, "silver": 0, "gold": 0}
+        for name, thresholds in BADGE_THRESHOLDS.items():
+            value = getattr(stats_load, name)
+            for badge, threshold in thresholds.items():
+                if value >= threshold:
+                    badges[badge] += 1
+        stats_load.badges = badges
+        return stats_load
+
+    async def increment(self, session: AsyncSession, user_id: int, **deltas: int) -> None:
+        """Adds deltas to the counters of a user, creating its row when missing.
+
+        This is a single INSERT ... ON CONFLICT statement. It does not commit, so the
+        counters change in the same transaction as the change they count.
+
+        Args:
+            session: The database session.
+            user_id: The ID of the User.
+            deltas: The amounts to add, by counter name.
+        """
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        smtm = dialect_insert(session, UserStats).values(user_id=user_id, **deltas)
+        smtm = smtm.on_conflict_do_update(
+            index_elements=[UserStats.user_id],
+            set_={name: getattr(UserStats, name) + smtm.excluded[name] for name in deltas},
+        )
+        await session.execute(smtm)
+
+    async def rebuild(self, session: AsyncSession) -> None:
+        """Recomputes the counters of every user from the questions and answers.
+
+        Runs as a single INSERT ... SELECT of the questions and answers grouped by user.
+        """
+        zero = literal(0)
+        activity = union_all(
+            select(
+                Question.author_id.label("user_id"),
+                func.count().label("num_questions"),
+                zero.label("num_answers"),
+                func.coalesce(func.sum(Question.upvotes), 0).label("question_upvotes"),
+                zero.label("answer_upvotes"),
+            ).group_by(Question.author_id),
+            select(
+                Answer.user_id,
+                zero,
+                func.count(),
+                zero,
+                func.coalesce(func.sum(Answer.upvotes), 0),
+            ).group_by(Answer.user_id),
+        ).subquery()
+        per_user = select(
+            activity.c.user_id, *(func.sum(activity.c[name]) for name in COUNTERS)
+        ).group_by(activity.c.user_id)
+
+        await session.execute(delete(UserStats))
+        await session.execute(insert(UserStats).from_select(["user_id", *COUNTERS], per_user))
+        await session.commit()
@@ -0,0 +1,183 @@
+"""This module provides the service for the profile summaries of users."""
+
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import delete, desc, func, select
+
+from app.features.answer.models.answer import Answer
+from app.features.interaction.models.interaction import ActionType, Interaction
+from app.features.question.models.question import Question
+from app.features.question.models.question_tag_relationship import QuestionTagRelationship
+from app.features.tag.models.tag import Tag
+
+from ..models.user import User
+from ..models.user_summary import UserActivity, UserSummary, UserSummaryLoad, UserTopTag
+
+MAX_TOP_TAGS = 10
+MAX_RECENT_ACTIVITY = 20
+
+
+class UserSummaryService:
+    """The service for the profile summaries of users.
+
+    The top tags and the recent activity of a user are computed off the request path by
+    the user summary worker, for the users whose questions, answers or interactions
+    changed, and stored as one compact row per user.
+    """
+
+    async def get(self, session: AsyncSession, user_id: int) -> UserSummaryLoad | None:
+        """Returns the stored summary of a user, or None if it was not computed yet.
+
+        Args:
+            session: The database session.
+            user_id: The ID of the User.
+        """
+        summary = await session.get(UserSummary, user_id)
+        if summary is None:
+            return None
+        return UserSummaryLoad.model_validate(summary, from_attributes=True)
+
+    async def refresh_for_users(self, session: AsyncSession, user_ids: List[int]) -> None:
+        """Recomputes the summaries of the given users.
+
+        Every query is restricted to the given users and, for the activity, to their
+        most recent rows, so the cost depends on the activity of these users only. Users
+        deleted since they were marked are skipped.
+
+        Args:
+            session: The database session.
+            user_ids: The IDs of the users to refresh.
+        """
+        user_ids = list((await session.execute(select(User.id).where(User.id.in_(user_ids)))).scalars())
+        if not user_ids:
+            return
+
+        top_tags = await self._get_top_tags(session, user_ids)
+        recent_activity = await self._get_recent_activity(session, user_ids)
+
+        now = datetime.now(timezone.utc)
+        await session.execute(delete(UserSummary).where(UserSummary.user_id.in_(user_ids)))
+        session.add_all(
+            UserSummary(
+                user_id=user_id,
+                top_tags=[tag.model_dump(mode="json") for tag in top_tags.get(user_id, [])],
+                recent_activity=[item.model_dump(mode="json") for item in recent_activity.get(user_id, [])],
+                updated_at=now,
+            )
+            for user_id in user_ids
+        )
+        await session.commit()
+
+    @staticmethod
+    async def _get_top_tags(session: AsyncSession, user_ids: List[int]) -> Dict[int, List[UserTopTag]]:
+        """Returns the tags most used by each user in their questions and answers."""
+        counts: Dict[int, Dict[int, List[int]]] = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+
+        questions_stmt = (
+            select(Question.author_id, QuestionTagRelationship.tag_id, func.count())
+            .join(QuestionTagRelationship, QuestionTagRelationship.question_id == Question.id)
+            .where(Question.author_id.in_(user_ids))
+            .group_by(Question.author_id, QuestionTagRelationship.tag_id)
+        )
+        for user_id, tag_id, num_questions in (await session.execute(questions_stmt)).all():
+            counts[user_id][tag_id][0] = num_questions
+
+        answers_stmt = (
+            select(Answer.user_id, QuestionTagRelationship.tag_id, func.count())
+            .join(QuestionTagRelationship, QuestionTagRelationship.question_id == Answer.question_id)
+            .where(Answer.user_id.in_(user_ids))
+            .group_by(Answer.user_id, QuestionTagRelationship.tag_id)
+        )
+        for user_id, tag_id, num_answers in (await session.execute(answers_stmt)).all():
+            counts[user_id][tag_id][1] = num_answers
+
+        top: Dict[int, List[tuple[int, int, int]]] = {}
+        for user_id, tags in counts.items():
+            ranked = sorted(tags.items(), key=lambda item: (-(item[1][0] + item[1][1]), item[0]))
+            top[user_id] = [
+                (tag_id, num_questions, num_answers)
+                for tag_id, (num_questions, num_answers) in ranked[:MAX_TOP_TAGS]
+            ]
+
+        tag_ids = {tag_id for tags in top.values() for tag_id, _, _ in tags}
+        names: Dict[int, str] = {}
+        if tag_ids:
+            names = dict((await session.execute(select(Tag.id, Tag.name).where(Tag.id.in_(tag_ids)))).all())
+
+        return {
+            user_id: [
+                UserTopTag(id=tag_id, name=names[tag_id], num_questions=num_questions, num_answers=num_answers)
+                for tag_id, num_questions, num_answers in tags
+                if tag_id in names
+            ]
+            for user_id, tags in top.items()
+        }
+
+    @staticmethod
+    async def _get_recent_activity(session: AsyncSession, user_ids: List[int]) -> Dict[int, List[UserActivity]]:
+        """Returns the most recent questions, answers and interactions of each user."""
+
+        def latest(stmt, user_id_column, created_at_column):
+            """Limits a select of activity rows to the most recent ones of each user."""
+            position = func.row_number().over(partition_by=user_id_column, order_by=desc(created_at_column))
+            subquery = stmt.add_columns(position.label("position")).where(user_id_column.in_(user_ids)).subquery()
+            return select(subquery).where(subquery.c.position <= MAX_RECENT_ACTIVITY)
+
+        activity: Dict[int, List[UserActivity]] = defaultdict(list)
+
+        questions_stmt = latest(
+            select(Question.author_id, Question.id, Question.title, Question.created_at),
+            Question.author_id,
+            Question.created_at,
+        )
+        for user_id, question_id, title, created_at, _ in (await session.execute(questions_stmt)).all():
+            activity[user_id].append(
+                UserActivity(
+                    type="question", target_id=question_id, question_id=question_id, title=title, created_at=created_at
+                )
+            )
+
+        answers_stmt = latest(
+            select(Answer.user_id, Answer.id, Answer.question_id, Question.title, Answer.created_at).join(
+                Question, Question.id == Answer.question_id
+            ),
+            Answer.user_id,
+            Answer.created_at,
+        )
+        for user_id, answer_id, question_id, title, created_at, _ in (await session.execute(answers_stmt)).all():
+            activity[user_id].append(
+                UserActivity(
+                    type="answer", target_id=answer_id, question_id=question_id, title=title, created_at=created_at
+                )
+            )
+
+        # Questions and answers are already listed from their own tables.
+        interactions_stmt = latest(
+            select(
+                Interaction.user_id,
+                Interaction.content_type,
+                Interaction.target_id,
+                Interaction.action_type,
+                Interaction.created_at,
+            ).where(Interaction.action_type.not_in([ActionType.QUESTION, ActionType.ANSWER])),
+            Interaction.user_id,
+            Interaction.created_at,
+        )
+        interactions = (await session.execute(interactions_stmt)).all()
+        for user_id, content_type, target_id, action_type, created_at, _ in interactions:
+            activity[user_id].append(
+                UserActivity(
+                    type=ActionType(action_type).value,
+                    target_id=target_id,
+                    question_id=target_id if content_type == "question" else None,
+                    created_at=created_at,
+                )
+            )
+
+        for items in activity.values():
+            items.sort(key=lambda item: item.created_at, reverse=True)
+            del items[MAX_RECENT_ACTIVITY:]
+        return activity
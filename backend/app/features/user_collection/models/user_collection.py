@@ -61,4 +61,16 @@ class UserCollectionLoad(UserCollectionBase):
 
 class UserCollectionPaginatedResponse(SQLModel):
     questions: List[QuestionLoad]
-    total: int
+    total: int | None
+    has_more: bool = False
+
+
+class SavedQuestionsFind(SQLModel):
+    user_id: int
+    question_ids: List[int] = Field(default=[], max_length=500)
+
+
+class SavedQuestions(SQLModel):
+    """The IDs, among the requested ones, of the questions saved by the user."""
+
+    question_ids: List[int]
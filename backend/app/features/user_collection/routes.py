@@ -1,15 +1,19 @@
 """This module provides the routes for the UserCollection feature."""
 
 from app.core import get_session
+from app.core.health import health_checks
+from app.core.pagination import TotalStrategy
 from app.features.question.models import question
 from app.features.user_collection.models.user_collection import (
+    SavedQuestions,
+    SavedQuestionsFind,
     UserCollection,
     UserCollectionCreate,
     UserCollectionLoad,
     UserCollectionPaginatedResponse,
     UserCollectionUpdate,
 )
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from .services.user_collection_services import UserCollectionService
@@ -19,6 +23,7 @@ router = APIRouter(prefix="/api/v1/user_collection", tags=["user_collection"])
 user_collection_service = UserCollectionService(
     UserCollection, UserCollectionCreate, UserCollectionLoad, UserCollectionUpdate
 )
+health_checks.register("saved-questions-cache", user_collection_service.saved_questions.stats)
 
 
 @router.get("/load/{user_id}/{question_id}", response_model=UserCollectionLoad)
@@ -36,10 +41,18 @@ async def get_user_collection(
 
 @router.post("/toggle/{user_id}/{question_id}", status_code=status.HTTP_202_ACCEPTED)
 async def toggle(
-    user_id: int, question_id: int, session: AsyncSession = Depends(get_session)
+    user_id: int,
+    question_id: int,
+    idempotency_key: str | None = Header(default=None),
+    session: AsyncSession = Depends(get_session),
 ):
-    await user_collection_service.toggle(session, user_id, question_id)
-    return {"message": "User Collectoin has been toggled."}
+    """Saves a question for a user, or removes it if it was saved.
+
+    A retried request carrying the same Idempotency-Key header is not applied again and
+    gets the result of the first attempt.
+    """
+    saved = await user_collection_service.toggle(session, user_id, question_id, idempotency_key)
+    return {"message": "User Collectoin has been toggled.", "saved": saved}
 
 
 @router.post("/user-collection", response_model=UserCollectionPaginatedResponse)
@@ -49,6 +62,7 @@ async def get_user_saved_questions(
     page_size: int = 10,
     query: str = "",
     filter: str = "",
+    totals: TotalStrategy = TotalStrategy.EXACT,
     session: AsyncSession = Depends(get_session),
 ):
     result: UserCollectionPaginatedResponse = (
@@ -59,6 +73,25 @@ async def get_user_saved_questions(
             page_size,
             query,
             filter,
+            totals,
         )
     )
     return result
+
+
+@router.post("/saved-questions", response_model=SavedQuestions)
+async def get_saved_questions(saved: SavedQuestionsFind, session: AsyncSession = Depends(get_session)):
+    """Returns which of the given questions a user saved.
+
+    Args:
+        saved: The ID of the User and the IDs of the questions.
+        session: The database session.
+    """
+    question_ids = await user_collection_service.get_saved_question_ids(session, saved.user_id, saved.question_ids)
+    return SavedQuestions(question_ids=question_ids)
+
+
+@router.get("/saved-questions/cache/stats")
+async def saved_questions_cache_stats():
+    """Returns the size and hit ratio of the saved questions cache of this worker."""
+    return user_collection_service.saved_questions.stats()
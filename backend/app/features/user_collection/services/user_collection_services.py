@@ -1,15 +1,21 @@
 """This module provides the service for the UserCollection feature."""
 
-from typing import Type
+from datetime import datetime, timezone
+from typing import List, Type
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from sqlmodel import and_, desc, func, or_, select
+from sqlmodel import and_, delete, desc, func, or_, select
 
+from app.core import dialect_insert
 from app.core.lib.base_model_service import BaseModelService
+from app.core.pagination import TotalStrategy, paginate
 from app.features.answer.models.answer import Answer
-from app.features.question.models.question import Question, QuestionLoad
+from app.features.question.models.question import Question
+from app.features.question.services.question_loads import QUESTION_LOAD_OPTIONS, to_question_loads
+from app.features.idempotency.routes import idempotency_service
+from app.features.outbox.routes import outbox_service
 
+from .saved_questions_cache import SavedQuestionsCache
 from ..models.user_collection import (
     UserCollection,
     UserCollectionCreate,
@@ -47,6 +53,7 @@ class UserCollectionService(
         super().__init__(model, create_schema, load_schema, update_schema)
         # The base BaseModelService includes a basic CRUD operation.
         # Feel free to override its functionality for more complex use cases.
+        self.saved_questions = SavedQuestionsCache()
 
     async def load(self, session: AsyncSession, user_id: int, question_id: int):
         smtm = select(UserCollection).where(
@@ -60,21 +67,69 @@ class UserCollectionService(
             collection = UserCollectionLoad.model_validate(collection)
         return collection
 
-    async def toggle(self, session: AsyncSession, user_id: int, question_id: int):
-        smtm = select(UserCollection).where(
-            UserCollection.user_id == user_id,
-            UserCollection.question_id == question_id,
-        )
-        result = await session.execute(smtm)
-        collection = result.scalar_one_or_none()
+    async def toggle(
+        self, session: AsyncSession, user_id: int, question_id: int, idempotency_key: str | None = None
+    ) -> bool:
+        """Saves a question for a user, or removes it if it was saved.
 
-        if not collection:
-            new_collection = UserCollection(user_id=user_id, question_id=question_id)
-            session.add(new_collection)
-        else:
-            await session.delete(collection)
+        This is a conditional DELETE followed, when nothing was deleted, by an INSERT
+        that does nothing on conflict, so concurrent toggles never fail on the primary key.
+
+        Args:
+            session: The database session.
+            user_id: The ID of the User.
+            question_id: The ID of the Question.
+            idempotency_key: The key identifying retries of the same request. A retry
+                gets the result of the first attempt and changes nothing.
+
+        Returns:
+            Whether the question is saved after the toggle.
+        """
+        if idempotency_key is not None:
+            replayed = await idempotency_service.claim(
+                session, user_id, "user-collection-toggle", idempotency_key, str(question_id)
+            )
+            if replayed is not None:
+                return replayed["saved"]
+
+        removed = await session.execute(
+            delete(UserCollection).where(
+                UserCollection.user_id == user_id,
+                UserCollection.question_id == question_id,
+            )
+        )
+        saved = not removed.rowcount
+        if saved:
+            now = datetime.now(timezone.utc)
+            smtm = dialect_insert(session, UserCollection).values(
+                user_id=user_id, question_id=question_id, created_at=now, updated_at=now
+            )
+            await session.execute(
+                smtm.on_conflict_do_nothing(index_elements=[UserCollection.user_id, UserCollection.question_id])
+            )
 
+        # The recommendations of the user are refreshed by the subscriber of the event.
+        outbox_service.append(session, "collection.toggled", user_id=user_id, question_id=question_id, saved=saved)
+        if idempotency_key is not None:
+            await idempotency_service.record(
+                session, user_id, "user-collection-toggle", idempotency_key, {"saved": saved}
+            )
         await session.commit()
+        self.saved_questions.set_saved(user_id, question_id, saved)
+        return saved
+
+    async def get_saved_question_ids(self, session: AsyncSession, user_id: int, question_ids: List[int]) -> List[int]:
+        """Returns which of the given questions a user saved.
+
+        Served from the saved questions of the user cached by this worker, so the saved
+        flags of a page cost no query once the user is cached.
+
+        Args:
+            session: The database session.
+            user_id: The ID of the User.
+            question_ids: The IDs of the questions.
+        """
+        return await self.saved_questions.get_saved(session, user_id, question_ids)
 
     async def get_user_saved_questions(
         self,
@@ -84,6 +139,7 @@ class UserCollectionService(
         page_size: int = 10,
         query: str = "",
         filter: str = "",
+        totals: TotalStrategy = TotalStrategy.EXACT,
     ) -> UserCollectionPaginatedResponse:
         order = desc(Question.upvotes)
         if filter == "oldest":
@@ -106,11 +162,7 @@ class UserCollectionService(
         base_smtm = (
             select(Question)
             .join(UserCollection)
-            .options(
-                selectinload(Question.tags),
-                selectinload(Question.answers),
-                selectinload(Question.author),
-            )
+            .options(*QUESTION_LOAD_OPTIONS)
             .where(
                 and_(
                     Question.id == UserCollection.question_id,
@@ -123,16 +175,14 @@ class UserCollectionService(
             )
         )
 
-        paginated_smtm = (
-            base_smtm.offset((page - 1) * page_size).limit(page_size).order_by(order)
+        result = await paginate(
+            session,
+            base_smtm.order_by(order),
+            page,
+            page_size,
+            totals,
+            cache_key=("user_collection", user_id, query.lower()),
         )
-        paginated_result = await session.execute(paginated_smtm)
-        questions = paginated_result.scalars().all()
-        questions_load = [QuestionLoad.model_validate(q) for q in questions]
-
-        count_smtm = select(func.count()).select_from(base_smtm.subquery())
-
-        count_result = await session.execute(count_smtm)
-        total = count_result.scalar() or 0
+        questions_load = await to_question_loads(session, result.items)
 
-        return UserCollectionPaginatedResponse(questions=questions_load, total=total)
+        return UserCollectionPaginatedResponse(questions=questions_load, total=result.total, has_more=result.has_more)
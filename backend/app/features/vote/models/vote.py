@@ -1,7 +1,7 @@
 """This module defines the data models for the Vote feature."""
 
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Dict, List, Optional
 import sqlalchemy as sa
 from sqlmodel import SQLModel, Field, Column, func
 from enum import Enum
@@ -35,6 +35,10 @@ class Vote(VoteBase, table=True):
         default_factory=lambda: datetime.now(timezone.utc)
     )
 
+    __table_args__ = (
+        sa.Index("ix_vote_user_id_target_vote_target_id", "user_id", "target_vote", "target_id", unique=True),
+    )
+
 
 class VoteCreate(VoteBase):
     """Schema for creating a new Vote.
@@ -84,3 +88,25 @@ class VoteDoVote(SQLModel):
     target_id: int
     target_vote: TargetVote
     vote_type: VoteType
+
+
+class VoteDoVoteResult(SQLModel):
+    """The vote type of the user on the target after a vote, None if the vote was removed."""
+
+    vote_type: VoteType | None
+
+
+class VoteStatesFind(SQLModel):
+    user_id: int
+    question_ids: List[int] = Field(default=[], max_length=500)
+    answer_ids: List[int] = Field(default=[], max_length=500)
+
+
+class VoteStates(SQLModel):
+    """The vote type of a user on each of a set of targets, keyed by target id.
+
+    Targets the user has not voted on are left out.
+    """
+
+    questions: Dict[int, VoteType] = {}
+    answers: Dict[int, VoteType] = {}
@@ -1,17 +1,24 @@
 """This module provides the routes for the Vote feature."""
 
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core import get_session
+from app.core import get_session, session_scope
+from app.core.health import health_checks
+from app.features.outbox.routes import outbox_service
+from app.features.question.routes import question_service
 from app.features.vote.models.vote import (
+    TargetVote,
     Vote,
     VoteCreate,
     VoteDoVote,
+    VoteDoVoteResult,
     VoteFind,
     VoteLoad,
+    VoteStates,
+    VoteStatesFind,
     VoteUpdate,
 )
 
@@ -20,6 +27,19 @@ from .services.vote_services import VoteService
 router = APIRouter(prefix="/api/v1/vote", tags=["vote"])
 
 vote_service = VoteService(Vote, VoteCreate, VoteLoad, VoteUpdate)
+health_checks.register("vote-state-cache", vote_service.state_cache.stats)
+
+
+async def _on_votes_changed(events: List[Dict[str, Any]]) -> None:
+    """Updates the hot scores of the questions whose votes changed."""
+    question_ids = sorted({event["target_id"] for event in events if event["target_vote"] == TargetVote.QUESTION})
+    async with session_scope() as session:
+        for question_id in question_ids:
+            await question_service.update_hot_score(session, question_id, commit=False)
+        await session.commit()
+
+
+outbox_service.subscribe("vote.changed", _on_votes_changed)
 
 
 @router.post("/find-vote", response_model=Optional[VoteLoad])
@@ -30,13 +50,45 @@ async def find_vote(vote: VoteFind, session: AsyncSession = Depends(get_session)
     return vote_load
 
 
-@router.post("/do-vote", response_model=None)
-async def do_vote(vote: VoteDoVote, session: AsyncSession = Depends(get_session)):
+@router.post("/do-vote", response_model=VoteDoVoteResult)
+async def do_vote(
+    vote: VoteDoVote,
+    idempotency_key: str | None = Header(default=None),
+    session: AsyncSession = Depends(get_session),
+):
+    """Toggles the vote of a user on a target.
+
+    A retried request carrying the same Idempotency-Key header is not applied again and
+    gets the result of the first attempt.
+
+    Args:
+        vote: The vote.
+        idempotency_key: The key identifying retries of the same request.
+        session: The database session.
+    """
     try:
-        result = await vote_service.do_vote(session=session, vote=vote)
-        return result
+        return await vote_service.do_vote(session=session, vote=vote, idempotency_key=idempotency_key)
+    except HTTPException:
+        raise
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error computing the vote",
         )
+
+
+@router.post("/vote-states", response_model=VoteStates)
+async def get_vote_states(votes: VoteStatesFind, session: AsyncSession = Depends(get_session)):
+    """Returns the votes of a user on many questions and answers at once.
+
+    Args:
+        votes: The ID of the User and the IDs of the questions and answers.
+        session: The database session.
+    """
+    return await vote_service.get_vote_states(session, votes.user_id, votes.question_ids, votes.answer_ids)
+
+
+@router.get("/vote-states/cache/stats")
+async def vote_state_cache_stats():
+    """Returns the size and hit ratio of the recent vote states cache of this worker."""
+    return vote_service.state_cache.stats()
@@ -1,22 +1,30 @@
 """This module provides the service for the Vote feature."""
 
-from typing import Type
+from datetime import datetime, timezone
+from typing import Iterable, Type
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.functions import count
-from sqlmodel import delete, func, select, update
+from sqlmodel import and_, delete, func, or_, select, update
 
+from app.core import dialect_insert
 from app.core.lib.base_model_service import BaseModelService
 from app.features.answer.models.answer import Answer
 from app.features.question.models.question import Question
+from app.features.idempotency.routes import idempotency_service
+from app.features.outbox.routes import outbox_service
+from app.features.user.routes import user_service
 
+from .vote_state_cache import VoteStateCache
 from ..models.vote import (
     TargetVote,
     Vote,
     VoteCreate,
     VoteDoVote,
+    VoteDoVoteResult,
     VoteFind,
     VoteLoad,
+    VoteStates,
     VoteType,
     VoteUpdate,
 )
@@ -46,6 +54,7 @@ class VoteService(BaseModelService[Vote, VoteCreate, VoteLoad, VoteUpdate]):
         super().__init__(model, create_schema, load_schema, update_schema)
         # The base BaseModelService includes a basic CRUD operation.
         # Feel free to override its functionality for more complex use cases.
+        self.state_cache = VoteStateCache()
 
     async def find_vote(
         self,
@@ -71,96 +80,164 @@ class VoteService(BaseModelService[Vote, VoteCreate, VoteLoad, VoteUpdate]):
         vote_load = VoteLoad.model_validate(first_vote)
         return vote_load
 
+    async def get_vote_states(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        question_ids: Iterable[int] = (),
+        answer_ids: Iterable[int] = (),
+    ) -> VoteStates:
+        """Returns the votes of a user on many questions and answers in at most one query.
+
+        The query is served by the (user_id, target_vote, target_id) index, and only asks
+        for the targets missing from the recent vote states of the user.
+
+        Args:
+            session: The database session.
+            user_id: The ID of the User.
+            question_ids: The IDs of the questions.
+            answer_ids: The IDs of the answers.
+        """
+        wanted = [(TargetVote.QUESTION, target_id) for target_id in set(question_ids)]
+        wanted += [(TargetVote.ANSWER, target_id) for target_id in set(answer_ids)]
+        found, missing = self.state_cache.get_many(user_id, wanted)
+
+        if missing:
+            missing_question_ids = [
+                target_id for target_vote, target_id in missing if target_vote == TargetVote.QUESTION
+            ]
+            missing_answer_ids = [
+                target_id for target_vote, target_id in missing if target_vote == TargetVote.ANSWER
+            ]
+            targets = []
+            if missing_question_ids:
+                targets.append(and_(Vote.target_vote == TargetVote.QUESTION, Vote.target_id.in_(missing_question_ids)))
+            if missing_answer_ids:
+                targets.append(and_(Vote.target_vote == TargetVote.ANSWER, Vote.target_id.in_(missing_answer_ids)))
+            smtm = select(Vote.target_vote, Vote.target_id, Vote.vote_type).where(
+                Vote.user_id == user_id, or_(*targets)
+            )
+            result = await session.execute(smtm)
+            fetched = dict.fromkeys(missing)
+            for target_vote, target_id, vote_type in result.all():
+                fetched[(target_vote, target_id)] = vote_type
+            self.state_cache.put_many(user_id, fetched)
+            found.update(fetched)
+
+        states = VoteStates()
+        for (target_vote, target_id), vote_type in found.items():
+            if vote_type is None:
+                continue
+            if target_vote == TargetVote.QUESTION:
+                states.questions[target_id] = vote_type
+            else:
+                states.answers[target_id] = vote_type
+        return states
+
     async def do_vote(
         self,
         session: AsyncSession,
         vote: VoteDoVote,
-    ) -> VoteLoad | None:
-        vote_find = VoteFind.model_validate(vote.model_dump())
-        existing_vote = await self.find_vote(session, vote_find)
-
-        if not existing_vote:
-            # Create a new vote
-            new_vote = Vote(**vote.model_dump())
-            session.add(new_vote)
-            await session.commit()
-            await session.refresh(new_vote)
-        else:
-            # Update vote.
-            existing_vote_db = await session.get(Vote, existing_vote.id)
-            if existing_vote_db and existing_vote_db.vote_type == vote.vote_type:
-                # Remove existing vote.
-                await session.delete(existing_vote_db)
-                await session.commit()
-            elif existing_vote_db:
-                # Change vote type
-                existing_vote_db.vote_type = vote.vote_type
-                await session.commit()
-
-        # Update target count.
-        if vote.target_vote == TargetVote.QUESTION:
-            upvotes_smtm = (
-                select(func.count())
-                .select_from(Vote)
-                .where(
-                    Vote.target_id == vote.target_id,
-                    Vote.target_vote == TargetVote.QUESTION,
-                    Vote.vote_type == VoteType.UPVOTE,
-                )
-            )
-            result = await session.execute(upvotes_smtm)
-            upvotes_count = result.scalar()
-
-            downvotes_smtm = (
-                select(func.count())
-                .select_from(Vote)
-                .where(
-                    Vote.target_id == vote.target_id,
-                    Vote.target_vote == TargetVote.QUESTION,
-                    Vote.vote_type == VoteType.DOWNVOTE,
-                )
-            )
-            result = await session.execute(downvotes_smtm)
-            downvotes_count = result.scalar()
+        idempotency_key: str | None = None,
+    ) -> VoteDoVoteResult:
+        """Toggles the vote of a user on a target and updates the vote counts of the target.
+
+        Voting again with the same type removes the vote; voting with the other type
+        changes it. This is a conditional DELETE of the same vote, or else a conditional
+        UPDATE of the other one, or else an INSERT that does nothing on conflict with the
+        unique (user_id, target_vote, target_id) index, so concurrent votes of a user on
+        a target never create duplicates. The vote counts of the target, the upvotes
+        received by its author and the `vote.changed` event are updated in the same
+        transaction, by the change of the vote rather than recounted, so concurrent
+        votes of different users on a target are not lost.
 
-            smtm = (
-                update(Question)
-                .where(Question.id == vote.target_id)
-                .values(upvotes=upvotes_count, downvotes=downvotes_count)
-            )
-            await session.execute(smtm)
-            await session.commit()
-
-        elif vote.target_vote == TargetVote.ANSWER:
-            upvotes_smtm = (
-                select(func.count())
-                .select_from(Vote)
-                .where(
-                    Vote.target_id == vote.target_id,
-                    Vote.target_vote == TargetVote.ANSWER,
-                    Vote.vote_type == VoteType.UPVOTE,
-                )
+        Args:
+            session: The database session.
+            vote: The vote.
+            idempotency_key: The key identifying retries of the same request. A retry
+                gets the result of the first attempt and changes nothing.
+
+        Returns:
+            The vote type of the user on the target after the toggle.
+        """
+        if idempotency_key is not None:
+            fingerprint = f"{vote.target_vote.value}:{vote.target_id}:{vote.vote_type.value}"
+            replayed = await idempotency_service.claim(session, vote.user_id, "do-vote", idempotency_key, fingerprint)
+            if replayed is not None:
+                return VoteDoVoteResult.model_validate(replayed)
+
+        target = (
+            Vote.user_id == vote.user_id,
+            Vote.target_vote == vote.target_vote,
+            Vote.target_id == vote.target_id,
+        )
+        now = datetime.now(timezone.utc)
+        removed = await session.execute(delete(Vote).where(*target, Vote.vote_type == vote.vote_type))
+        if removed.rowcount:
+            previous_type, vote_type = vote.vote_type, None
+        else:
+            changed = await session.execute(
+                update(Vote).where(*target).values(vote_type=vote.vote_type, updated_at=now)
             )
-            result = await session.execute(upvotes_smtm)
-            upvotes_count = result.scalar()
-
-            downvotes_smtm = (
-                select(func.count())
-                .select_from(Vote)
-                .where(
-                    Vote.target_id == vote.target_id,
-                    Vote.target_vote == TargetVote.ANSWER,
-                    Vote.vote_type == VoteType.DOWNVOTE,
+            if changed.rowcount:
+                previous_type = next(other for other in VoteType if other != vote.vote_type)
+                vote_type = vote.vote_type
+            else:
+                smtm = dialect_insert(session, Vote).values(**vote.model_dump(), created_at=now, updated_at=now)
+                smtm = smtm.on_conflict_do_nothing(index_elements=[Vote.user_id, Vote.target_vote, Vote.target_id])
+                inserted = await session.execute(smtm)
+                if inserted.rowcount:
+                    previous_type, vote_type = None, vote.vote_type
+                else:
+                    # A concurrent request of the user voted first; leave its vote as is.
+                    vote_type = await session.scalar(select(Vote.vote_type).where(*target))
+                    previous_type = vote_type
+
+        upvotes_delta = (vote_type == VoteType.UPVOTE) - (previous_type == VoteType.UPVOTE)
+        downvotes_delta = (vote_type == VoteType.DOWNVOTE) - (previous_type == VoteType.DOWNVOTE)
+        if upvotes_delta or downvotes_delta:
+            target_model = Question if vote.target_vote == TargetVote.QUESTION else Answer
+            await session.execute(
+                update(target_model)
+                .where(target_model.id == vote.target_id)
+                .values(
+                    upvotes=func.coalesce(target_model.upvotes, 0) + upvotes_delta,
+                    downvotes=func.coalesce(target_model.downvotes, 0) + downvotes_delta,
                 )
             )
-            result = await session.execute(downvotes_smtm)
-            downvotes_count = result.scalar()
+        if upvotes_delta:
+            await self._update_author_upvotes(session, vote.target_vote, vote.target_id, upvotes_delta)
+        # The hot score is updated by the subscriber of the event.
+        self._append_vote_changed(session, vote, vote_type)
+        if idempotency_key is not None:
+            result = VoteDoVoteResult(vote_type=vote_type).model_dump(mode="json")
+            await idempotency_service.record(session, vote.user_id, "do-vote", idempotency_key, result)
+        await session.commit()
+        self.state_cache.put(vote.user_id, (vote.target_vote, vote.target_id), vote_type)
+        return VoteDoVoteResult(vote_type=vote_type)
+
+    @staticmethod
+    def _append_vote_changed(session: AsyncSession, vote: VoteDoVote, vote_type: VoteType | None) -> None:
+        """Appends the event of a vote, committed with the vote and the new counts of its target."""
+        outbox_service.append(
+            session,
+            "vote.changed",
+            user_id=vote.user_id,
+            target_vote=vote.target_vote.value,
+            target_id=vote.target_id,
+            vote_type=vote_type.value if vote_type is not None else None,
+        )
 
-            smtm = (
-                update(Answer)
-                .where(Answer.id == vote.target_id)
-                .values(upvotes=upvotes_count, downvotes=downvotes_count)
-            )
-            await session.execute(smtm)
-            await session.commit()
-        return None
+    @staticmethod
+    async def _update_author_upvotes(
+        session: AsyncSession, target_vote: TargetVote, target_id: int, delta: int
+    ) -> None:
+        """Adds a delta to the upvotes received by the author of a question or an answer."""
+        if target_vote == TargetVote.QUESTION:
+            author_id = await session.scalar(select(Question.author_id).where(Question.id == target_id))
+            counter = "question_upvotes"
+        else:
+            author_id = await session.scalar(select(Answer.user_id).where(Answer.id == target_id))
+            counter = "answer_upvotes"
+        if author_id is not None:
+            await user_service.stats.increment(session, author_id, **{counter: delta})
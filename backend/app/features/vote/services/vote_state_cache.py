@@ -0,0 +1,61 @@
+"""This module provides the process-level cache of the recent vote states of users."""
+
+from typing import Dict, Iterable, List, Tuple
+
+from app.core.cache import MISSING, TTLCache
+
+from ..models.vote import TargetVote, VoteType
+
+Target = Tuple[TargetVote, int]
+
+
+class VoteStateCache:
+    """Caches, per user, the vote type on the targets that were recently looked up.
+
+    A user browsing question pages asks for the same targets again and again, e.g. the
+    question and its answers when coming back to a page. The known states of a user are
+    kept for `ttl` seconds per worker, including the targets the user did not vote on,
+    and updated by `do_vote` of this worker.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 60.0, max_targets: int = 1000):
+        """Initializes the VoteStateCache.
+
+        Args:
+            maxsize: The maximum number of users whose states are cached.
+            ttl: The number of seconds the states of a user are cached for.
+            max_targets: The maximum number of targets cached per user.
+        """
+        self.max_targets = max_targets
+        self._by_user: TTLCache[int, Dict[Target, VoteType | None]] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get_many(self, user_id: int, targets: Iterable[Target]) -> Tuple[Dict[Target, VoteType | None], List[Target]]:
+        """Returns the cached states of a user on targets, and the targets that are not cached."""
+        states = self._by_user.get(user_id)
+        if states is MISSING:
+            return {}, list(targets)
+        found, missing = {}, []
+        for target in targets:
+            if target in states:
+                found[target] = states[target]
+            else:
+                missing.append(target)
+        return found, missing
+
+    def put_many(self, user_id: int, states: Dict[Target, VoteType | None]) -> None:
+        """Caches the states of a user on targets, None meaning that the user did not vote."""
+        cached = self._by_user.get(user_id)
+        if cached is MISSING or len(cached) + len(states) > self.max_targets:
+            cached = {}
+            self._by_user.set(user_id, cached)
+        cached.update(states)
+
+    def put(self, user_id: int, target: Target, vote_type: VoteType | None) -> None:
+        """Caches the state of a user on a target, if states of that user are cached."""
+        cached = self._by_user.get(user_id)
+        if cached is not MISSING:
+            cached[target] = vote_type
+
+    def stats(self) -> dict:
+        """Returns the size and hit ratio of the cache by user."""
+        return self._by_user.stats()
@@ -1,8 +1,15 @@
 from contextlib import asynccontextmanager
 
 from app import features
+from app.core.health import health_checks
+from app.core.load_shedding import LoadSheddingMiddleware, Priority, load_shedder
+from app.core.rate_limit import RateLimitMiddleware, rate_limiter
+from app.core.scheduler import job_scheduler
 from app.core.settings import settings
-from fastapi import FastAPI
+from app.core.warmup import cache_warmer
+from app.features.recommendation.routes import recommendation_worker
+from app.features.user.routes import user_summary_worker
+from fastapi import FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 
 from fastfeatures import add_features_routes
@@ -11,7 +18,20 @@ from fastfeatures import add_features_routes
 @asynccontextmanager
 async def life_span(app: FastAPI):
     print("Server is starting ...")
+    await recommendation_worker.start()
+    await user_summary_worker.start()
+    # In worker mode, the periodic jobs run in the `python -m app.worker` process.
+    await job_scheduler.start(periodic=settings.JOB_SCHEDULER_MODE == "inline")
+    # The worker serves requests while warming but is only reported ready afterwards.
+    if settings.WARMUP_ENABLED:
+        cache_warmer.start()
+    else:
+        cache_warmer.skip()
     yield
+    await cache_warmer.stop()
+    await job_scheduler.stop()
+    await user_summary_worker.stop()
+    await recommendation_worker.stop()
     print("Server has been stopped.")
 
 
@@ -22,6 +42,30 @@ app = FastAPI(
     lifespan=life_span,
 )
 
+# Health probes are never shed. Sign-ins come before writes, writes before reads and
+# reads before searches, which also share the small limit of their group.
+load_shedder.add_rule("/health/*", exempt=True)
+load_shedder.add_rule("/api/v1/*/export", Priority.SEARCH, methods=("GET",), group="export", sample=False)
+load_shedder.add_rule("/api/v1/account/*", Priority.CRITICAL)
+load_shedder.add_rule("/api/v1/question/questions", Priority.SEARCH, group="search")
+load_shedder.add_rule("/api/v1/tag/{tag_id}/questions", Priority.SEARCH, group="search")
+load_shedder.add_rule("/api/v1/user/users", Priority.SEARCH, methods=("POST",), group="search")
+load_shedder.add_rule("/api/v1/user/", Priority.SEARCH, methods=("GET",), group="search")
+app.add_middleware(LoadSheddingMiddleware)
+
+# Rate limited requests are rejected before they wait for a slot.
+rate_limiter.add_rule("sign-in", "/api/v1/account/sign-in-with-credentials/", methods=("POST",))
+rate_limiter.add_rule("sign-in", "/api/v1/account/sign-up-with-credentials", methods=("POST",))
+rate_limiter.add_rule("sign-in", "/api/v1/account/sign-in-with-oauth", methods=("POST",))
+rate_limiter.add_rule("vote", "/api/v1/vote/do-vote", methods=("POST",))
+rate_limiter.add_rule(
+    "collection-toggle", "/api/v1/user_collection/toggle/{user_id}/{question_id}", methods=("POST",), key="user"
+)
+rate_limiter.add_rule("search", "/api/v1/question/questions", methods=("GET",))
+rate_limiter.add_rule("search", "/api/v1/tag/{tag_id}/questions", methods=("GET",))
+rate_limiter.add_rule("search", "/api/v1/user/users", methods=("POST",))
+app.add_middleware(RateLimitMiddleware)
+
 # Add middleware to prevent CORS issues
 app.add_middleware(
     CORSMiddleware,
@@ -41,4 +85,32 @@ def read_root():
     return {"message": "Welcome to DevFlow} API"}
 
 
+health_checks.register("job-scheduler", job_scheduler.metrics)
+health_checks.register("warmup", cache_warmer.metrics)
+health_checks.register("user-summary-worker", lambda: {"pending": user_summary_worker.pending})
+health_checks.register("recommendation-worker", lambda: {"pending": recommendation_worker.pending})
+health_checks.register("load-shedding", load_shedder.metrics)
+health_checks.register("rate-limiting", rate_limiter.metrics)
+
+
+@app.get("/health/live")
+async def live():
+    """
+    Liveness probe: succeeds as long as the event loop of the worker answers.
+    """
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def ready(response: Response):
+    """
+    Readiness probe: fails while the worker is warming, cannot reach the database
+    or has exhausted its connection pool.
+    """
+    readiness = await health_checks.readiness()
+    if not readiness["ready"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return readiness
+
+
 add_features_routes(app, features)
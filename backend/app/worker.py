@@ -0,0 +1,30 @@
+"""Runs the periodic background jobs in a dedicated process.
+
+Used with JOB_SCHEDULER_MODE=worker, so that the web processes serve requests only:
+
+    python -m app.worker
+"""
+
+import asyncio
+import signal
+
+from app import main  # noqa: F401 - registers the jobs of every feature.
+from app.core.scheduler import job_scheduler
+
+
+async def run() -> None:
+    """Runs the job scheduler until SIGINT or SIGTERM, then drains it."""
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    print("Worker is starting ...")
+    await job_scheduler.start(periodic=True)
+    await stopping.wait()
+    await job_scheduler.stop()
+    print("Worker has been stopped.")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
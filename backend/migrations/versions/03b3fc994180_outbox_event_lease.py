@@ -0,0 +1,31 @@
+"""Outbox event lease
+
+Revision ID: 03b3fc994180
+Revises: 401af834f921
+Create Date: 2026-10-19 20:29:46.218113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = '03b3fc994180'
+down_revision: Union[str, Sequence[str], None] = '401af834f921'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('outbox_event', sa.Column('locked_until', sa.DateTime(), nullable=True))
+    op.add_column('outbox_event', sa.Column('last_error', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('outbox_event', 'last_error')
+    op.drop_column('outbox_event', 'locked_until')
@@ -0,0 +1,27 @@
+"""User email unique index
+
+Revision ID: 2f6a9c3d8e15
+Revises: 9d4c7a1e3f62
+Create Date: 2026-10-19 16:02:44.730915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f6a9c3d8e15'
+down_revision: Union[str, Sequence[str], None] = '9d4c7a1e3f62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_user_email'), 'user', ['email'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_email'), table_name='user')
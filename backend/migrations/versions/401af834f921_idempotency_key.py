@@ -0,0 +1,44 @@
+"""Idempotency key
+
+Revision ID: 401af834f921
+Revises: f1a4c7d9e263
+Create Date: 2026-10-19 20:28:00.047223
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = '401af834f921'
+down_revision: Union[str, Sequence[str], None] = 'f1a4c7d9e263'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('idempotency_key',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('route', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('key', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('fingerprint', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_idempotency_key_created_at'), 'idempotency_key', ['created_at'], unique=False)
+    op.create_index(
+        'ix_idempotency_key_user_id_route_key', 'idempotency_key', ['user_id', 'route', 'key'], unique=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_idempotency_key_user_id_route_key', table_name='idempotency_key')
+    op.drop_index(op.f('ix_idempotency_key_created_at'), table_name='idempotency_key')
+    op.drop_table('idempotency_key')
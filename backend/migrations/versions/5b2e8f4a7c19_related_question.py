@@ -0,0 +1,37 @@
+"""Related question
+
+Revision ID: 5b2e8f4a7c19
+Revises: e47a2b9c13d8
+Create Date: 2026-10-19 14:05:47.118260
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e8f4a7c19'
+down_revision: Union[str, Sequence[str], None] = 'e47a2b9c13d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('related_question',
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('related_question_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['question_id'], ['question.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['related_question_id'], ['question.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('question_id', 'related_question_id')
+    )
+    op.create_index('ix_related_question_question_id_score', 'related_question', ['question_id', 'score'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_related_question_question_id_score', table_name='related_question')
+    op.drop_table('related_question')
@@ -0,0 +1,32 @@
+"""User username unique index
+
+Revision ID: 7e1b5d2c9a48
+Revises: 2f6a9c3d8e15
+Create Date: 2026-10-19 16:40:12.381607
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '7e1b5d2c9a48'
+down_revision: Union[str, Sequence[str], None] = '2f6a9c3d8e15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The oldest user keeps a duplicated username, the others get their id as suffix.
+    op.execute(sa.text(
+        'UPDATE "user" SET username = username || \'-\' || CAST(id AS VARCHAR) '
+        'WHERE id NOT IN (SELECT MIN(id) FROM "user" GROUP BY username)'
+    ))
+    op.create_index(op.f('ix_user_username'), 'user', ['username'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_username'), table_name='user')
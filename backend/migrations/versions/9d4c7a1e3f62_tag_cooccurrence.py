@@ -0,0 +1,49 @@
+"""Tag co-occurrence
+
+Revision ID: 9d4c7a1e3f62
+Revises: 5b2e8f4a7c19
+Create Date: 2026-10-19 15:21:09.583114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4c7a1e3f62'
+down_revision: Union[str, Sequence[str], None] = '5b2e8f4a7c19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('tag_cooccurrence',
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.Column('related_tag_id', sa.Integer(), nullable=False),
+    sa.Column('num_questions', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['related_tag_id'], ['tag.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tag_id'], ['tag.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('tag_id', 'related_tag_id')
+    )
+    op.create_index(
+        'ix_tag_cooccurrence_tag_id_num_questions', 'tag_cooccurrence', ['tag_id', 'num_questions'], unique=False
+    )
+    # Backfill the counts from the existing questions.
+    op.execute(
+        """
+        INSERT INTO tag_cooccurrence (tag_id, related_tag_id, num_questions)
+        SELECT a.tag_id, b.tag_id, COUNT(*)
+        FROM questiontagrelationship a
+        JOIN questiontagrelationship b ON a.question_id = b.question_id AND a.tag_id <> b.tag_id
+        GROUP BY a.tag_id, b.tag_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tag_cooccurrence_tag_id_num_questions', table_name='tag_cooccurrence')
+    op.drop_table('tag_cooccurrence')
@@ -0,0 +1,40 @@
+"""Question recommendation
+
+Revision ID: a3f1c9d27e54
+Revises: 752f75186a8a
+Create Date: 2026-10-19 10:12:31.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c9d27e54'
+down_revision: Union[str, Sequence[str], None] = '752f75186a8a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('question_recommendation',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['question_id'], ['question.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'question_id')
+    )
+    op.create_index(
+        'ix_question_recommendation_user_id_score', 'question_recommendation', ['user_id', 'score'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_question_recommendation_user_id_score', table_name='question_recommendation')
+    op.drop_table('question_recommendation')
@@ -0,0 +1,52 @@
+"""Question recommendation cascade
+
+Revision ID: a7d2e4f9c1b3
+Revises: a3f1c9d27e54
+Create Date: 2026-10-19 10:37:16.829305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d2e4f9c1b3'
+down_revision: Union[str, Sequence[str], None] = 'a3f1c9d27e54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_table(ondelete: str | None) -> None:
+    op.create_table('question_recommendation',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['question_id'], ['question.id'], ondelete=ondelete),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete=ondelete),
+    sa.PrimaryKeyConstraint('user_id', 'question_id')
+    )
+    op.create_index(
+        'ix_question_recommendation_user_id_score', 'question_recommendation', ['user_id', 'score'], unique=False
+    )
+
+
+def _drop_table() -> None:
+    op.drop_index('ix_question_recommendation_user_id_score', table_name='question_recommendation')
+    op.drop_table('question_recommendation')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The recommendations are derived data, recomputed by the recommendation worker for
+    # the users whose feed is empty, so the table is recreated rather than altered.
+    _drop_table()
+    _create_table(ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _drop_table()
+    _create_table(ondelete=None)
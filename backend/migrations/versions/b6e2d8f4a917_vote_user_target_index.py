@@ -0,0 +1,29 @@
+"""Vote user target index
+
+Revision ID: b6e2d8f4a917
+Revises: 7e1b5d2c9a48
+Create Date: 2026-10-19 18:05:41.209354
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e2d8f4a917'
+down_revision: Union[str, Sequence[str], None] = '7e1b5d2c9a48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_vote_user_id_target_vote_target_id', 'vote', ['user_id', 'target_vote', 'target_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_vote_user_id_target_vote_target_id', table_name='vote')
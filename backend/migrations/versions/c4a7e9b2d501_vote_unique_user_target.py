@@ -0,0 +1,46 @@
+"""Vote unique user target
+
+Revision ID: c4a7e9b2d501
+Revises: b6e2d8f4a917
+Create Date: 2026-10-19 18:47:03.551862
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a7e9b2d501'
+down_revision: Union[str, Sequence[str], None] = 'b6e2d8f4a917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the first vote of each user on each target; later ones were duplicates created by races.
+    op.execute(
+        "DELETE FROM vote WHERE id NOT IN "
+        "(SELECT MIN(id) FROM vote GROUP BY user_id, target_vote, target_id)"
+    )
+    # The vote counts of the targets included the deleted duplicates.
+    for table, target_vote in (('question', 'QUESTION'), ('answer', 'ANSWER')):
+        op.execute(
+            f"UPDATE {table} SET "
+            f"upvotes = (SELECT COUNT(*) FROM vote WHERE vote.target_vote = '{target_vote}' "
+            f"AND vote.target_id = {table}.id AND vote.vote_type = 'UPVOTE'), "
+            f"downvotes = (SELECT COUNT(*) FROM vote WHERE vote.target_vote = '{target_vote}' "
+            f"AND vote.target_id = {table}.id AND vote.vote_type = 'DOWNVOTE')"
+        )
+    op.drop_index('ix_vote_user_id_target_vote_target_id', table_name='vote')
+    op.create_index(
+        'ix_vote_user_id_target_vote_target_id', 'vote', ['user_id', 'target_vote', 'target_id'], unique=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_vote_user_id_target_vote_target_id', table_name='vote')
+    op.create_index(
+        'ix_vote_user_id_target_vote_target_id', 'vote', ['user_id', 'target_vote', 'target_id'], unique=False
+    )
@@ -0,0 +1,57 @@
+"""Question hot score and answer count
+
+Revision ID: c81d4e6f0b27
+Revises: a7d2e4f9c1b3
+Create Date: 2026-10-19 11:03:48.775130
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81d4e6f0b27'
+down_revision: Union[str, Sequence[str], None] = 'a7d2e4f9c1b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('question', sa.Column('num_answers', sa.Integer(), nullable=True))
+    op.add_column('question', sa.Column('hot_score', sa.Float(), nullable=True))
+    op.create_index(op.f('ix_question_hot_score'), 'question', ['hot_score'], unique=False)
+
+    # Backfill the counters of the existing questions.
+    op.execute(
+        "UPDATE question SET num_answers = "
+        "(SELECT COUNT(*) FROM answer WHERE answer.question_id = question.id)"
+    )
+    # The hot score as computed by the application when this migration was written:
+    # sign(e) * log10(max(|e|, 1)) + (created_at - 2025-01-01 UTC) / 45000 seconds, where
+    # e = 0.1 * views + 2 * (upvotes - downvotes) + 3 * answers.
+    engagement = (
+        "(0.1 * COALESCE(views, 0) + 2.0 * (COALESCE(upvotes, 0) - COALESCE(downvotes, 0))"
+        " + 3.0 * COALESCE(num_answers, 0))"
+    )
+    if op.get_bind().dialect.name == "postgresql":
+        score = (
+            f"SIGN({engagement}) * LOG(GREATEST(ABS({engagement}), 1))"
+            " + (EXTRACT(EPOCH FROM created_at) - 1735689600) / 45000"
+        )
+        op.execute(f"UPDATE question SET hot_score = ROUND(CAST({score} AS numeric), 7)")
+    else:
+        score = (
+            f"SIGN({engagement}) * LOG10(MAX(ABS({engagement}), 1))"
+            " + ((julianday(created_at) - 2440587.5) * 86400 - 1735689600) / 45000"
+        )
+        op.execute(f"UPDATE question SET hot_score = ROUND({score}, 7)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_question_hot_score'), table_name='question')
+    op.drop_column('question', 'hot_score')
+    op.drop_column('question', 'num_answers')
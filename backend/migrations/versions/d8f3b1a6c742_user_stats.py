@@ -0,0 +1,52 @@
+"""User stats
+
+Revision ID: d8f3b1a6c742
+Revises: c4a7e9b2d501
+Create Date: 2026-10-19 19:22:37.804115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8f3b1a6c742'
+down_revision: Union[str, Sequence[str], None] = 'c4a7e9b2d501'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('num_questions', sa.Integer(), nullable=False),
+    sa.Column('num_answers', sa.Integer(), nullable=False),
+    sa.Column('question_upvotes', sa.Integer(), nullable=False),
+    sa.Column('answer_upvotes', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # Backfill the counters from the existing questions and answers.
+    op.execute(
+        """
+        INSERT INTO user_stats (user_id, num_questions, num_answers, question_upvotes, answer_upvotes)
+        SELECT user_id, SUM(num_questions), SUM(num_answers), SUM(question_upvotes), SUM(answer_upvotes)
+        FROM (
+            SELECT author_id AS user_id, COUNT(*) AS num_questions, 0 AS num_answers,
+                COALESCE(SUM(upvotes), 0) AS question_upvotes, 0 AS answer_upvotes
+            FROM question GROUP BY author_id
+            UNION ALL
+            SELECT user_id, 0, COUNT(*), 0, COALESCE(SUM(upvotes), 0)
+            FROM answer GROUP BY user_id
+        ) AS activity
+        GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_stats')
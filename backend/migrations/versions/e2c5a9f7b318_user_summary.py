@@ -0,0 +1,35 @@
+"""User summary
+
+Revision ID: e2c5a9f7b318
+Revises: d8f3b1a6c742
+Create Date: 2026-10-19 20:03:15.662480
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c5a9f7b318'
+down_revision: Union[str, Sequence[str], None] = 'd8f3b1a6c742'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_summary',
+    sa.Column('top_tags', sa.JSON(), nullable=False),
+    sa.Column('recent_activity', sa.JSON(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_summary')
@@ -0,0 +1,27 @@
+"""Tag num_questions index
+
+Revision ID: e47a2b9c13d8
+Revises: c81d4e6f0b27
+Create Date: 2026-10-19 11:41:06.318092
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e47a2b9c13d8'
+down_revision: Union[str, Sequence[str], None] = 'c81d4e6f0b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_tag_num_questions'), 'tag', ['num_questions'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_tag_num_questions'), table_name='tag')
@@ -0,0 +1,60 @@
+"""Tests of the concurrent reads."""
+
+import asyncio
+import os
+import unittest
+from contextlib import asynccontextmanager
+from unittest import mock
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("DEV_MODE", "false")
+os.environ.setdefault("ALLOW_ORIGINS", "[]")
+
+from app.core import concurrent_reads  # noqa: E402
+from app.core.settings import settings  # noqa: E402
+
+
+@asynccontextmanager
+async def fake_session_scope():
+    yield None
+
+
+class RunConcurrentlyTest(unittest.IsolatedAsyncioTestCase):
+    async def test_caps_the_reads_running_at_once(self):
+        running = 0
+        peak = 0
+
+        async def read(session):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return session
+
+        limit = settings.CONCURRENT_READS_PER_REQUEST
+        with mock.patch.object(concurrent_reads, "session_scope", fake_session_scope):
+            results = await concurrent_reads.run_concurrently(*[read] * (limit * 3))
+
+        self.assertEqual(results, [None] * (limit * 3))
+        self.assertEqual(peak, limit)
+
+    async def test_nested_reads_do_not_wait_for_a_slot(self):
+        async def inner(session):
+            return "inner"
+
+        async def outer(session):
+            _, result = await asyncio.gather(asyncio.sleep(0), concurrent_reads.run_read(inner))
+            return result
+
+        with (
+            mock.patch.object(settings, "CONCURRENT_READS_PER_REQUEST", 1),
+            mock.patch.object(concurrent_reads, "session_scope", fake_session_scope),
+        ):
+            results = await asyncio.wait_for(concurrent_reads.run_concurrently(outer, outer), timeout=1)
+
+        self.assertEqual(results, ["inner", "inner"])
+
+
+if __name__ == "__main__":
+    unittest.main()
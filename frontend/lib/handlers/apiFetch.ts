@@ -3,11 +3,27 @@ import logger from "@/lib/logger";
 import handleError from "@/lib/handlers/error";
 import { clearTimeout } from "node:timers";
 import { RequestError } from "@/lib/http-errors";
+import { headers as requestHeaders } from "next/headers";
 
 interface FetchOptions extends RequestInit {
   timeout?: number;
 }
 
+/**
+ * Returns the X-Forwarded-For header of the request being handled, so that the API
+ * rate limits the browser that made it rather than this server as a whole. The API
+ * only trusts it from the addresses listed in its RATE_LIMIT_TRUSTED_PROXIES setting.
+ */
+async function forwardedHeaders(): Promise<Record<string, string>> {
+  try {
+    const forwardedFor = (await requestHeaders()).get("x-forwarded-for");
+    return forwardedFor ? { "X-Forwarded-For": forwardedFor } : {};
+  } catch {
+    // Outside of a request, e.g. at build time, there is no client to forward.
+    return {};
+  }
+}
+
 export async function fetchHandler<T>(
   endpoint: string,
   options: FetchOptions = {},
@@ -31,7 +47,11 @@ export async function fetchHandler<T>(
     Accept: "application/json",
   };
 
-  const headers: HeadersInit = { ...defaultHeaders, ...customHeaders };
+  const headers: HeadersInit = {
+    ...defaultHeaders,
+    ...(await forwardedHeaders()),
+    ...customHeaders,
+  };
   const config: RequestInit = {
     ...restOptions,
     headers,